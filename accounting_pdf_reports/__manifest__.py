@@ -1,6 +1,6 @@
 {
     'name': 'Odoo 18 Accounting Financial Reports',
-    'version': '1.0.2',
+    'version': '1.0.12',
     'category': 'Invoicing Management',
     'description': 'Accounting Reports For Odoo 18, Accounting Financial Reports, '
                    'Odoo 18 Financial Reports',
@@ -12,15 +12,19 @@
     'maintainer': 'Odoo Mates',
     'support': 'odoomates@gmail.com',
     'website': 'https://www.youtube.com/watch?v=yA4NLwOLZms',
-    'depends': ['account'],
+    'depends': ['account', 'report_xlsx'],
     'live_test_url': 'https://www.youtube.com/watch?v=yA4NLwOLZms',
     'data': [
         'security/ir.model.access.csv',
+        'security/account_report_job_security.xml',
         'data/account_account_type.xml',
+        'data/ir_cron_data.xml',
         'views/menu.xml',
         'views/ledger_menu.xml',
         'views/financial_report.xml',
+        'wizard/account_report_index_advisor.xml',
         'views/settings.xml',
+        'views/account_report_job.xml',
         'wizard/account_report_common_view.xml',
         'wizard/partner_ledger.xml',
         'wizard/general_ledger.xml',
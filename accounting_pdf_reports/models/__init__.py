@@ -1,3 +1,12 @@
+from . import account_account
 from . import account_account_type
 from . import account_financial_report
+from . import account_move
 from . import account_move_line
+from . import account_move_line_balance
+from . import account_partial_reconcile
+from . import account_report_cache
+from . import account_report_job
+from . import res_currency
+from . import ir_actions_report
+from . import res_config_settings
@@ -0,0 +1,13 @@
+from odoo import models
+
+# the account fields printed in the reports
+REPORT_ACCOUNT_FIELDS = {'code', 'name'}
+
+
+class AccountAccount(models.Model):
+    _inherit = "account.account"
+
+    def write(self, vals):
+        if REPORT_ACCOUNT_FIELDS.intersection(vals):
+            self.env['account.report.cache.event']._log_company_changes(self.sudo().company_ids.ids)
+        return super().write(vals)
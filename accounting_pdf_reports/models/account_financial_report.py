@@ -1,33 +1,61 @@
+from collections import defaultdict
+
 from odoo import api, models, fields
 
 
 class AccountFinancialReport(models.Model):
     _name = "account.financial.report"
     _description = "Account Report"
+    _parent_store = True
 
-    @api.depends('parent_id', 'parent_id.level')
+    @api.depends('parent_path')
     def _get_level(self):
         '''Returns a dictionary with key=the ID of a record and value = the level of this
            record in the tree structure.'''
         for report in self:
-            level = 0
-            if report.parent_id:
-                level = report.parent_id.level + 1
-            report.level = level
+            report.level = report.parent_path.count('/') - 1 if report.parent_path else 0
 
     def _get_children_by_order(self):
-        res = self
-        children = self.search([('parent_id', 'in', self.ids)], order='sequence ASC')
-        if children:
-            for child in children:
-                res += child._get_children_by_order()
+        res = self.browse()
+        for report in self:
+            res += self.browse(report._get_children_ids_by_order())
         return res
 
+    def _get_children_ids_by_order(self):
+        '''Returns the ids of the record and of all its descendants, each record being followed by
+           its children ordered by sequence. The whole hierarchy is loaded at once from parent_path,
+           by one search per call, the result being not cached.'''
+        children = defaultdict(list)
+        descendants = self.search([('id', 'child_of', self.id)])
+        for report in descendants.sorted(lambda r: (r.sequence, r.id)):
+            children[report.parent_id.id].append(report.id)
+        report_ids = []
+        stack = [self.id]
+        while stack:
+            report_id = stack.pop()
+            report_ids.append(report_id)
+            stack.extend(reversed(children[report_id]))
+        return tuple(report_ids)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.env['account.report.cache.event']._log_company_changes()
+        return super().create(vals_list)
+
+    def write(self, vals):
+        self.env['account.report.cache.event']._log_company_changes()
+        return super().write(vals)
+
+    def unlink(self):
+        self.env['account.report.cache.event']._log_company_changes()
+        return super().unlink()
+
     name = fields.Char('Report Name', required=True, translate=True)
-    parent_id = fields.Many2one('account.financial.report', 'Parent')
+    parent_id = fields.Many2one('account.financial.report', 'Parent', index=True)
+    parent_path = fields.Char(index=True)
     children_ids = fields.One2many('account.financial.report', 'parent_id', 'Account Report')
     sequence = fields.Integer('Sequence')
-    level = fields.Integer(compute='_get_level', string='Level', store=True, recursive=True)
+    level = fields.Integer(compute='_get_level', string='Level', store=True)
     type = fields.Selection([
         ('sum', 'View'),
         ('accounts', 'Accounts'),
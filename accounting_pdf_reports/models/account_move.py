@@ -0,0 +1,35 @@
+from odoo import models
+
+# the move fields changing the daily balances of its lines
+BALANCE_MOVE_FIELDS = {'state', 'date', 'journal_id', 'company_id', 'line_ids'}
+# the move fields printed in the ledgers, which the daily balances don't keep
+REPORT_MOVE_FIELDS = {'name', 'ref'}
+
+
+class AccountMove(models.Model):
+    _inherit = "account.move"
+
+    def write(self, vals):
+        # posting, resetting to draft and cancelling all go through write
+        if self.env.context.get('skip_daily_balances'):
+            return super().write(vals)
+        if not BALANCE_MOVE_FIELDS.intersection(vals):
+            if REPORT_MOVE_FIELDS.intersection(vals):
+                self.env['account.report.cache.event']._log_changes(
+                    self.filtered(lambda m: m.state == 'posted').line_ids._get_daily_balance_keys())
+            return super().write(vals)
+        posted_moves = self.filtered(lambda m: m.state == 'posted')
+        if not posted_moves and vals.get('state') != 'posted':
+            # e.g. editing a draft invoice, its lines are in no daily balance before or after
+            return super().write(vals)
+        DailyBalance = self.env['account.move.line.balance']
+        posted_lines = posted_moves.line_ids
+        keys = posted_lines._get_daily_balance_keys()
+        DailyBalance._add_lines(posted_lines.ids, sign=-1)
+        # the lines created, changed or deleted by the write are counted here, not by their own hooks
+        res = super(AccountMove, self.with_context(skip_daily_balances=True)).write(vals)
+        posted_lines = self.filtered(lambda m: m.state == 'posted').line_ids
+        DailyBalance._add_lines(posted_lines.ids)
+        keys |= posted_lines._get_daily_balance_keys()
+        self.env['account.report.cache.event']._log_changes(keys)
+        return res
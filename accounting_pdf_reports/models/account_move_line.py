@@ -1,18 +1,185 @@
 import ast
+import logging
+import uuid
+
 from odoo import api, models, fields
+from odoo.tools.sql import create_index, index_exists
+
+from .account_move_line_balance import BALANCE_LINE_FIELDS
+
+_logger = logging.getLogger(__name__)
+
+QUERY_GET_CACHE_KEY = 'accounting_pdf_reports.query_get'
+# the compiled filters kept per cursor, the oldest ones being dropped first
+QUERY_GET_CACHE_SIZE = 128
+
+# the line fields printed in the ledgers or filtered on, which the daily balances don't keep
+REPORT_LINE_FIELDS = {'name', 'ref', 'analytic_distribution'}
+
+# the rows fetched at once from the server side cursors of _stream_query
+STREAM_BATCH_SIZE = 2000
+# the number of lines above which the ledgers stream their lines while rendering,
+# see the accounting_pdf_reports.ledger_stream_threshold system parameter
+LEDGER_STREAM_THRESHOLD = 20000
+
+# the context keys _query_get builds its filter from
+QUERY_GET_CONTEXT_KEYS = (
+    'date_from', 'date_to', 'strict_range', 'initial_bal', 'aged_balance',
+    'journal_ids', 'state', 'company_id', 'allowed_company_ids', 'reconcile_date',
+    'account_tag_ids', 'account_ids', 'analytic_tag_ids', 'analytic_account_ids',
+    'partner_ids', 'partner_categories',
+)
+
+# the journal items (as estimated by the planner) above which the analytic index isn't built
+# by the module update, the table being locked meanwhile, but from the index advisor
+ANALYTIC_INDEX_MAX_ROWS = 100000
+
+# the analytic account IDs of an analytic distribution, whose keys are comma separated IDs,
+# indexed by account_move_line_analytic_account_ids_index for the analytic filters
+ANALYTIC_ACCOUNT_IDS_FUNCTION = """
+    CREATE OR REPLACE FUNCTION analytic_distribution_account_ids(distribution jsonb) RETURNS int[]
+    LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+        SELECT ARRAY(
+            SELECT DISTINCT account_id::int
+            FROM jsonb_object_keys(CASE WHEN jsonb_typeof(distribution) = 'object' THEN distribution ELSE '{}' END) AS dist(key),
+                 unnest(string_to_array(dist.key, ',')) AS account_id
+        )
+    $$
+"""
+
+
+def _freeze(value):
+    """ Returns a hashable equivalent of a context or domain value. """
+    if isinstance(value, models.BaseModel):
+        return value._name, tuple(value.ids)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(val)) for key, val in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(val) for val in value)
+    return value
+
+
+class LedgerStream:
+    """ The rows of a ledger query ordered by account, handed out account by account to the
+    LedgerLines reading them. The accounts must be read in the order of the query, the
+    lines of the accounts which are not read are skipped. """
+
+    def __init__(self, rows, account_ids):
+        self._rows = rows
+        # the first position of every account, as array_position in the ORDER BY of the query
+        self._positions = {}
+        for position, account_id in enumerate(account_ids):
+            self._positions.setdefault(account_id, position)
+        self._next = None
+
+    def lines(self, account_id):
+        position = self._positions[account_id]
+        while True:
+            if self._next is None:
+                self._next = next(self._rows, None)
+                if self._next is None:
+                    return
+            row_position = self._positions[self._next['account_id']]
+            if row_position > position:
+                return
+            row, self._next = self._next, None
+            if row_position == position:
+                yield row
+
+
+class LedgerLines:
+    """ The lines of an account in a ledger, fetched from a LedgerStream while they are
+    iterated, with the number of lines known beforehand. """
+
+    def __init__(self, stream, account_id, initial=None, count=0):
+        self._stream = stream
+        self._account_id = account_id
+        self._initial = initial
+        self._count = count + (1 if initial else 0)
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return bool(self._count)
+
+    def __iter__(self):
+        balance = 0.0
+        if self._initial:
+            balance = self._initial['balance']
+            yield self._initial
+        for row in self._stream.lines(self._account_id):
+            row = dict(row)
+            row.pop('account_id')
+            row['balance'] += balance
+            yield row
 
 
 class AccountMoveLine(models.Model):
     _inherit = "account.move.line"
 
+    def init(self):
+        super().init()
+        self._cr.execute(ANALYTIC_ACCOUNT_IDS_FUNCTION)
+        if index_exists(self._cr, 'account_move_line_analytic_account_ids_index'):
+            return
+        # CREATE INDEX blocks the writes on the table while it is built, which can't be done
+        # CONCURRENTLY in the transaction of the update: only the small tables are indexed here
+        self._cr.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [self._table])
+        if self._cr.fetchone()[0] > ANALYTIC_INDEX_MAX_ROWS:
+            _logger.warning(
+                "The index account_move_line_analytic_account_ids_index is missing, create it from "
+                "the report index advisor to speed up the analytic filters of the reports.")
+            return
+        create_index(
+            self._cr, 'account_move_line_analytic_account_ids_index',
+            self._table, ['analytic_distribution_account_ids(analytic_distribution)'], method='gin',
+        )
+
+    def _query_get_cache_key(self, domain):
+        """ Returns the key of the compiled filter of _query_get: the domain, the
+        context keys the filter is built from and what the record rules depend on."""
+        context = self._context or {}
+        return (
+            _freeze(domain),
+            tuple(_freeze(context.get(key)) for key in QUERY_GET_CONTEXT_KEYS),
+            self.env.uid,
+            self.env.su,
+            self.env.company.id,
+            tuple(self.env.companies.ids),
+        )
+
     @api.model
     def _query_get(self, domain=None):
+        """ Returns the (tables, where_clause, where_clause_params) filtering the
+        move lines on the report options of the context.
+
+        Reports call it many times per print with the same context, the compiled
+        filter is therefore memoized on the cursor, only during the computation
+        of the report values (see ir.actions.report._query_get_scope): outside of
+        it, the record rules or companies may change between two calls. The memo
+        is also bounded.
+        """
         self.check_access('read')
 
+        cache = self.env.cr.cache.get(QUERY_GET_CACHE_KEY)
+        if cache is None:
+            return self._query_get_compile(domain)
+        key = self._query_get_cache_key(domain)
+        if key not in cache:
+            if len(cache) >= QUERY_GET_CACHE_SIZE:
+                cache.pop(next(iter(cache)))
+            cache[key] = self._query_get_compile(domain)
+        tables, where_clause, where_clause_params = cache[key]
+        return tables, where_clause, list(where_clause_params)
+
+    @api.model
+    def _query_get_compile(self, domain=None):
         context = dict(self._context or {})
         domain = domain or []
         if not isinstance(domain, (list, tuple)):
             domain = ast.literal_eval(domain)
+        domain = list(domain)
 
         date_field = 'date'
         if context.get('aged_balance'):
@@ -53,9 +220,6 @@ class AccountMoveLine(models.Model):
         if context.get('analytic_tag_ids'):
             domain += [('analytic_tag_ids', 'in', context['analytic_tag_ids'].ids)]
 
-        if context.get('analytic_account_ids'):
-            domain += [('analytic_distribution', 'in', context['analytic_account_ids'].ids)]
-
         if context.get('partner_ids'):
             domain += [('partner_id', 'in', context['partner_ids'].ids)]
 
@@ -74,4 +238,116 @@ class AccountMoveLine(models.Model):
             from_string, from_params = query.from_clause
             where_string, where_params = query.where_clause
             tables, where_clause, where_clause_params = from_string, where_string, from_params + where_params
+            if context.get('analytic_account_ids'):
+                # matched on the GIN index of the distribution accounts, instead of the json
+                # of every line the analytic_distribution domain reads
+                where_clause = '(' + where_clause + ') AND analytic_distribution_account_ids(' \
+                    '"account_move_line"."analytic_distribution") && %s::int[]'
+                where_clause_params.append(context['analytic_account_ids'].ids)
         return tables, where_clause, where_clause_params
+
+    @api.model
+    def _stream_query(self, query, params, batch_size=STREAM_BATCH_SIZE):
+        """ Yields the rows of the given query as dictionaries, fetched by batches from a
+        server side cursor, so that only batch_size rows are held in memory at once.
+
+        The cursor lives in the current transaction, other queries can be executed on
+        self.env.cr between two rows.
+        """
+        cr = self.env.cr
+        name = 'account_report_%s' % uuid.uuid4().hex
+        cr.execute('DECLARE "' + name + '" NO SCROLL CURSOR FOR ' + query, params)
+        try:
+            while True:
+                cr.execute('FETCH FORWARD %s FROM "%s"' % (int(batch_size), name))
+                rows = cr.dictfetchall()
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            # the cursor is gone with the transaction when the rows weren't all read
+            if not cr.closed:
+                cr.execute('CLOSE "%s"' % name)
+
+    @api.model
+    def _get_ledger_lines(self, query, params, account_ids, initial_rows, line_counts):
+        """ Returns the lines of a ledger per account ID, the initial balance line first.
+
+        :param query: the lines of the accounts in the order of account_ids, with an account_id
+            column and their running balance per account (without the initial balance)
+        :param initial_rows: the initial balance line per account ID
+        :param line_counts: the number of lines the query returns per account ID
+
+        The lines are lists when there are few of them. Above the ledger stream threshold
+        they are LedgerLines, fetched by batches from a server side cursor while the report
+        is rendered, so that the memory doesn't grow with the number of lines. They can
+        then be iterated once only, in the order of the accounts.
+        """
+        threshold = int(self.env['ir.config_parameter'].sudo().get_param(
+            'accounting_pdf_reports.ledger_stream_threshold', LEDGER_STREAM_THRESHOLD))
+        if sum(line_counts.values()) > threshold:
+            stream = LedgerStream(self._stream_query(query, params), account_ids)
+            return {
+                account_id: LedgerLines(stream, account_id, initial_rows.get(account_id),
+                                        line_counts.get(account_id, 0))
+                for account_id in account_ids
+            }
+        move_lines = {account_id: [] for account_id in account_ids}
+        for account_id, row in initial_rows.items():
+            move_lines[account_id].append(row)
+        self.env.cr.execute(query, params)
+        for row in self.env.cr.dictfetchall():
+            account_id = row.pop('account_id')
+            initial = initial_rows.get(account_id)
+            row['balance'] += initial['balance'] if initial else 0.0
+            move_lines[account_id].append(row)
+        return move_lines
+
+    def _get_daily_balance_keys(self):
+        """ Returns the (company_id, account_id, journal_id, date) keys of the daily balances
+        the lines are summed in."""
+        return {
+            (line.company_id.id, line.account_id.id, line.journal_id.id, line.date)
+            for line in self
+            if line.account_id
+        }
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        # e.g. the lines of a move created posted, or added to a posted move
+        posted_lines = lines.filtered(lambda l: l.parent_state == 'posted')
+        if posted_lines and not self.env.context.get('skip_daily_balances'):
+            self.env['account.move.line.balance']._add_lines(posted_lines.ids)
+            self.env['account.report.cache.event']._log_changes(posted_lines._get_daily_balance_keys())
+        return lines
+
+    def write(self, vals):
+        if self.env.context.get('skip_daily_balances'):
+            return super().write(vals)
+        if not BALANCE_LINE_FIELDS.intersection(vals):
+            if REPORT_LINE_FIELDS.intersection(vals):
+                self.env['account.report.cache.event']._log_changes(
+                    self.filtered(lambda l: l.parent_state == 'posted')._get_daily_balance_keys())
+            return super().write(vals)
+        posted_lines = self.filtered(lambda l: l.parent_state == 'posted')
+        if not posted_lines:
+            return super().write(vals)
+        DailyBalance = self.env['account.move.line.balance']
+        keys = posted_lines._get_daily_balance_keys()
+        DailyBalance._add_lines(posted_lines.ids, sign=-1)
+        res = super().write(vals)
+        DailyBalance._add_lines(posted_lines.ids)
+        keys |= posted_lines._get_daily_balance_keys()
+        self.env['account.report.cache.event']._log_changes(keys)
+        return res
+
+    def unlink(self):
+        posted_lines = self.filtered(lambda l: l.parent_state == 'posted')
+        if not posted_lines or self.env.context.get('skip_daily_balances'):
+            return super().unlink()
+        keys = posted_lines._get_daily_balance_keys()
+        self.env['account.move.line.balance']._add_lines(posted_lines.ids, sign=-1)
+        res = super().unlink()
+        self.env['account.report.cache.event']._log_changes(keys)
+        return res
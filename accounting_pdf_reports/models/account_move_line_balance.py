@@ -0,0 +1,279 @@
+import logging
+
+from odoo import api, fields, models
+from odoo.tools import split_every
+from odoo.tools.safe_eval import safe_eval
+
+_logger = logging.getLogger(__name__)
+
+# the move line fields the daily balances are aggregated on
+BALANCE_LINE_FIELDS = {'company_id', 'account_id', 'journal_id', 'partner_id', 'date', 'debit', 'credit', 'balance'}
+
+# the context keys of account.move.line._query_get that filter on something the daily balances don't keep
+LINE_LEVEL_CONTEXT_KEYS = (
+    'aged_balance', 'reconcile_date', 'account_tag_ids', 'analytic_tag_ids',
+    'analytic_account_ids', 'partner_categories',
+)
+
+
+class AccountMoveLineBalance(models.Model):
+    """ Debit and credit of the posted journal items summed per company, account, journal,
+    partner and date, so that the reports needing no line level detail can read a few
+    pre-aggregated rows instead of every journal item.
+
+    The rows are deltas: each time posted journal items are created, changed or deleted, and
+    each time a move is posted, reset to draft or cancelled, rows removing the former amounts
+    of its items and adding their new amounts are inserted. The rows being never updated,
+    concurrent postings on the same account and day don't conflict. A key therefore has many
+    rows, which the readers sum, and which _compact merges back into one.
+    """
+    _name = "account.move.line.balance"
+    _description = "Journal Items Daily Balance"
+    _log_access = False
+    _order = "date, account_id"
+
+    company_id = fields.Many2one('res.company', string='Company', required=True, readonly=True, index=True)
+    company_currency_id = fields.Many2one(related='company_id.currency_id', string='Company Currency')
+    account_id = fields.Many2one('account.account', string='Account', required=True, readonly=True, index=True)
+    journal_id = fields.Many2one('account.journal', string='Journal', required=True, readonly=True)
+    partner_id = fields.Many2one('res.partner', string='Partner', readonly=True)
+    date = fields.Date(string='Date', required=True, readonly=True, index=True)
+    debit = fields.Monetary(string='Debit', currency_field='company_currency_id', readonly=True)
+    credit = fields.Monetary(string='Credit', currency_field='company_currency_id', readonly=True)
+    balance = fields.Monetary(string='Balance', currency_field='company_currency_id', readonly=True)
+    line_count = fields.Integer(string='Number of Journal Items', readonly=True)
+
+    def init(self):
+        self._cr.execute("SELECT 1 FROM account_move_line_balance LIMIT 1")
+        if not self._cr.fetchone():
+            self.rebuild()
+
+    def _get_aggregate_query(self, where_clause=''):
+        return """
+            SELECT l.company_id, l.account_id, l.journal_id, l.partner_id, l.date,
+                   SUM(l.debit), SUM(l.credit), SUM(l.balance), COUNT(*)
+            FROM account_move_line l
+            WHERE l.parent_state = 'posted'
+                AND l.account_id IS NOT NULL """ + where_clause + """
+            GROUP BY l.company_id, l.account_id, l.journal_id, l.partner_id, l.date
+        """
+
+    @api.model
+    def _flush_lines(self):
+        """ Flush the journal item fields the daily balances are aggregated from. """
+        self.env['account.move.line'].flush_model(BALANCE_LINE_FIELDS | {'parent_state'})
+
+    @api.model
+    def _refresh(self, keys):
+        """ Recompute the daily balances of the given (company_id, account_id, journal_id, date) keys
+        from the journal items, to repair the keys check_consistency finds out of date."""
+        if not keys:
+            return
+        self._flush_lines()
+        for keys_chunk in split_every(1000, keys, tuple):
+            self._cr.execute("""
+                DELETE FROM account_move_line_balance
+                WHERE (company_id, account_id, journal_id, date) IN %s
+            """, [keys_chunk])
+            self._cr.execute("""
+                INSERT INTO account_move_line_balance
+                    (company_id, account_id, journal_id, partner_id, date, debit, credit, balance, line_count)
+            """ + self._get_aggregate_query(
+                "AND (l.company_id, l.account_id, l.journal_id, l.date) IN %s"), [keys_chunk])
+        self.invalidate_model()
+
+    @api.model
+    def _add_lines(self, line_ids, sign=1):
+        """ Add the amounts of the given journal items, the posted ones, to the daily balances,
+        or remove them with sign=-1.
+
+        The amounts are read from the database, the pending changes of the journal items
+        being flushed, so that removing the items before they are changed and adding them
+        back afterwards applies the change."""
+        if not line_ids:
+            return
+        self._flush_lines()
+        for ids_chunk in split_every(10000, line_ids, tuple):
+            self._cr.execute("""
+                INSERT INTO account_move_line_balance
+                    (company_id, account_id, journal_id, partner_id, date, debit, credit, balance, line_count)
+                SELECT company_id, account_id, journal_id, partner_id, date,
+                       %s * debit, %s * credit, %s * balance, %s * line_count
+                FROM (""" + self._get_aggregate_query("AND l.id IN %s") + """) AS l(company_id, account_id,
+                                                                             journal_id, partner_id, date,
+                                                                             debit, credit, balance, line_count)
+            """, [sign, sign, sign, sign, ids_chunk])
+        self.invalidate_model()
+
+    @api.model
+    def _compact(self):
+        """ Merge the delta rows of every key into one row, dropping the keys left empty. """
+        self.env.flush_all()
+        self._cr.execute("""
+            WITH deleted AS (
+                DELETE FROM account_move_line_balance b
+                USING (
+                    SELECT company_id, account_id, journal_id, partner_id, date
+                    FROM account_move_line_balance
+                    GROUP BY company_id, account_id, journal_id, partner_id, date
+                    HAVING COUNT(*) > 1 OR SUM(line_count) = 0
+                ) AS k
+                WHERE b.company_id = k.company_id
+                    AND b.account_id = k.account_id
+                    AND b.journal_id = k.journal_id
+                    AND b.partner_id IS NOT DISTINCT FROM k.partner_id
+                    AND b.date = k.date
+                RETURNING b.*
+            )
+            INSERT INTO account_move_line_balance
+                (company_id, account_id, journal_id, partner_id, date, debit, credit, balance, line_count)
+            SELECT company_id, account_id, journal_id, partner_id, date,
+                   SUM(debit), SUM(credit), SUM(balance), SUM(line_count)
+            FROM deleted
+            GROUP BY company_id, account_id, journal_id, partner_id, date
+            HAVING SUM(line_count) != 0
+        """)
+        self.invalidate_model()
+        _logger.info("Compacted the journal items daily balances: %s rows", self._cr.rowcount)
+
+    @api.model
+    def _cron_compact(self):
+        self._compact()
+
+    @api.model
+    def rebuild(self):
+        """ Recompute all the daily balances from the journal items. """
+        self.env.flush_all()
+        self._cr.execute("DELETE FROM account_move_line_balance")
+        self._cr.execute("""
+            INSERT INTO account_move_line_balance
+                (company_id, account_id, journal_id, partner_id, date, debit, credit, balance, line_count)
+        """ + self._get_aggregate_query())
+        self.invalidate_model()
+        _logger.info("Rebuilt the journal items daily balances: %s rows", self._cr.rowcount)
+        return True
+
+    @api.model
+    def check_consistency(self):
+        """ Compare the daily balances with the journal items.
+
+        :return: the (company_id, account_id, journal_id, date) keys whose balances differ
+        """
+        self.env.flush_all()
+        self._cr.execute("""
+            SELECT DISTINCT COALESCE(b.company_id, l.company_id), COALESCE(b.account_id, l.account_id),
+                   COALESCE(b.journal_id, l.journal_id), COALESCE(b.date, l.date)
+            FROM (
+                SELECT company_id, account_id, journal_id, partner_id, date,
+                       SUM(debit) AS debit, SUM(credit) AS credit, SUM(line_count) AS line_count
+                FROM account_move_line_balance
+                GROUP BY company_id, account_id, journal_id, partner_id, date
+                HAVING SUM(line_count) != 0 OR SUM(debit) != 0 OR SUM(credit) != 0
+            ) AS b
+            FULL OUTER JOIN (""" + self._get_aggregate_query() + """) AS l(company_id, account_id, journal_id,
+                                                                           partner_id, date, debit, credit,
+                                                                           balance, line_count)
+                ON b.company_id = l.company_id
+                AND b.account_id = l.account_id
+                AND b.journal_id = l.journal_id
+                AND b.partner_id IS NOT DISTINCT FROM l.partner_id
+                AND b.date = l.date
+            WHERE b.debit IS DISTINCT FROM l.debit
+                OR b.credit IS DISTINCT FROM l.credit
+                OR b.line_count IS DISTINCT FROM l.line_count
+        """)
+        keys = self._cr.fetchall()
+        if keys:
+            _logger.warning("%s journal items daily balance keys are out of date", len(keys))
+        return keys
+
+    @api.model
+    def _cron_check_consistency(self):
+        self._refresh(self.check_consistency())
+
+    @api.model
+    def _has_line_record_rules(self):
+        """ Whether record rules other than the company ones restrict the journal items the
+        user reads, which the daily balances, only filtered on the companies, can't apply."""
+        if self.env.su:
+            return False
+        Rule = self.env['ir.rule']
+        eval_context = Rule._eval_context()
+        for rule in Rule._get_rules('account.move.line').sudo():
+            domain = safe_eval(rule.domain_force, eval_context) if rule.domain_force else []
+            if any(isinstance(leaf, (list, tuple)) and leaf[0] != 'company_id' for leaf in domain):
+                return True
+        return False
+
+    @api.model
+    def _can_read_balances(self):
+        """ Whether the move line filters of the context (see account.move.line._query_get) can
+        be answered from the daily balances: only the posted items are summed, per company,
+        account, journal, partner and date, and the record rules of the journal items must
+        only restrict their company."""
+        context = self._context
+        if context.get('state') != 'posted':
+            return False
+        if any(context.get(key) for key in LINE_LEVEL_CONTEXT_KEYS):
+            return False
+        return not self._has_line_record_rules()
+
+    @api.model
+    def _get_balance_conditions(self, accounts, with_dates=True):
+        """ Returns the sql conditions (and their parameters) restricting the daily balances "b"
+        to the given accounts and the move line filters of the context, the way
+        account.move.line._query_get restricts the journal items."""
+        context = self._context
+        conditions = ["b.account_id IN %s"]
+        params = [tuple(accounts.ids)]
+        if with_dates and context.get('date_to'):
+            conditions.append("b.date <= %s")
+            params.append(context['date_to'])
+        if with_dates and context.get('date_from'):
+            if not context.get('strict_range'):
+                initial_balance_accounts = accounts.filtered('include_initial_balance')
+                conditions.append("(b.date >= %s OR b.account_id IN %s)")
+                params += [context['date_from'], tuple(initial_balance_accounts.ids) or (None,)]
+            elif context.get('initial_bal'):
+                conditions.append("b.date < %s")
+                params.append(context['date_from'])
+            else:
+                conditions.append("b.date >= %s")
+                params.append(context['date_from'])
+        if context.get('journal_ids'):
+            conditions.append("b.journal_id IN %s")
+            params.append(tuple(context['journal_ids']))
+        if context.get('company_id'):
+            conditions.append("b.company_id = %s")
+            params.append(context['company_id'])
+        elif context.get('allowed_company_ids'):
+            conditions.append("b.company_id IN %s")
+            params.append(tuple(self.env.companies.ids))
+        else:
+            conditions.append("b.company_id = %s")
+            params.append(self.env.company.id)
+        if context.get('account_ids'):
+            conditions.append("b.account_id IN %s")
+            params.append(tuple(context['account_ids'].ids))
+        if context.get('partner_ids'):
+            conditions.append("b.partner_id IN %s")
+            params.append(tuple(context['partner_ids'].ids))
+        return conditions, params
+
+    @api.model
+    def _read_balances(self, accounts):
+        """ Returns the debit, credit and balance of the given accounts with the move line filters
+        of the context, as a dictionary with key=the ID of an account, or None when the context
+        needs line level detail."""
+        if not accounts or not self._can_read_balances():
+            return None
+        conditions, params = self._get_balance_conditions(accounts)
+        self.flush_model()
+        self._cr.execute("""
+            SELECT b.account_id AS id, COALESCE(SUM(b.debit), 0) AS debit, COALESCE(SUM(b.credit), 0) AS credit,
+                   COALESCE(SUM(b.debit), 0) - COALESCE(SUM(b.credit), 0) AS balance
+            FROM account_move_line_balance b
+            WHERE """ + " AND ".join(conditions) + """
+            GROUP BY b.account_id
+        """, params)
+        return {row['id']: row for row in self._cr.dictfetchall()}
@@ -0,0 +1,33 @@
+from odoo import api, models
+from odoo.tools.sql import create_index
+
+
+class AccountPartialReconcile(models.Model):
+    _inherit = "account.partial.reconcile"
+
+    def init(self):
+        super().init()
+        # The ageing reports look up, for every open move line, the partial
+        # reconciliations of that line dated before or after the as-of date.
+        create_index(
+            self._cr, 'account_partial_reconcile_debit_move_max_date_index',
+            self._table, ['debit_move_id', 'max_date'],
+        )
+        create_index(
+            self._cr, 'account_partial_reconcile_credit_move_max_date_index',
+            self._table, ['credit_move_id', 'max_date'],
+        )
+
+    def _get_report_cache_keys(self):
+        return {(partial.company_id.id, partial.max_date) for partial in self if partial.max_date}
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partials = super().create(vals_list)
+        # reconciling posted items changes the aged balances without posting anything
+        self.env['account.report.cache.event']._log_changes(partials._get_report_cache_keys())
+        return partials
+
+    def unlink(self):
+        self.env['account.report.cache.event']._log_changes(self._get_report_cache_keys())
+        return super().unlink()
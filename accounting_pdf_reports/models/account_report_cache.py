@@ -0,0 +1,205 @@
+import threading
+import time
+import types
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime
+
+from odoo import api, fields, models
+from odoo.tools.sql import create_index
+
+from .account_move_line import _freeze
+
+# the number of report results kept per process
+REPORT_CACHE_SIZE = 32
+# the seconds a report result is kept, whatever happens to the journal entries
+REPORT_CACHE_TTL = 3600
+
+# the keys of the report forms which don't change the report (the ID of the wizard)
+VOLATILE_FORM_KEYS = ('id',)
+
+_FrozenRecords = namedtuple('_FrozenRecords', ['model', 'ids'])
+_CacheEntry = namedtuple('_CacheEntry', ['snapshot', 'created', 'company_ids', 'date_to', 'values'])
+
+_report_cache = OrderedDict()
+_report_cache_lock = threading.Lock()
+
+
+def _freeze_values(value):
+    """ Returns a copy of report values which doesn't hold anything bound to the cursor
+    they were computed with, the records being replaced by their model and ids.
+
+    Raises a TypeError for the values which can't be kept (callables for instance). """
+    if isinstance(value, models.BaseModel):
+        return _FrozenRecords(value._name, value.ids)
+    if isinstance(value, dict):
+        return {key: _freeze_values(val) for key, val in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_freeze_values(val) for val in value)
+    if value is None or isinstance(value, (str, bytes, int, float, date, datetime, types.ModuleType)):
+        return value
+    raise TypeError("%r can't be kept in the report cache" % type(value))
+
+
+def _thaw_values(env, value):
+    """ Reverse of _freeze_values, the records being browsed in the given environment. """
+    if isinstance(value, _FrozenRecords):
+        return env[value.model].browse(value.ids)
+    if isinstance(value, dict):
+        return {key: _thaw_values(env, val) for key, val in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_thaw_values(env, val) for val in value)
+    return value
+
+
+class AccountReportCacheEvent(models.Model):
+    """ Changes of the posted journal items, per company and date, invalidating the cached
+    report results computed before them. The changes of the accounts, financial reports
+    and rates are logged at the earliest date, invalidating all the results.
+
+    Events are only inserted, with the ID of the inserting transaction, so that any process
+    can tell whether a cached result (computed in a given transaction snapshot) saw them. """
+    _name = "account.report.cache.event"
+    _description = "Accounting Report Cache Invalidation"
+    _log_access = False
+
+    company_id = fields.Many2one('res.company', string='Company', required=True, readonly=True)
+    date = fields.Date(string='Date', required=True, readonly=True)
+
+    def init(self):
+        self._cr.execute("""
+            ALTER TABLE account_report_cache_event
+                ADD COLUMN IF NOT EXISTS txid bigint NOT NULL DEFAULT txid_current(),
+                ADD COLUMN IF NOT EXISTS logged_at timestamp NOT NULL DEFAULT (now() at time zone 'UTC')
+        """)
+        create_index(self._cr, 'account_report_cache_event_txid_index',
+                     self._table, ['txid', 'company_id', 'date'])
+
+    @api.model
+    def _log_changes(self, keys):
+        """ Log the changes of the posted journal items of the given (company_id, ..., date) keys. """
+        dates = {}
+        for key in keys:
+            company_id, key_date = key[0], key[-1]
+            if company_id not in dates or key_date < dates[company_id]:
+                dates[company_id] = key_date
+        if not dates:
+            return
+        self._cr.execute(
+            "INSERT INTO account_report_cache_event (company_id, date) VALUES "
+            + ", ".join(["(%s, %s)"] * len(dates)),
+            [value for item in dates.items() for value in item])
+
+    @api.model
+    def _log_company_changes(self, company_ids=None):
+        """ Log a change of what all the reports of the given companies (all of them by
+        default) depend on besides the journal items, e.g. the accounts or the rates. """
+        if company_ids is None:
+            company_ids = self.env['res.company'].sudo().search([]).ids
+        self._log_changes({(company_id, date.min) for company_id in company_ids})
+
+    @api.model
+    def _cron_vacuum(self):
+        # the events older than any cached result are useless
+        self._cr.execute("""
+            DELETE FROM account_report_cache_event
+            WHERE logged_at < (now() at time zone 'UTC') - %s * interval '1 second'
+        """, [REPORT_CACHE_TTL * 2])
+
+
+class AccountReportCache(models.AbstractModel):
+    """ Process local cache of the values of the accounting reports printed on the posted
+    entries, with a least recently used eviction, keyed by database. """
+    _name = "account.report.cache"
+    _description = "Accounting Report Cache"
+
+    @api.model
+    def _get_cache_key(self, report, docids, data):
+        form = {key: value for key, value in data['form'].items() if key not in VOLATILE_FORM_KEYS}
+        context = self.env.context
+        # the cache is shared by the databases of the process
+        return (
+            self.env.cr.dbname,
+            report._name,
+            _freeze(form),
+            _freeze(docids),
+            context.get('active_model'),
+            _freeze(context.get('active_ids')),
+            context.get('active_id'),
+            context.get('lang'),
+            self.env.uid,
+            tuple(self.env.companies.ids),
+        )
+
+    @api.model
+    def _get_invalidation_scope(self, data):
+        """ Returns the companies and the last date of the journal items a report depends on,
+        no date meaning all of them."""
+        form = data['form']
+        company_ids = tuple(self.env.companies.ids)
+        if form.get('company_id'):
+            company_ids = (form['company_id'][0],)
+        if 'period_length' in form:
+            # the aged balances are computed as of their start date
+            date_to = form.get('date_from')
+        elif form.get('enable_filter'):
+            # the financial reports compare two periods
+            date_to = form.get('date_to') and form.get('date_to_cmp') and max(
+                fields.Date.to_date(form['date_to']), fields.Date.to_date(form['date_to_cmp']))
+        else:
+            date_to = form.get('date_to')
+        return company_ids, fields.Date.to_date(date_to) or None
+
+    @api.model
+    def _is_valid(self, entry):
+        if time.monotonic() - entry.created > REPORT_CACHE_TTL:
+            return False
+        self._cr.execute("""
+            SELECT 1
+            FROM account_report_cache_event
+            WHERE txid >= txid_snapshot_xmin(%s::txid_snapshot)
+                AND NOT txid_visible_in_snapshot(txid, %s::txid_snapshot)
+                AND company_id IN %s
+                AND (%s::date IS NULL OR date <= %s::date)
+            LIMIT 1
+        """, [entry.snapshot, entry.snapshot, entry.company_ids, entry.date_to, entry.date_to])
+        return not self._cr.fetchone()
+
+    @api.model
+    def _get_report_values(self, report, docids, data, compute):
+        """ Returns the values of the given report, computed by compute(docids, data) or
+        taken from the cache.
+
+        Only the reports on the posted entries are cached: the draft entries change
+        without notice. A result is dropped when posted items of its companies are
+        changed at or before its end date (see account.report.cache.event)."""
+        if not data or not data.get('form') or data['form'].get('target_move') != 'posted':
+            return compute(docids, data)
+        key = self._get_cache_key(report, docids, data)
+        with _report_cache_lock:
+            entry = _report_cache.get(key)
+            if entry:
+                _report_cache.move_to_end(key)
+        if entry and self._is_valid(entry):
+            return _thaw_values(report.env, entry.values)
+
+        # the snapshot the values are computed in, the values aren't kept when the
+        # transaction changed posted items itself as it may still be rolled back
+        self._cr.execute("""
+            SELECT txid_current_snapshot()::text,
+                   EXISTS(SELECT 1 FROM account_report_cache_event WHERE txid = txid_current_if_assigned())
+        """)
+        snapshot, dirty = self._cr.fetchone()
+        values = compute(docids, data)
+        if dirty:
+            return values
+        try:
+            frozen = _freeze_values(values)
+        except TypeError:
+            return values
+        company_ids, date_to = self._get_invalidation_scope(data)
+        with _report_cache_lock:
+            _report_cache[key] = _CacheEntry(snapshot, time.monotonic(), company_ids, date_to, frozen)
+            _report_cache.move_to_end(key)
+            while len(_report_cache) > REPORT_CACHE_SIZE:
+                _report_cache.popitem(last=False)
+        return values
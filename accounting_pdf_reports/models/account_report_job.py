@@ -0,0 +1,161 @@
+import json
+import logging
+from datetime import timedelta
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+from odoo.tools import config, json_default
+
+_logger = logging.getLogger(__name__)
+
+# the seconds after which a running job is stale when the crons have no time limit
+STALE_JOB_TIMEOUT = 24 * 3600
+
+
+class AccountReportJob(models.Model):
+    """ A report printed in the background by a cron, for the reports too heavy to be
+    rendered within the time limit of an HTTP worker. """
+    _name = "account.report.job"
+    _description = "Accounting Report Job"
+    _order = "id desc"
+
+    name = fields.Char(string='Report', required=True, readonly=True)
+    user_id = fields.Many2one('res.users', string='Requested By', required=True, readonly=True,
+                              default=lambda self: self.env.user, index=True)
+    company_id = fields.Many2one('res.company', string='Company', required=True, readonly=True,
+                                 default=lambda self: self.env.company)
+    report_id = fields.Many2one('ir.actions.report', string='Report Action', required=True, readonly=True,
+                                ondelete='cascade')
+    res_ids = fields.Json(string='Records', readonly=True)
+    data = fields.Json(string='Report Data', readonly=True)
+    report_context = fields.Json(string='Report Context', readonly=True)
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', required=True, default='queued', readonly=True, index=True)
+    progress = fields.Integer(string='Progress', readonly=True)
+    attachment_id = fields.Many2one('ir.attachment', string='File', readonly=True, ondelete='set null')
+    error = fields.Text(string='Error', readonly=True)
+    date_done = fields.Datetime(string='Done On', readonly=True)
+    is_stale = fields.Boolean(compute='_compute_is_stale', string='Stale',
+                              help="Running for longer than the time limit of the crons, its worker was killed.")
+
+    @api.model
+    def _get_stale_date(self):
+        """ Returns the date before which a running job is stale: its progress was not updated
+        within the time limit of the crons, the worker was killed (time or memory limit, restart)
+        before it could record the failure. """
+        timeout = config.get('limit_time_real_cron') or -1
+        if timeout < 0:
+            timeout = config.get('limit_time_real') or 0
+        return fields.Datetime.now() - timedelta(seconds=timeout if timeout > 0 else STALE_JOB_TIMEOUT)
+
+    @api.depends('state', 'write_date')
+    def _compute_is_stale(self):
+        stale_date = self._get_stale_date()
+        for job in self:
+            job.is_stale = job.state == 'running' and bool(job.write_date) and job.write_date < stale_date
+
+    @api.model
+    def _enqueue(self, action):
+        """ Queue the rendering of a report action (as returned by ir.actions.report.report_action). """
+        report = self.env['ir.actions.report']._get_report_from_name(action['report_name'])
+        if not report:
+            raise UserError(_("The report %s can't be printed in the background.", action['report_name']))
+        # the data and context as the web client would send them back to render the report
+        context = json.loads(json.dumps(action.get('context') or {}, default=json_default))
+        data = json.loads(json.dumps(action.get('data'), default=json_default))
+        res_ids = context.get('active_ids') or []
+        job = self.create({
+            'name': action.get('name') or report.name,
+            'report_id': report.id,
+            'res_ids': res_ids,
+            'data': data,
+            'report_context': context,
+        })
+        self.env.ref('accounting_pdf_reports.account_report_job_cron')._trigger()
+        return job
+
+    def _set_progress(self, progress, **vals):
+        self.write(dict(vals, progress=progress))
+        self.env.cr.commit()
+
+    def _get_download_url(self):
+        return '/web/content/%s?download=true' % self.attachment_id.id
+
+    def _notify(self, message, notification_type):
+        self.user_id._bus_send('simple_notification', {
+            'type': notification_type,
+            'title': self.name,
+            'message': message,
+        })
+
+    def _run(self):
+        self.ensure_one()
+        self._set_progress(10, state='running')
+        report = self.report_id.with_context(self.report_context or {}).with_user(
+            self.user_id).with_company(self.company_id)
+        content, report_type = report._render(report.report_name, self.res_ids, data=self.data)
+        self._set_progress(90)
+        extension = 'pdf' if report_type in ('pdf', 'qweb-pdf') else report_type
+        attachment = self.env['ir.attachment'].create({
+            'name': '%s.%s' % (self.name, extension),
+            'raw': content,
+            'res_model': self._name,
+            'res_id': self.id,
+        })
+        self._set_progress(100, state='done', attachment_id=attachment.id, date_done=fields.Datetime.now())
+        self._notify(_("Your report is ready, download it from the Report Jobs or at %s",
+                       self.get_base_url() + self._get_download_url()), 'success')
+
+    @api.model
+    def _fail_stale_jobs(self):
+        """ Mark the stale running jobs failed, so that they can be retried. """
+        stale_jobs = self.search([('state', '=', 'running'), ('write_date', '<', self._get_stale_date())])
+        for job in stale_jobs:
+            _logger.warning("The report job %s was interrupted", job.id)
+            job._set_progress(0, state='failed', error=_("The printing was interrupted, it exceeded the time "
+                                                          "or memory limits of the server."))
+            job._notify(_("Your report could not be printed, it was interrupted."), 'danger')
+
+    @api.model
+    def _cron_run_jobs(self, limit=10):
+        self._fail_stale_jobs()
+        for dummy in range(limit):
+            # one job per transaction, several workers never take the same one
+            self.env.cr.execute("""
+                SELECT id FROM account_report_job
+                WHERE state = 'queued'
+                ORDER BY id
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            """)
+            row = self.env.cr.fetchone()
+            if not row:
+                return
+            job = self.browse(row[0])
+            try:
+                job._run()
+            except Exception as e:
+                self.env.cr.rollback()
+                _logger.exception("The report job %s failed", job.id)
+                job._set_progress(0, state='failed', error=str(e))
+                job._notify(_("Your report could not be printed: %s", e), 'danger')
+        if self.search_count([('state', '=', 'queued')], limit=1):
+            self.env.ref('accounting_pdf_reports.account_report_job_cron')._trigger()
+
+    def action_download(self):
+        self.ensure_one()
+        if not self.attachment_id:
+            raise UserError(_("The report is not printed yet."))
+        return {
+            'type': 'ir.actions.act_url',
+            'url': self._get_download_url(),
+            'target': 'self',
+        }
+
+    def action_retry(self):
+        self.filtered(lambda job: job.state == 'failed' or job.is_stale).write({'state': 'queued', 'error': False})
+        self.env.ref('accounting_pdf_reports.account_report_job_cron')._trigger()
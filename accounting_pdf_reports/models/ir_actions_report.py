@@ -0,0 +1,249 @@
+import io
+import json
+import logging
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+
+from lxml import html
+from reportlab.pdfgen import canvas
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+from odoo.tools import split_every
+from odoo.tools.pdf import PdfFileReader, PdfFileWriter
+
+from odoo.addons.base.models.ir_actions_report import _get_wkhtmltopdf_bin
+
+from .account_move_line import QUERY_GET_CACHE_KEY
+from .report_profile import ReportProfile
+
+_logger = logging.getLogger(__name__)
+
+# the partners or accounts printed per article, each article being a separate wkhtmltopdf body
+PDF_BATCH_SIZE = 200
+# the wkhtmltopdf processes rendering the articles of one report concurrently
+PDF_WORKERS = min(4, os.cpu_count() or 1)
+
+REPORT_PROFILE_KEY = 'accounting_pdf_reports.report_profile'
+# the reports which can be profiled, with the report_profile context key or the
+# accounting_pdf_reports.report_profiling system parameter
+PROFILED_REPORTS = ('accounting_pdf_reports.', 'om_account_daily_reports.')
+
+
+def _run_wkhtmltopdf_article(command_args, body, header=None, footer=None):
+    """ Returns the return code, the error output and the pdf of wkhtmltopdf run on one
+    article with the given arguments (see ir.actions.report._build_wkhtmltopdf_args). It
+    needs no cursor, the articles being rendered in threads. """
+    temporary_files = []
+
+    def write_file(content, prefix):
+        file_fd, file_path = tempfile.mkstemp(suffix='.html', prefix=prefix)
+        temporary_files.append(file_path)
+        with closing(os.fdopen(file_fd, 'wb')) as file:
+            file.write(content.encode())
+        return file_path
+
+    try:
+        files_command_args = []
+        if header:
+            files_command_args += ['--header-html', write_file(header, 'report.header.tmp.')]
+        if footer:
+            files_command_args += ['--footer-html', write_file(footer, 'report.footer.tmp.')]
+        body_path = write_file(body, 'report.body.tmp.')
+        pdf_fd, pdf_path = tempfile.mkstemp(suffix='.pdf', prefix='report.tmp.')
+        os.close(pdf_fd)
+        temporary_files.append(pdf_path)
+        process = subprocess.Popen(
+            [_get_wkhtmltopdf_bin()] + command_args + files_command_args + [body_path, pdf_path],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, encoding='utf-8')
+        dummy, err = process.communicate()
+        pdf = b''
+        if process.returncode in (0, 1):
+            with open(pdf_path, 'rb') as pdf_file:
+                pdf = pdf_file.read()
+        return process.returncode, err, pdf
+    finally:
+        for file_path in temporary_files:
+            try:
+                os.unlink(file_path)
+            except OSError:
+                _logger.error('Error when trying to remove file %s', file_path)
+
+
+class IrActionsReport(models.Model):
+    _inherit = "ir.actions.report"
+
+    @contextmanager
+    def _query_get_scope(self):
+        """ The move line filters compiled by _query_get are only memoized within the block,
+        e.g. the computation of the values of one report, outside of any other scope. """
+        if QUERY_GET_CACHE_KEY in self.env.cr.cache:
+            yield
+            return
+        self.env.cr.cache[QUERY_GET_CACHE_KEY] = {}
+        try:
+            yield
+        finally:
+            self.env.cr.cache.pop(QUERY_GET_CACHE_KEY, None)
+
+    def _get_rendering_context(self, report, docids, data):
+        with self._query_get_scope(), self._profile_phase('report_values'):
+            return super()._get_rendering_context(report, docids, data)
+
+    def _is_report_profiled(self, report_ref):
+        report = self._get_report(report_ref)
+        if not report.report_name or not report.report_name.startswith(PROFILED_REPORTS):
+            return False
+        return bool(self.env.context.get('report_profile') or self.env['ir.config_parameter'].sudo().get_param(
+            'accounting_pdf_reports.report_profiling'))
+
+    @contextmanager
+    def _profile_phase(self, phase):
+        """ Count the time spent in the block, and the queries executed in it, in the
+        given phase of the report being profiled, if any. """
+        profile = self.env.cr.cache.get(REPORT_PROFILE_KEY)
+        if not profile:
+            yield
+            return
+        with profile.measure(phase):
+            yield
+
+    def _profile_report(self, report_ref, render):
+        """ Returns render(), profiling the SQL queries, the computation of the report values,
+        the QWeb rendering and wkhtmltopdf when enabled for the report. """
+        if self.env.cr.cache.get(REPORT_PROFILE_KEY) or not self._is_report_profiled(report_ref):
+            return render()
+        report = self._get_report(report_ref)
+        profile = ReportProfile(report.report_name)
+        self.env.cr.cache[REPORT_PROFILE_KEY] = profile
+        try:
+            with profile.collect():
+                result = render()
+        finally:
+            self.env.cr.cache.pop(REPORT_PROFILE_KEY, None)
+        self._save_report_profile(report, profile)
+        return result
+
+    def _save_report_profile(self, report, profile):
+        _logger.info("Report profile: %s", json.dumps(profile.get_summary(), default=str))
+        self.env['ir.attachment'].sudo().create({
+            'name': 'profile_%s_%s.json' % (report.report_name, fields.Datetime.now().strftime('%Y%m%d_%H%M%S')),
+            'mimetype': 'application/json',
+            'raw': json.dumps(profile.get_summary(with_queries=True), default=str, indent=2).encode(),
+            'res_model': report._name,
+            'res_id': report.id,
+        })
+
+    def _render_qweb_pdf(self, report_ref, res_ids=None, data=None):
+        return self._profile_report(report_ref, lambda: super(IrActionsReport, self)._render_qweb_pdf(
+            report_ref, res_ids=res_ids, data=data))
+
+    def _render_qweb_html(self, report_ref, docids, data=None):
+        return self._profile_report(report_ref, lambda: super(IrActionsReport, self)._render_qweb_html(
+            report_ref, docids, data=data))
+
+    def _render_xlsx(self, report_ref, docids, data):
+        def render():
+            with self._query_get_scope(), self._profile_phase('xlsx'):
+                return super(IrActionsReport, self)._render_xlsx(report_ref, docids, data)
+        return self._profile_report(report_ref, render)
+
+    def _render_template(self, template, values=None):
+        with self._profile_phase('qweb'):
+            return super()._render_template(template, values=values)
+
+    @api.model
+    def _get_pdf_batches(self, items):
+        """ Split the partners or accounts of a report in the batches printed as separate
+        articles, rendered concurrently by _run_wkhtmltopdf. """
+        size = int(self.env['ir.config_parameter'].sudo().get_param(
+            'accounting_pdf_reports.pdf_batch_size', PDF_BATCH_SIZE))
+        if size <= 0:
+            return [list(items)]
+        return list(split_every(size, items, list)) or [[]]
+
+    def _get_pdf_workers(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param(
+            'accounting_pdf_reports.pdf_workers', PDF_WORKERS))
+
+    @api.model
+    def _strip_page_numbers(self, header):
+        """ Remove the wkhtmltopdf page numbers from a header or footer, the batches of a
+        report being numbered once merged (see _stamp_page_numbers). """
+        if not header:
+            return header
+        root = html.fromstring(header)
+        for node in root.xpath('//*[contains(concat(" ", normalize-space(@class), " "), " page ")'
+                               ' or contains(concat(" ", normalize-space(@class), " "), " topage ")]'):
+            if node.getparent() is None:
+                continue
+            # the text following a number is its separator, e.g. the " / " before the total
+            node.tail = None
+            node.drop_tree()
+        return html.tostring(root, encoding='unicode', doctype='<!DOCTYPE html>')
+
+    @api.model
+    def _stamp_page_numbers(self, pdfs):
+        """ Concatenate the given pdf contents, numbered "page / total" at their top right. """
+        readers = [PdfFileReader(io.BytesIO(pdf), strict=False) for pdf in pdfs]
+        total = sum(reader.getNumPages() for reader in readers)
+        writer = PdfFileWriter()
+        number = 0
+        for reader in readers:
+            for index in range(reader.getNumPages()):
+                number += 1
+                page = reader.getPage(index)
+                box = getattr(page, 'mediabox', None) or page.mediaBox
+                width, height = float(box[2]) - float(box[0]), float(box[3]) - float(box[1])
+                overlay = io.BytesIO()
+                pdf_canvas = canvas.Canvas(overlay, pagesize=(width, height))
+                pdf_canvas.setFont('Helvetica', 8)
+                pdf_canvas.drawRightString(width - 28, height - 20, '%s / %s' % (number, total))
+                pdf_canvas.save()
+                page.mergePage(PdfFileReader(overlay, strict=False).getPage(0))
+                writer.addPage(page)
+        stream = io.BytesIO()
+        writer.write(stream)
+        return stream.getvalue()
+
+    def _run_wkhtmltopdf(self, bodies, report_ref=False, header=None, footer=None, landscape=False,
+                         specific_paperformat_args=None, set_viewport_size=False):
+        with self._profile_phase('wkhtmltopdf'):
+            return self._run_wkhtmltopdf_batches(
+                bodies, report_ref=report_ref, header=header, footer=footer, landscape=landscape,
+                specific_paperformat_args=specific_paperformat_args, set_viewport_size=set_viewport_size)
+
+    def _run_wkhtmltopdf_batches(self, bodies, report_ref=False, header=None, footer=None, landscape=False,
+                                 specific_paperformat_args=None, set_viewport_size=False):
+        """ Render the articles of the large accounting reports in concurrent wkhtmltopdf
+        processes, each process holding the html of a few partners or accounts only. """
+        report = self._get_report(report_ref) if report_ref else self.env['ir.actions.report']
+        workers = self._get_pdf_workers()
+        if (len(bodies) < 2 or workers < 2
+                or not report.report_name or not report.report_name.startswith('accounting_pdf_reports.')):
+            return super()._run_wkhtmltopdf(
+                bodies, report_ref=report_ref, header=header, footer=footer, landscape=landscape,
+                specific_paperformat_args=specific_paperformat_args, set_viewport_size=set_viewport_size)
+
+        header = self._strip_page_numbers(header)
+        footer = self._strip_page_numbers(footer)
+        # the paper format is read once, the threads only run wkhtmltopdf
+        command_args = self._build_wkhtmltopdf_args(
+            report.get_paperformat(), landscape, specific_paperformat_args=specific_paperformat_args,
+            set_viewport_size=set_viewport_size)
+
+        _logger.info("Rendering the %s articles of %s with %s wkhtmltopdf processes",
+                     len(bodies), report.report_name, workers)
+        with ThreadPoolExecutor(max_workers=min(workers, len(bodies))) as executor:
+            results = list(executor.map(
+                lambda body: _run_wkhtmltopdf_article(command_args, body, header=header, footer=footer), bodies))
+        for returncode, err, pdf in results:
+            if returncode not in (0, 1):
+                raise UserError(_("Wkhtmltopdf failed (error code: %(error_code)s). Message: %(message)s",
+                                  error_code=returncode, message=err[-1000:]))
+            if not pdf:
+                raise UserError(_("Wkhtmltopdf produced an empty pdf: %s", err[-1000:]))
+        return self._stamp_page_numbers([pdf for dummy, dummy, pdf in results])
@@ -0,0 +1,90 @@
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# the modules whose functions are reported as the callers of the queries
+PROFILED_MODULES = ('odoo.addons.accounting_pdf_reports.', 'odoo.addons.om_account_daily_reports.')
+# the slowest queries kept in the log line, the attachment has all of them
+PROFILE_LOG_QUERIES = 10
+
+
+def _get_caller():
+    """ Returns the first function of the profiled modules in the current stack. """
+    frame = sys._getframe(2)
+    while frame:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith(PROFILED_MODULES) and module != __name__:
+            return '%s.%s:%s' % (module.rsplit('.', 1)[-1], frame.f_code.co_name, frame.f_lineno)
+        frame = frame.f_back
+    return None
+
+
+class ReportProfile:
+    """ Timings of the rendering of a report: the SQL queries executed by the current thread,
+    and the time spent in each phase of the rendering (see ir.actions.report._profile_phase). """
+
+    def __init__(self, report_name):
+        self.report_name = report_name
+        self.queries = []
+        self.phases = defaultdict(float)
+        self.phase = 'other'
+        self.start = time.perf_counter()
+        self.duration = 0.0
+
+    def _hook(self, cr, query, params, start, delay):
+        self.queries.append({
+            'query': query.decode() if isinstance(query, bytes) else str(query),
+            'duration': round(delay, 6),
+            'rows': cr.rowcount,
+            'caller': _get_caller(),
+            'phase': self.phase,
+        })
+
+    @contextmanager
+    def collect(self):
+        thread = threading.current_thread()
+        if not hasattr(thread, 'query_hooks'):
+            thread.query_hooks = []
+        thread.query_hooks.append(self._hook)
+        try:
+            yield self
+        finally:
+            thread.query_hooks.remove(self._hook)
+            self.duration = time.perf_counter() - self.start
+
+    @contextmanager
+    def measure(self, phase):
+        previous, self.phase = self.phase, phase
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[phase] += time.perf_counter() - start
+            self.phase = previous
+
+    def get_hot_queries(self):
+        """ Returns the queries grouped by caller and text, the slowest first. """
+        groups = {}
+        for query in self.queries:
+            group = groups.setdefault((query['caller'], query['query']), {
+                'caller': query['caller'], 'query': query['query'], 'count': 0, 'duration': 0.0, 'rows': 0,
+            })
+            group['count'] += 1
+            group['duration'] += query['duration']
+            group['rows'] += max(query['rows'], 0)
+        return sorted(groups.values(), key=lambda group: group['duration'], reverse=True)
+
+    def get_summary(self, with_queries=False):
+        summary = {
+            'report': self.report_name,
+            'duration': round(self.duration, 6),
+            'phases': {phase: round(duration, 6) for phase, duration in self.phases.items()},
+            'query_count': len(self.queries),
+            'query_duration': round(sum(query['duration'] for query in self.queries), 6),
+            'hot_queries': self.get_hot_queries()[:None if with_queries else PROFILE_LOG_QUERIES],
+        }
+        if with_queries:
+            summary['queries'] = self.queries
+        return summary
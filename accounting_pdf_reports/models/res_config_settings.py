@@ -0,0 +1,39 @@
+from odoo import fields, models, _
+
+
+class ResConfigSettings(models.TransientModel):
+    _inherit = 'res.config.settings'
+
+    account_report_profiling = fields.Boolean(
+        string='Profile Accounting Reports', config_parameter='accounting_pdf_reports.report_profiling',
+        help="Log the SQL queries, QWeb and wkhtmltopdf timings of every accounting report printed, "
+             "and attach them to the report action as a JSON file.")
+
+    def action_rebuild_daily_balances(self):
+        self.env['account.move.line.balance'].sudo().rebuild()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'success',
+                'message': _("The journal items daily balances have been rebuilt."),
+            },
+        }
+
+    def action_check_daily_balances(self):
+        keys = self.env['account.move.line.balance'].sudo().check_consistency()
+        if keys:
+            notification = {
+                'type': 'warning',
+                'message': _("%s daily balances are out of date, rebuild them.", len(keys)),
+            }
+        else:
+            notification = {
+                'type': 'success',
+                'message': _("The journal items daily balances are up to date."),
+            }
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': notification,
+        }
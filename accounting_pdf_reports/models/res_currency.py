@@ -0,0 +1,59 @@
+from odoo import api, fields, models
+
+RATE_CACHE_KEY = 'accounting_pdf_reports.conversion_rates'
+
+
+class ResCurrency(models.Model):
+    _inherit = "res.currency"
+
+    def _get_cached_conversion_rate(self, to_currency, company, date):
+        """ Returns the conversion rate from self to to_currency, the rate
+        lookups being shared by all the conversions of the current transaction
+        with the same (from currency, to currency, company, date) key."""
+        cache = self.env.cr.cache.setdefault(RATE_CACHE_KEY, {})
+        key = (self.id, to_currency.id, company.id, fields.Date.to_date(date))
+        if key not in cache:
+            cache[key] = self._get_conversion_rate(self, to_currency, company, date)
+        return cache[key]
+
+    def _convert_cached(self, from_amount, to_currency, company=None, date=None, round=True):
+        """ Same as _convert but using the transaction wide rate cache. """
+        self, to_currency = self or to_currency, to_currency or self
+        if not company:
+            company = self.env.company
+        if not date:
+            date = fields.Date.context_today(self)
+        if not from_amount:
+            return 0.0
+        to_amount = from_amount * self._get_cached_conversion_rate(to_currency, company, date)
+        return to_currency.round(to_amount) if round else to_amount
+
+
+class ResCurrencyRate(models.Model):
+    _inherit = "res.currency.rate"
+
+    def _clear_cached_conversion_rates(self):
+        self.env.cr.cache.pop(RATE_CACHE_KEY, None)
+        # the amounts of the cached reports are converted with the rates, the rates
+        # without company being used by all the companies
+        if self.filtered(lambda rate: not rate.company_id):
+            self.env['account.report.cache.event']._log_company_changes()
+        elif self:
+            self.env['account.report.cache.event']._log_company_changes(self.company_id.ids)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        rates = super().create(vals_list)
+        rates._clear_cached_conversion_rates()
+        return rates
+
+    def write(self, vals):
+        self._clear_cached_conversion_rates()
+        res = super().write(vals)
+        if 'company_id' in vals:
+            self._clear_cached_conversion_rates()
+        return res
+
+    def unlink(self):
+        self._clear_cached_conversion_rates()
+        return super().unlink()
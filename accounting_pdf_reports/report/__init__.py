@@ -1,7 +1,10 @@
 from . import report_partner_ledger
+from . import report_partner_ledger_xlsx
 from . import report_general_ledger
+from . import report_general_ledger_xlsx
 from . import report_trial_balance
 from . import report_tax
+from . import report_tax_xlsx
 from . import report_aged_partner
 from . import report_journal
 from . import report_financial
@@ -10,12 +10,7 @@ class ReportAgedPartnerBalance(models.AbstractModel):
     _name = 'report.accounting_pdf_reports.report_agedpartnerbalance'
     _description = 'Aged Partner Balance Report'
 
-    def _get_partner_move_lines(self, account_type, partner_ids,
-                                date_from, target_move, period_length):
-        # This method can receive the context key 'include_nullified_amount' {Boolean}
-        # Do an invoice and a payment and unreconcile. The amount will be nullified
-        # By default, the partner wouldn't appear in this report.
-        # The context key allow it to appear
+    def _get_periods(self, date_from, period_length):
         # In case of a period_length of 30 days as of 2019-02-08, we want the following periods:
         # Name       Stop         Start
         # 1 - 30   : 2019-02-07 - 2019-01-09
@@ -25,7 +20,6 @@ class ReportAgedPartnerBalance(models.AbstractModel):
         # +120     : 2018-10-10
         periods = {}
         start = datetime.strptime(str(date_from), "%Y-%m-%d")
-        date_from = datetime.strptime(str(date_from), "%Y-%m-%d").date()
         for i in range(5)[::-1]:
             stop = start - relativedelta(days=period_length)
             period_name = str((5-(i+1)) * period_length + 1) + '-' + str((5-i) * period_length)
@@ -38,6 +32,32 @@ class ReportAgedPartnerBalance(models.AbstractModel):
                 'start': (i!=0 and stop.strftime('%Y-%m-%d') or False),
             }
             start = stop
+        return periods
+
+    def _get_reconciliation_clause(self, date_from):
+        """ Returns the sql clause (and its arguments) selecting the move lines
+        that were still open at date_from: the unreconciled ones and the ones
+        reconciled after that date.
+
+        The lines reconciled after date_from are matched with semi-joins on
+        account_partial_reconcile (see the (debit_move_id, max_date) and
+        (credit_move_id, max_date) indexes created by account.partial.reconcile)
+        rather than by inlining their ids, which could be millions of values for
+        back-dated reports."""
+        return '''(l.reconciled IS FALSE
+                 OR EXISTS (SELECT 1 FROM account_partial_reconcile apr
+                            WHERE apr.debit_move_id = l.id AND apr.max_date > %s)
+                 OR EXISTS (SELECT 1 FROM account_partial_reconcile apr
+                            WHERE apr.credit_move_id = l.id AND apr.max_date > %s))''', (date_from, date_from)
+
+    def _get_partner_move_lines(self, account_type, partner_ids,
+                                date_from, target_move, period_length):
+        # This method can receive the context key 'include_nullified_amount' {Boolean}
+        # Do an invoice and a payment and unreconcile. The amount will be nullified
+        # By default, the partner wouldn't appear in this report.
+        # The context key allow it to appear
+        periods = self._get_periods(date_from, period_length)
+        date_from = datetime.strptime(str(date_from), "%Y-%m-%d").date()
 
         res = []
         total = []
@@ -53,14 +73,8 @@ class ReportAgedPartnerBalance(models.AbstractModel):
             move_state = ['posted']
         arg_list = (tuple(move_state), tuple(account_type))
 
-        reconciliation_clause = '(l.reconciled IS FALSE)'
-        cr.execute('SELECT debit_move_id, credit_move_id FROM account_partial_reconcile where max_date > %s', (date_from,))
-        reconciled_after_date = []
-        for row in cr.fetchall():
-            reconciled_after_date += [row[0], row[1]]
-        if reconciled_after_date:
-            reconciliation_clause = '(l.reconciled IS FALSE OR l.id IN %s)'
-            arg_list += (tuple(reconciled_after_date),)
+        reconciliation_clause, reconciliation_args = self._get_reconciliation_clause(date_from)
+        arg_list += reconciliation_args
         arg_list += (date_from, tuple(company_ids))
         query = '''
             SELECT DISTINCT l.partner_id, UPPER(res_partner.name)
@@ -105,23 +119,23 @@ class ReportAgedPartnerBalance(models.AbstractModel):
             partner_id = line.partner_id.id or False
             if partner_id not in undue_amounts:
                 undue_amounts[partner_id] = 0.0
-            line_amount = line.company_id.currency_id._convert(line.balance,
-                                                               user_currency,
-                                                               company, date)
+            line_amount = line.company_id.currency_id._convert_cached(line.balance,
+                                                                      user_currency,
+                                                                      company, date)
             if user_currency.is_zero(line_amount):
                 continue
             for partial_line in line.matched_debit_ids:
                 if partial_line.max_date <= date_from:
                     line_currency = partial_line.company_id.currency_id
-                    line_amount += line_currency._convert(partial_line.amount,
-                                                          user_currency,
-                                                          company, date)
+                    line_amount += line_currency._convert_cached(partial_line.amount,
+                                                                 user_currency,
+                                                                 company, date)
             for partial_line in line.matched_credit_ids:
                 if partial_line.max_date <= date_from:
                     line_currency = partial_line.company_id.currency_id
-                    line_amount -= line_currency._convert(partial_line.amount,
-                                                          user_currency,
-                                                          company, date)
+                    line_amount -= line_currency._convert_cached(partial_line.amount,
+                                                                 user_currency,
+                                                                 company, date)
             if not self.env.user.company_id.currency_id.is_zero(line_amount):
                 undue_amounts[partner_id] += line_amount
                 lines[partner_id].append({
@@ -166,18 +180,18 @@ class ReportAgedPartnerBalance(models.AbstractModel):
                 if partner_id not in partners_amount:
                     partners_amount[partner_id] = 0.0
                 line_currency_id = line.company_id.currency_id
-                line_amount = line_currency_id._convert(line.balance, user_currency, company, date)
+                line_amount = line_currency_id._convert_cached(line.balance, user_currency, company, date)
                 if user_currency.is_zero(line_amount):
                     continue
                 for partial_line in line.matched_debit_ids:
                     if partial_line.max_date <= date_from:
                         line_currency_id = partial_line.company_id.currency_id
-                        line_amount += line_currency_id._convert(
+                        line_amount += line_currency_id._convert_cached(
                             partial_line.amount, user_currency, company, date)
                 for partial_line in line.matched_credit_ids:
                     if partial_line.max_date <= date_from:
                         line_currency_id = partial_line.company_id.currency_id
-                        line_amount -= line_currency_id._convert(
+                        line_amount -= line_currency_id._convert_cached(
                             partial_line.amount, user_currency, company, date)
                 if not self.env.user.company_id.currency_id.is_zero(line_amount):
                     partners_amount[partner_id] += line_amount
@@ -231,8 +245,144 @@ class ReportAgedPartnerBalance(models.AbstractModel):
 
         return res, total, lines
 
+    def _get_partner_move_amounts(self, account_type, partner_ids,
+                                  date_from, target_move, period_length):
+        """ Set based variant of _get_partner_move_lines: the open amount of
+        every line at date_from (its balance minus the partial reconciliations
+        dated on or before date_from) is assigned to its ageing period and summed
+        per partner in a single query, instead of browsing every move line.
+
+        Returns the same (res, total, lines) triple, except that `lines` holds
+        for every partner one {'amount', 'period', 'count'} entry per non empty
+        period instead of one entry per move line: there is no 'line' key. The
+        periods are numbered as in _get_partner_move_lines, 1 to 5 for the
+        periods 0 to 4 of _get_periods and 6 for the not due amounts.
+        """
+        periods = self._get_periods(date_from, period_length)
+        date_from = datetime.strptime(str(date_from), "%Y-%m-%d").date()
+
+        res = []
+        total = [0] * 7
+        cr = self.env.cr
+        user_company = self.env.user.company_id
+        user_currency = user_company.currency_id
+        company_ids = self._context.get('company_ids') or [user_company.id]
+        move_state = ['draft', 'posted']
+        date = self._context.get('date') or fields.Date.today()
+        company = self.env['res.company'].browse(self._context.get('company_id')) or self.env.company
+
+        if target_move == 'posted':
+            move_state = ['posted']
+        reconciliation_clause, reconciliation_args = self._get_reconciliation_clause(date_from)
+        arg_list = (tuple(move_state), tuple(account_type)) + reconciliation_args + (date_from, tuple(company_ids))
+        query = '''
+            SELECT DISTINCT l.partner_id, UPPER(res_partner.name)
+            FROM account_move_line AS l left join res_partner on l.partner_id = res_partner.id, account_account, account_move am
+            WHERE (l.account_id = account_account.id)
+                AND (l.move_id = am.id)
+                AND (am.state IN %s)
+                AND (account_account.account_type IN %s)
+                AND ''' + reconciliation_clause + '''
+                AND (l.date <= %s)
+                AND l.company_id IN %s
+            ORDER BY UPPER(res_partner.name)'''
+        cr.execute(query, arg_list)
+        partners = cr.dictfetchall()
+
+        if not partner_ids:
+            partner_ids = [partner['partner_id'] for partner in partners if partner['partner_id']]
+        lines = dict((partner['partner_id'] or False, []) for partner in partners)
+        if not partner_ids:
+            return [], [], {}
+
+        # Period 6 holds the not due amounts, the others follow the keys of periods
+        period_case = 'CASE WHEN COALESCE(l.date_maturity, l.date) >= %s THEN 6'
+        period_args = (date_from,)
+        for i in range(1, 5)[::-1]:
+            period_case += ' WHEN COALESCE(l.date_maturity, l.date) >= %s THEN ' + str(i)
+            period_args += (periods[str(i)]['start'],)
+        period_case += ' ELSE 0 END'
+
+        query = '''
+            SELECT aged.partner_id, aged.company_id, aged.period,
+                   SUM(aged.amount) AS amount, COUNT(*) AS count
+            FROM (
+                SELECT l.partner_id, l.company_id, ''' + period_case + ''' AS period,
+                       l.balance
+                       + COALESCE((SELECT SUM(pr.amount) FROM account_partial_reconcile pr
+                                   WHERE pr.credit_move_id = l.id AND pr.max_date <= %s), 0)
+                       - COALESCE((SELECT SUM(pr.amount) FROM account_partial_reconcile pr
+                                   WHERE pr.debit_move_id = l.id AND pr.max_date <= %s), 0) AS amount
+                FROM account_move_line AS l, account_account, account_move am
+                WHERE (l.account_id = account_account.id) AND (l.move_id = am.id)
+                    AND (am.state IN %s)
+                    AND (account_account.account_type IN %s)
+                    AND ((l.partner_id IN %s) OR (l.partner_id IS NULL))
+                    AND ''' + reconciliation_clause + '''
+                    AND (l.date <= %s)
+                    AND l.company_id IN %s
+            ) AS aged
+            WHERE aged.amount != 0
+            GROUP BY aged.partner_id, aged.company_id, aged.period'''
+        cr.execute(query, period_args + (date_from, date_from, tuple(move_state), tuple(account_type),
+                                         tuple(partner_ids)) + reconciliation_args + (date_from, tuple(company_ids)))
+
+        # history[period] = {'<partner_id>': <partner_debit-credit>}, period 6 being the not due amounts
+        history = {period: {} for period in range(7)}
+        for row in cr.dictfetchall():
+            partner_id = row['partner_id'] or False
+            line_currency = self.env['res.company'].browse(row['company_id']).currency_id
+            amount = line_currency._convert_cached(row['amount'], user_currency, company, date)
+            lines.setdefault(partner_id, []).append({
+                'amount': amount,
+                'period': row['period'] if row['period'] == 6 else row['period'] + 1,
+                'count': row['count'],
+            })
+            if not user_currency.is_zero(amount):
+                partner_amounts = history[row['period']]
+                partner_amounts[partner_id] = partner_amounts.get(partner_id, 0.0) + amount
+
+        browsed_partners = {
+            browsed_partner.id: browsed_partner for browsed_partner in self.env['res.partner'].browse(
+                [partner['partner_id'] for partner in partners if partner['partner_id']])
+        }
+        for partner in partners:
+            partner_id = partner['partner_id'] or False
+            at_least_one_amount = False
+            values = {'direction': history[6].get(partner_id, 0.0)}
+            total[6] += values['direction']
+            if not float_is_zero(values['direction'], precision_rounding=user_currency.rounding):
+                at_least_one_amount = True
+            for i in range(5):
+                values[str(i)] = history[i].get(partner_id, 0.0)
+                total[i] += values[str(i)]
+                if not float_is_zero(values[str(i)], precision_rounding=user_currency.rounding):
+                    at_least_one_amount = True
+            values['total'] = sum([values['direction']] + [values[str(i)] for i in range(5)])
+            total[5] += values['total']
+            values['partner_id'] = partner_id
+            if partner_id:
+                browsed_partner = browsed_partners[partner_id]
+                values['name'] = browsed_partner.name and len(
+                    browsed_partner.name) >= 45 and browsed_partner.name[
+                                                    0:40] + '...' or browsed_partner.name
+                values['trust'] = browsed_partner.trust
+            else:
+                values['name'] = _('Unknown Partner')
+                values['trust'] = False
+
+            if at_least_one_amount or (self._context.get('include_nullified_amount') and lines[partner_id]):
+                res.append(values)
+
+        return res, total, lines
+
     @api.model
     def _get_report_values(self, docids, data=None):
+        return self.env['account.report.cache']._get_report_values(
+            self, docids, data, self._compute_report_values)
+
+    @api.model
+    def _compute_report_values(self, docids, data=None):
         if not data.get('form') or not self.env.context.get('active_model') or not self.env.context.get('active_id'):
             raise UserError(_("Form content is missing, this report cannot be printed."))
 
@@ -249,7 +399,7 @@ class ReportAgedPartnerBalance(models.AbstractModel):
         else:
             account_type = ['asset_receivable', 'liability_payable']
         partner_ids = data['form']['partner_ids']
-        movelines, total, dummy = self._get_partner_move_lines(
+        movelines, total, dummy = self._get_partner_move_amounts(
             account_type, partner_ids, date_from, target_move, data['form']['period_length']
         )
         return {
@@ -19,7 +19,10 @@ class ReportFinancial(models.AbstractModel):
         res = {}
         for account in accounts:
             res[account.id] = dict.fromkeys(mapping, 0.0)
-        if accounts:
+        balances = self.env['account.move.line.balance']._read_balances(accounts)
+        if balances is not None:
+            res.update(balances)
+        elif accounts:
             tables, where_clause, where_params = self.env['account.move.line']._query_get()
             tables = tables.replace('"', '') if tables else "account_move_line"
             wheres = [""]
@@ -37,64 +40,222 @@ class ReportFinancial(models.AbstractModel):
                 res[row['id']] = row
         return res
 
-    def _compute_report_balance(self, reports):
+    def _get_period_condition(self, context, accounts, alias='account_move_line'):
+        """ returns the sql condition (and its parameters) restricting account_move_line (or the
+            table of the given alias) to the dates of the given context, following the date rules
+            of account.move.line._query_get
+        """
+        conditions = []
+        params = []
+        if context.get('date_to'):
+            conditions.append(alias + ".date <= %s")
+            params.append(context['date_to'])
+        if context.get('date_from'):
+            if not context.get('strict_range'):
+                initial_balance_accounts = accounts.filtered('include_initial_balance')
+                conditions.append("(" + alias + ".date >= %s OR " + alias + ".account_id IN %s)")
+                params += [context['date_from'], tuple(initial_balance_accounts.ids) or (None,)]
+            elif context.get('initial_bal'):
+                conditions.append(alias + ".date < %s")
+                params.append(context['date_from'])
+            else:
+                conditions.append(alias + ".date >= %s")
+                params.append(context['date_from'])
+        return "(" + (" AND ".join(conditions) or "TRUE") + ")", params
+
+    def _compute_account_balance_periods(self, accounts, period_contexts):
+        """ compute the balance, debit and credit for the provided accounts over several periods,
+            each period being given by the date keys of a context (date_from, date_to, strict_range,
+            initial_bal).
+
+            When the contexts only differ by their dates, all the periods are computed by the same
+            scan of account_move_line, one conditional aggregate per period.
+
+            :returns: a dictionary with key=the ID of an account and value=the list of the credit,
+                      debit and balance of the account, in the order of period_contexts
+        """
+        period_keys = ('date_from', 'date_to', 'strict_range', 'initial_bal', 'lang')
+        filter_contexts = [
+            {key: value for key, value in (context or {}).items() if key not in period_keys}
+            for context in period_contexts
+        ]
+        if any(filter_context != filter_contexts[0] for filter_context in filter_contexts):
+            # the periods are not filtered the same way, compute them one by one
+            res = {account.id: [] for account in accounts}
+            for context in period_contexts:
+                period_res = self.with_context(context or {})._compute_account_balance(accounts)
+                for account_id, value in period_res.items():
+                    res[account_id].append(value)
+            return res
+
+        res = {}
+        for account in accounts:
+            res[account.id] = [dict.fromkeys(['balance', 'debit', 'credit'], 0.0) for context in period_contexts]
+        DailyBalance = self.env['account.move.line.balance'].with_context(filter_contexts[0])
+        if accounts and DailyBalance._can_read_balances():
+            # same conditional aggregates, on the pre-aggregated daily balances
+            conditions, where_params = DailyBalance._get_balance_conditions(accounts, with_dates=False)
+            aggregates = []
+            aggregate_params = []
+            period_conditions = []
+            period_params = []
+            for index, context in enumerate(period_contexts):
+                condition, params = self._get_period_condition(context or {}, accounts, alias='b')
+                aggregates += [
+                    "COALESCE(SUM(b.debit) FILTER (WHERE " + condition + "), 0) as debit_" + str(index),
+                    "COALESCE(SUM(b.credit) FILTER (WHERE " + condition + "), 0) as credit_" + str(index),
+                ]
+                aggregate_params += params + params
+                period_conditions.append(condition)
+                period_params += params
+            DailyBalance.flush_model()
+            request = "SELECT b.account_id as id, " + ', '.join(aggregates) + \
+                       " FROM account_move_line_balance b" + \
+                       " WHERE (" + " OR ".join(period_conditions) + ") AND " + " AND ".join(conditions) + \
+                       " GROUP BY b.account_id"
+            params = tuple(aggregate_params) + tuple(period_params) + tuple(where_params)
+            self.env.cr.execute(request, params)
+            for row in self.env.cr.dictfetchall():
+                for index in range(len(period_contexts)):
+                    debit = row['debit_' + str(index)]
+                    credit = row['credit_' + str(index)]
+                    res[row['id']][index] = {'debit': debit, 'credit': credit, 'balance': debit - credit}
+        elif accounts:
+            tables, where_clause, where_params = self.env['account.move.line'].with_context(
+                filter_contexts[0])._query_get()
+            tables = tables.replace('"', '') if tables else "account_move_line"
+            wheres = [""]
+            if where_clause.strip():
+                wheres.append(where_clause.strip())
+            filters = " AND ".join(wheres)
+            aggregates = []
+            aggregate_params = []
+            period_conditions = []
+            period_params = []
+            for index, context in enumerate(period_contexts):
+                condition, params = self._get_period_condition(context or {}, accounts)
+                aggregates += [
+                    "COALESCE(SUM(debit) FILTER (WHERE " + condition + "), 0) as debit_" + str(index),
+                    "COALESCE(SUM(credit) FILTER (WHERE " + condition + "), 0) as credit_" + str(index),
+                ]
+                aggregate_params += params + params
+                period_conditions.append(condition)
+                period_params += params
+            request = "SELECT account_id as id, " + ', '.join(aggregates) + \
+                       " FROM " + tables + \
+                       " WHERE account_id IN %s AND (" + " OR ".join(period_conditions) + ") " \
+                            + filters + \
+                       " GROUP BY account_id"
+            params = tuple(aggregate_params) + (tuple(accounts._ids),) + tuple(period_params) + tuple(where_params)
+            self.env.cr.execute(request, params)
+            for row in self.env.cr.dictfetchall():
+                for index in range(len(period_contexts)):
+                    debit = row['debit_' + str(index)]
+                    credit = row['credit_' + str(index)]
+                    res[row['id']][index] = {'debit': debit, 'credit': credit, 'balance': debit - credit}
+        return res
+
+    def _get_report_accounts(self, reports):
+        '''returns a dictionary with key=the ID of a record and value=the accounts it sums, for the given
+           records and all the records their balance depends on (children and linked reports).'''
+        report_accounts = {}
+        type_reports = self.env['account.financial.report']
+        todo = list(reports)
+        while todo:
+            report = todo.pop()
+            if report.id in report_accounts:
+                continue
+            report_accounts[report.id] = self.env['account.account']
+            if report.type == 'accounts':
+                report_accounts[report.id] = report.account_ids
+            elif report.type == 'account_type':
+                type_reports |= report
+            elif report.type == 'account_report' and report.account_report_id:
+                todo.append(report.account_report_id)
+            elif report.type == 'sum':
+                todo.extend(report.children_ids)
+        if type_reports:
+            # one search for the leaf accounts of all the account types used in the tree
+            accounts = self.env['account.account'].search(
+                [('account_type', 'in', type_reports.account_type_ids.mapped('type'))])
+            for report in type_reports:
+                account_types = report.account_type_ids.mapped('type')
+                report_accounts[report.id] = accounts.filtered(lambda a: a.account_type in account_types)
+        return report_accounts
+
+    def _compute_report_balance(self, reports, report_accounts=None, account_balances=None):
         '''returns a dictionary with key=the ID of a record and value=the credit, debit and balance amount
-           computed for this record. If the record is of type :
-               'accounts' : it's the sum of the linked accounts
-               'account_type' : it's the sum of leaf accoutns with such an account_type
-               'account_report' : it's the amount of the related report
-               'sum' : it's the sum of the children of this record (aka a 'view' record)'''
+           computed for this record. If the record is of type :
+               'accounts' : it's the sum of the linked accounts
+               'account_type' : it's the sum of leaf accoutns with such an account_type
+               'account_report' : it's the amount of the related report
+               'sum' : it's the sum of the children of this record (aka a 'view' record)
+
+           The balances of all the accounts used by the records (and the records they depend on) are fetched
+           with one query, then summed up the tree in memory.'''
+        if report_accounts is None:
+            report_accounts = self._get_report_accounts(reports)
+        if account_balances is None:
+            accounts = self.env['account.account'].union(*report_accounts.values())
+            account_balances = self._compute_account_balance(accounts)
         res = {}
         fields = ['credit', 'debit', 'balance']
         for report in reports:
             if report.id in res:
                 continue
             res[report.id] = dict((fn, 0.0) for fn in fields)
-            if report.type == 'accounts':
-                # it's the sum of the linked accounts
-                res[report.id]['account'] = self._compute_account_balance(report.account_ids)
-                for value in res[report.id]['account'].values():
-                    for field in fields:
-                        res[report.id][field] += value.get(field)
-            elif report.type == 'account_type':
-                # it's the sum the leaf accounts with such an account type
-                accounts = self.env['account.account'].search(
-                    [('account_type', 'in', report.account_type_ids.mapped('type'))])
-
-                res[report.id]['account'] = self._compute_account_balance(accounts)
+            if report.type in ('accounts', 'account_type'):
+                # it's the sum of the linked accounts, or of the leaf accounts with such an account type
+                res[report.id]['account'] = {
+                    account.id: dict(account_balances[account.id]) for account in report_accounts[report.id]
+                }
                 for value in res[report.id]['account'].values():
                     for field in fields:
                         res[report.id][field] += value.get(field)
             elif report.type == 'account_report' and report.account_report_id:
                 # it's the amount of the linked report
-                res2 = self._compute_report_balance(report.account_report_id)
+                res2 = self._compute_report_balance(report.account_report_id, report_accounts, account_balances)
                 for key, value in res2.items():
                     for field in fields:
                         res[report.id][field] += value[field]
             elif report.type == 'sum':
                 # it's the sum of the children of this account.report
-                res2 = self._compute_report_balance(report.children_ids)
+                res2 = self._compute_report_balance(report.children_ids, report_accounts, account_balances)
                 for key, value in res2.items():
                     for field in fields:
                         res[report.id][field] += value[field]
         return res
 
+    def _compute_report_balance_periods(self, reports, period_contexts):
+        '''returns the result of _compute_report_balance for each of the given period contexts (e.g. the
+           current and the comparison periods, or the twelve months of a year), in the same order, the
+           balances of the accounts of all the periods being fetched together.'''
+        report_accounts = self._get_report_accounts(reports)
+        accounts = self.env['account.account'].union(*report_accounts.values())
+        account_balances = self._compute_account_balance_periods(accounts, period_contexts)
+        return [
+            self._compute_report_balance(reports, report_accounts, {
+                account_id: balances[index] for account_id, balances in account_balances.items()
+            })
+            for index in range(len(period_contexts))
+        ]
+
     def get_account_lines(self, data):
         lines = []
         account_report = self.env['account.financial.report'].search(
             [('id', '=', data['account_report_id'][0])])
         child_reports = account_report._get_children_by_order()
-        res = self.with_context(data.get('used_context'))._compute_report_balance(child_reports)
         if data['enable_filter']:
-            comparison_res = self.with_context(
-                data.get('comparison_context'))._compute_report_balance(
-                child_reports)
+            res, comparison_res = self._compute_report_balance_periods(
+                child_reports, [data.get('used_context'), data.get('comparison_context')])
             for report_id, value in comparison_res.items():
                 res[report_id]['comp_bal'] = value['balance']
                 report_acc = res[report_id].get('account')
                 if report_acc:
                     for account_id, val in comparison_res[report_id].get('account').items():
                         report_acc[account_id]['comp_bal'] = val['balance']
+        else:
+            res = self.with_context(data.get('used_context'))._compute_report_balance(child_reports)
         for report in child_reports:
             vals = {
                 'name': report.name,
@@ -147,6 +308,11 @@ class ReportFinancial(models.AbstractModel):
 
     @api.model
     def _get_report_values(self, docids, data=None):
+        return self.env['account.report.cache']._get_report_values(
+            self, docids, data, self._compute_report_values)
+
+    @api.model
+    def _compute_report_values(self, docids, data=None):
         if not data.get('form') or not self.env.context.get('active_model') or not self.env.context.get('active_id'):
             raise UserError(_("Form content is missing, this report cannot be printed."))
 
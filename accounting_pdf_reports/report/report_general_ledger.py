@@ -3,10 +3,144 @@ from odoo import api, models, _
 from odoo.exceptions import UserError
 
 
+# the share of every analytic account "aa" of the sections in the amounts of a move line "l"
+ANALYTIC_SHARES_JOIN = """
+            JOIN LATERAL (
+                SELECT dist.account_id::int AS analytic_account_id, SUM(dist.rate) / 100 AS rate
+                FROM (
+                    SELECT unnest(string_to_array(d.key, ',')) AS account_id, d.value::numeric AS rate
+                    FROM jsonb_each_text(l.analytic_distribution) d
+                ) dist
+                GROUP BY dist.account_id
+            ) aa ON (aa.analytic_account_id = ANY(%s))"""
+
+
 class ReportGeneralLedger(models.AbstractModel):
     _name = 'report.accounting_pdf_reports.report_general_ledger'
     _description = 'General Ledger Report'
 
+    def _get_initial_balance_line(self, debit, credit, balance):
+        return {
+            'lid': 0, 'ldate': '', 'lcode': '', 'amount_currency': 0.0,
+            'analytic_account_id': '', 'account_code': '', 'lref': '', 'lname': 'Initial Balance',
+            'debit': debit, 'credit': credit, 'balance': balance,
+            'lpartner_id': '', 'move_name': '', 'move_id': '', 'currency_code': '', 'currency_id': None,
+            'invoice_id': '', 'invoice_type': '', 'invoice_number': '', 'partner_name': '',
+        }
+
+    def _get_initial_balance_rows(self, accounts, context):
+        """ Returns the 'Initial Balance' line of every account having journal items before
+        the period of the given context, read from the daily balances when no line level
+        filter is needed."""
+        balances = self.env['account.move.line.balance'].with_context(context)._read_balances(accounts)
+        if balances is not None:
+            return [
+                dict(self._get_initial_balance_line(balance['debit'], balance['credit'], balance['balance']),
+                     account_id=account_id)
+                for account_id, balance in balances.items()
+            ]
+        init_tables, init_where_clause, init_where_params = self.env['account.move.line'].with_context(context)._query_get()
+        init_wheres = [""]
+        if init_where_clause.strip():
+            init_wheres.append(init_where_clause.strip())
+        init_filters = " AND ".join(init_wheres)
+        filters = init_filters.replace('account_move_line__move_id', 'm').replace('account_move_line', 'l')
+        sql = ("""SELECT 0 AS lid, l.account_id AS account_id, '' AS ldate,
+            '' AS lcode, 0.0 AS amount_currency, 
+            '' AS analytic_account_id, '' AS lref, 
+            'Initial Balance' AS lname, COALESCE(SUM(l.debit),0.0) AS debit, 
+            COALESCE(SUM(l.credit),0.0) AS credit, 
+            COALESCE(SUM(l.debit),0) - COALESCE(SUM(l.credit), 0) as balance, 
+            '' AS lpartner_id,\
+            '' AS move_name, '' AS move_id, '' AS currency_code,\
+            NULL AS currency_id,\
+            '' AS invoice_id, '' AS invoice_type, '' AS invoice_number,\
+            '' AS partner_name\
+            FROM account_move_line l\
+            LEFT JOIN account_move m ON (l.move_id=m.id)\
+            LEFT JOIN res_currency c ON (l.currency_id=c.id)\
+            LEFT JOIN res_partner p ON (l.partner_id=p.id)\
+            JOIN account_journal j ON (l.journal_id=j.id)\
+            WHERE l.account_id IN %s""" + filters + ' GROUP BY l.account_id')
+        params = (tuple(accounts.ids),) + tuple(init_where_params)
+        self.env.cr.execute(sql, params)
+        return self.env.cr.dictfetchall()
+
+    def _get_move_lines_context(self, analytic_account_ids, partner_ids):
+        context = dict(self.env.context)
+        if analytic_account_ids:
+            context['analytic_account_ids'] = analytic_account_ids
+        if partner_ids:
+            context['partner_ids'] = partner_ids
+        return context
+
+    def _get_initial_balances(self, accounts, analytic_account_ids, partner_ids):
+        context = self._get_move_lines_context(analytic_account_ids, partner_ids)
+        context['date_to'] = False
+        context['initial_bal'] = True
+        return self._get_initial_balance_rows(accounts, context)
+
+    def _get_move_lines_from_clause(self, accounts, analytic_account_ids, partner_ids, analytic_sections=None):
+        """ Returns the FROM and WHERE clauses (and their parameters) of the move lines "l"
+        of the given accounts printed in the ledger.
+
+        With analytic_sections, a recordset of analytic accounts, every line is joined with
+        the share "aa" of each of these analytic accounts in its distribution."""
+        context = self._get_move_lines_context(analytic_account_ids, partner_ids)
+        tables, where_clause, where_params = self.env['account.move.line'].with_context(context)._query_get()
+        wheres = [""]
+        if where_clause.strip():
+            wheres.append(where_clause.strip())
+        filters = " AND ".join(wheres)
+        filters = filters.replace('account_move_line__move_id', 'm').replace('account_move_line', 'l')
+        joins, join_params = '', []
+        if analytic_sections is not None:
+            joins, join_params = ANALYTIC_SHARES_JOIN, [analytic_sections.ids]
+        sql = """
+            FROM account_move_line l
+            JOIN account_move m ON (l.move_id=m.id)
+            LEFT JOIN res_currency c ON (l.currency_id=c.id)
+            LEFT JOIN res_partner p ON (l.partner_id=p.id)
+            JOIN account_journal j ON (l.journal_id=j.id)
+            JOIN account_account acc ON (l.account_id = acc.id)""" + joins + """
+            WHERE l.account_id IN %s """ + filters
+        return sql, join_params + [tuple(accounts.ids)] + list(where_params)
+
+    def _get_move_lines_query(self, accounts, analytic_account_ids, partner_ids, sortby, by_account=False):
+        """ Returns the query (and its parameters) of the move lines of the given accounts,
+        with their running balance per account, the initial balance excluded.
+
+        The lines are in the order of the accounts when by_account is set, in the order of
+        sortby within an account."""
+        sql_sort = 'l.date, l.move_id, l.id'
+        if sortby == 'sort_journal_partner':
+            sql_sort = 'j.code, p.name, l.move_id, l.id'
+        from_clause, params = self._get_move_lines_from_clause(accounts, analytic_account_ids, partner_ids)
+        sql = ("""SELECT l.id AS lid, l.account_id AS account_id,
+            l.date AS ldate, j.code AS lcode, l.currency_id,
+            l.amount_currency, '' AS analytic_account_id,
+            l.ref AS lref, l.name AS lname, COALESCE(l.debit,0) AS debit,
+            COALESCE(l.credit,0) AS credit,
+            SUM(COALESCE(l.debit,0) - COALESCE(l.credit,0)) OVER (
+                PARTITION BY l.account_id ORDER BY """ + sql_sort + """
+                ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) AS balance,
+            m.name AS move_name, c.symbol AS currency_code,
+            p.name AS partner_name""" + from_clause + " ORDER BY ")
+        if by_account:
+            sql += "array_position(%s::int[], l.account_id), "
+            params.append(accounts.ids)
+        return sql + sql_sort, params
+
+    def _get_account_totals(self, accounts, analytic_account_ids, partner_ids):
+        """ Returns the debit, credit and number of the move lines of the given accounts printed
+        in the ledger, the initial balance excluded, as a dictionary with key=the ID of an account."""
+        from_clause, params = self._get_move_lines_from_clause(accounts, analytic_account_ids, partner_ids)
+        self.env.cr.execute("""
+            SELECT l.account_id AS id, COALESCE(SUM(l.debit), 0) AS debit, COALESCE(SUM(l.credit), 0) AS credit,
+                   COUNT(*) AS count
+        """ + from_clause + " GROUP BY l.account_id", params)
+        return {row['id']: row for row in self.env.cr.dictfetchall()}
+
     def _get_account_move_entry(self, accounts, analytic_account_ids,
                                 partner_ids, init_balance,
                                 sortby, display_account):
@@ -25,95 +159,20 @@ class ReportGeneralLedger(models.AbstractModel):
                 'credit': sum of total credit amount,
                 'balance': total balance,
                 'amount_currency': sum of amount_currency,
-                'move_lines': list of move line
+                'move_lines': list of move line (see account.move.line._get_ledger_lines)
         }
         """
-        cr = self.env.cr
-        MoveLine = self.env['account.move.line']
-        move_lines = {x: [] for x in accounts.ids}
-
-        # Prepare initial sql query and Get the initial move lines
+        init_rows = {}
         if init_balance:
-            context = dict(self.env.context)
-            context['date_from'] = self.env.context.get('date_from')
-            context['date_to'] = False
-            context['initial_bal'] = True
-            if analytic_account_ids:
-                context['analytic_account_ids'] = analytic_account_ids
-            if partner_ids:
-                context['partner_ids'] = partner_ids
-            init_tables, init_where_clause, init_where_params = MoveLine.with_context(context)._query_get()
-            init_wheres = [""]
-            if init_where_clause.strip():
-                init_wheres.append(init_where_clause.strip())
-            init_filters = " AND ".join(init_wheres)
-            filters = init_filters.replace('account_move_line__move_id', 'm').replace('account_move_line', 'l')
-            sql = ("""SELECT 0 AS lid, l.account_id AS account_id, '' AS ldate,
-                '' AS lcode, 0.0 AS amount_currency, 
-                '' AS analytic_account_id, '' AS lref, 
-                'Initial Balance' AS lname, COALESCE(SUM(l.debit),0.0) AS debit, 
-                COALESCE(SUM(l.credit),0.0) AS credit, 
-                COALESCE(SUM(l.debit),0) - COALESCE(SUM(l.credit), 0) as balance, 
-                '' AS lpartner_id,\
-                '' AS move_name, '' AS move_id, '' AS currency_code,\
-                NULL AS currency_id,\
-                '' AS invoice_id, '' AS invoice_type, '' AS invoice_number,\
-                '' AS partner_name\
-                FROM account_move_line l\
-                LEFT JOIN account_move m ON (l.move_id=m.id)\
-                LEFT JOIN res_currency c ON (l.currency_id=c.id)\
-                LEFT JOIN res_partner p ON (l.partner_id=p.id)\
-                JOIN account_journal j ON (l.journal_id=j.id)\
-                WHERE l.account_id IN %s""" + filters + ' GROUP BY l.account_id')
-            params = (tuple(accounts.ids),) + tuple(init_where_params)
-            cr.execute(sql, params)
-            for row in cr.dictfetchall():
-                move_lines[row.pop('account_id')].append(row)
-
-        sql_sort = 'l.date, l.move_id'
-        if sortby == 'sort_journal_partner':
-            sql_sort = 'j.code, p.name, l.move_id'
+            for row in self._get_initial_balances(accounts, analytic_account_ids, partner_ids):
+                init_rows[row.pop('account_id')] = row
+        totals = self._get_account_totals(accounts, analytic_account_ids, partner_ids)
 
-        # Prepare sql query base on selected parameters from wizard
-        context = dict(self.env.context)
-        if analytic_account_ids:
-            context['analytic_account_ids'] = analytic_account_ids
-        if partner_ids:
-            context['partner_ids'] = partner_ids
-        tables, where_clause, where_params = MoveLine.with_context(context)._query_get()
-        wheres = [""]
-        if where_clause.strip():
-            wheres.append(where_clause.strip())
-        filters = " AND ".join(wheres)
-        filters = filters.replace('account_move_line__move_id', 'm').replace('account_move_line', 'l')
-
-        # Get move lines base on sql query and Calculate the total balance of move lines
-        sql = ('''SELECT l.id AS lid, l.account_id AS account_id, 
-            l.date AS ldate, j.code AS lcode, l.currency_id, 
-            l.amount_currency, '' AS analytic_account_id,
-            l.ref AS lref, l.name AS lname, COALESCE(l.debit,0) AS debit, 
-            COALESCE(l.credit,0) AS credit, 
-            COALESCE(SUM(l.debit),0) - COALESCE(SUM(l.credit), 0) AS balance,\
-            m.name AS move_name, c.symbol AS currency_code, 
-            p.name AS partner_name\
-            FROM account_move_line l\
-            JOIN account_move m ON (l.move_id=m.id)\
-            LEFT JOIN res_currency c ON (l.currency_id=c.id)\
-            LEFT JOIN res_partner p ON (l.partner_id=p.id)\
-            JOIN account_journal j ON (l.journal_id=j.id)\
-            JOIN account_account acc ON (l.account_id = acc.id) \
-            WHERE l.account_id IN %s ''' + filters + ''' GROUP BY l.id, 
-            l.account_id, l.date, j.code, l.currency_id, l.amount_currency, 
-            l.ref, l.name, m.name, c.symbol, p.name ORDER BY ''' + sql_sort)
-        params = (tuple(accounts.ids),) + tuple(where_params)
-        cr.execute(sql, params)
-
-        for row in cr.dictfetchall():
-            balance = 0
-            for line in move_lines.get(row['account_id']):
-                balance += line['debit'] - line['credit']
-            row['balance'] += balance
-            move_lines[row.pop('account_id')].append(row)
+        # the lines with their running balance computed by the window function, read
+        # from a server side cursor while rendering when there are many of them
+        sql, params = self._get_move_lines_query(accounts, analytic_account_ids, partner_ids, sortby, by_account=True)
+        move_lines = self.env['account.move.line']._get_ledger_lines(
+            sql, params, accounts.ids, init_rows, {account_id: total['count'] for account_id, total in totals.items()})
 
         # Calculate the debit, credit and balance for Accounts
         account_res = []
@@ -123,10 +182,11 @@ class ReportGeneralLedger(models.AbstractModel):
             res['code'] = account.code
             res['name'] = account.name
             res['move_lines'] = move_lines[account.id]
-            for line in res.get('move_lines'):
-                res['debit'] += line['debit']
-                res['credit'] += line['credit']
-                res['balance'] = line['balance']
+            for row in (init_rows.get(account.id), totals.get(account.id)):
+                if row:
+                    res['debit'] += row['debit']
+                    res['credit'] += row['credit']
+            res['balance'] = res['debit'] - res['credit']
             if display_account == 'all':
                 account_res.append(res)
             if display_account == 'movement' and res.get('move_lines'):
@@ -135,20 +195,81 @@ class ReportGeneralLedger(models.AbstractModel):
                 account_res.append(res)
         return account_res
 
-    @api.model
-    def _get_report_values(self, docids, data=None):
-        if not data.get('form') or not self.env.context.get('active_model'):
-            raise UserError(_("Form content is missing, this report cannot be printed."))
-        model = self.env.context.get('active_model')
-        docs = self.env[model].browse(self.env.context.get('active_ids', []))
-        init_balance = data['form'].get('initial_balance', True)
-        sortby = data['form'].get('sortby', 'sort_date')
-        display_account = data['form']['display_account']
-        codes = []
-        if data['form'].get('journal_ids', False):
-            codes = [journal.code for journal in
-                     self.env['account.journal'].search(
-                         [('id', 'in', data['form']['journal_ids'])])]
+    def _get_analytic_lines_query(self, accounts, analytic_account_ids, partner_ids, sortby, sections):
+        """ Returns the query (and its parameters) of the move lines of the given accounts
+        per analytic account of sections, in their order, with the share of the analytic
+        account in the amounts and the running balance per analytic account."""
+        sql_sort = 'l.date, l.move_id, l.id'
+        if sortby == 'sort_journal_partner':
+            sql_sort = 'j.code, p.name, l.move_id, l.id'
+        from_clause, params = self._get_move_lines_from_clause(
+            accounts, analytic_account_ids, partner_ids, analytic_sections=sections)
+        sql = ("""SELECT l.id AS lid, aa.analytic_account_id AS account_id,
+            l.date AS ldate, j.code AS lcode, l.currency_id,
+            l.amount_currency * aa.rate AS amount_currency, '' AS analytic_account_id,
+            acc.code AS account_code, l.ref AS lref, l.name AS lname,
+            COALESCE(l.debit,0) * aa.rate AS debit, COALESCE(l.credit,0) * aa.rate AS credit,
+            SUM((COALESCE(l.debit,0) - COALESCE(l.credit,0)) * aa.rate) OVER (
+                PARTITION BY aa.analytic_account_id ORDER BY """ + sql_sort + """
+                ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) AS balance,
+            m.name AS move_name, c.symbol AS currency_code,
+            p.name AS partner_name""" + from_clause + """
+            ORDER BY array_position(%s::int[], aa.analytic_account_id), """ + sql_sort)
+        return sql, params + [sections.ids]
+
+    def _get_analytic_totals(self, accounts, analytic_account_ids, partner_ids, sections):
+        """ Returns the share in the debit and credit, and the number of the move lines of the given
+        accounts, as a dictionary with key=the ID of an analytic account of sections."""
+        from_clause, params = self._get_move_lines_from_clause(
+            accounts, analytic_account_ids, partner_ids, analytic_sections=sections)
+        self.env.cr.execute("""
+            SELECT aa.analytic_account_id AS id, COALESCE(SUM(l.debit * aa.rate), 0) AS debit,
+                   COALESCE(SUM(l.credit * aa.rate), 0) AS credit, COUNT(*) AS count
+        """ + from_clause + " GROUP BY aa.analytic_account_id", params)
+        return {row['id']: row for row in self.env.cr.dictfetchall()}
+
+    def _get_analytic_move_entry(self, accounts, analytic_account_ids,
+                                 partner_ids, init_balance,
+                                 sortby, display_account):
+        """ Returns the ledger of the analytic accounts, the filtered ones or all of them, in the
+        format of _get_account_move_entry. The lines of the given accounts are printed under each
+        analytic account of their distribution, for the share of that analytic account."""
+        sections = analytic_account_ids or self.env['account.analytic.account'].search([])
+        init_rows = {}
+        if init_balance:
+            initial_totals = self.with_context(date_to=False, initial_bal=True)._get_analytic_totals(
+                accounts, analytic_account_ids, partner_ids, sections)
+            for analytic_account_id, total in initial_totals.items():
+                init_rows[analytic_account_id] = self._get_initial_balance_line(
+                    total['debit'], total['credit'], total['debit'] - total['credit'])
+        totals = self._get_analytic_totals(accounts, analytic_account_ids, partner_ids, sections)
+
+        sql, params = self._get_analytic_lines_query(accounts, analytic_account_ids, partner_ids, sortby, sections)
+        move_lines = self.env['account.move.line']._get_ledger_lines(
+            sql, params, sections.ids, init_rows, {account_id: total['count'] for account_id, total in totals.items()})
+
+        currency = self.env.company.currency_id
+        account_res = []
+        for section in sections:
+            res = dict((fn, 0.0) for fn in ['credit', 'debit', 'balance'])
+            res['code'] = section.code or ''
+            res['name'] = section.name
+            res['move_lines'] = move_lines[section.id]
+            for row in (init_rows.get(section.id), totals.get(section.id)):
+                if row:
+                    res['debit'] += row['debit']
+                    res['credit'] += row['credit']
+            res['balance'] = res['debit'] - res['credit']
+            if display_account == 'all':
+                account_res.append(res)
+            if display_account == 'movement' and res.get('move_lines'):
+                account_res.append(res)
+            if display_account == 'not_zero' and not currency.is_zero(res['balance']):
+                account_res.append(res)
+        return account_res
+
+    def _get_ledger_filters(self, data, model, docs):
+        """ Returns the accounts, analytic accounts and partners the ledger is printed for. """
         analytic_account_ids = False
         if data['form'].get('analytic_account_ids', False):
             analytic_account_ids = self.env['account.analytic.account'].search(
@@ -164,8 +285,32 @@ class ReportGeneralLedger(models.AbstractModel):
             if data['form'].get('account_ids', False):
                 domain.append(('id', 'in', data['form']['account_ids']))
             accounts = self.env['account.account'].search(domain)
-        accounts_res = self.with_context(
-            data['form'].get('used_context', {}))._get_account_move_entry(
+        return accounts, analytic_account_ids, partner_ids
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        return self.env['account.report.cache']._get_report_values(
+            self, docids, data, self._compute_report_values)
+
+    @api.model
+    def _compute_report_values(self, docids, data=None):
+        if not data.get('form') or not self.env.context.get('active_model'):
+            raise UserError(_("Form content is missing, this report cannot be printed."))
+        model = self.env.context.get('active_model')
+        docs = self.env[model].browse(self.env.context.get('active_ids', []))
+        init_balance = data['form'].get('initial_balance', True)
+        sortby = data['form'].get('sortby', 'sort_date')
+        display_account = data['form']['display_account']
+        codes = []
+        if data['form'].get('journal_ids', False):
+            codes = [journal.code for journal in
+                     self.env['account.journal'].search(
+                         [('id', 'in', data['form']['journal_ids'])])]
+        accounts, analytic_account_ids, partner_ids = self._get_ledger_filters(data, model, docs)
+        analytic_grouping = data['form'].get('analytic_grouping', False)
+        report = self.with_context(data['form'].get('used_context', {}))
+        get_move_entry = report._get_analytic_move_entry if analytic_grouping else report._get_account_move_entry
+        accounts_res = get_move_entry(
             accounts,
             analytic_account_ids,
             partner_ids,
@@ -177,8 +322,10 @@ class ReportGeneralLedger(models.AbstractModel):
             'docs': docs,
             'time': time,
             'Accounts': accounts_res,
+            'account_batches': self.env['ir.actions.report']._get_pdf_batches(accounts_res),
             'print_journal': codes,
             'accounts': accounts,
             'partner_ids': partner_ids,
             'analytic_account_ids': analytic_account_ids,
+            'analytic_grouping': analytic_grouping,
         }
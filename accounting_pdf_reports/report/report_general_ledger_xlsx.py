@@ -0,0 +1,131 @@
+from itertools import groupby
+from operator import itemgetter
+
+from odoo import models, _
+from odoo.exceptions import UserError
+
+
+class ReportGeneralLedgerXlsx(models.AbstractModel):
+    _name = 'report.accounting_pdf_reports.report_general_ledger_xlsx'
+    _inherit = 'report.report_xlsx.abstract'
+    _description = 'General Ledger XLSX'
+
+    def get_workbook_options(self):
+        # the rows are written as they are fetched, and flushed to disk row by row
+        return {'constant_memory': True}
+
+    def generate_xlsx_report(self, workbook, data, objs):
+        if not data.get('form'):
+            raise UserError(_("Form content is missing, this report cannot be printed."))
+        form = data['form']
+        report = self.env['report.accounting_pdf_reports.report_general_ledger'].with_context(
+            form.get('used_context', {}))
+        accounts, analytic_account_ids, partner_ids = report._get_ledger_filters(data, objs._name, objs)
+        init_balance = form.get('initial_balance', True)
+        display_account = form['display_account']
+        currency = self.env.company.currency_id
+
+        init_balances = {}
+        if init_balance and accounts:
+            init_balances = {
+                row['account_id']: row
+                for row in report._get_initial_balances(accounts, analytic_account_ids, partner_ids)
+            }
+        totals = report._get_account_totals(accounts, analytic_account_ids, partner_ids) if accounts else {}
+
+        sheet = workbook.add_worksheet(_('General Ledger'))
+        bold = workbook.add_format({'bold': True})
+        date = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+        money = workbook.add_format({'num_format': self._report_xlsx_currency_format(currency)})
+        bold_money = workbook.add_format({'bold': True, 'num_format': self._report_xlsx_currency_format(currency)})
+        sheet.set_column(0, 1, 12)
+        sheet.set_column(2, 5, 24)
+        sheet.set_column(6, 9, 14)
+
+        sheet.write(0, 0, _('%s: General ledger', self.env.company.name), bold)
+        sheet.write(1, 0, _('Date from: %s', form.get('date_from') or ''))
+        sheet.write(2, 0, _('Date to: %s', form.get('date_to') or ''))
+        row = 4
+        for col, title in enumerate([_('Date'), _('JRNL'), _('Partner'), _('Ref'), _('Move'), _('Entry Label'),
+                                     _('Debit'), _('Credit'), _('Balance'), _('Currency')]):
+            sheet.write(row, col, title, bold)
+        if not accounts:
+            return
+        if form.get('analytic_grouping'):
+            self._write_analytic_ledger(sheet, row, report, form, accounts, analytic_account_ids, partner_ids,
+                                        {'bold': bold, 'date': date, 'money': money, 'bold_money': bold_money})
+            return
+
+        query, params = report._get_move_lines_query(
+            accounts, analytic_account_ids, partner_ids, form.get('sortby', 'sort_date'), by_account=True)
+        lines = groupby(self.env['account.move.line']._stream_query(query, params), key=itemgetter('account_id'))
+        current = next(lines, None)
+        for account in accounts:
+            account_lines = ()
+            if current and current[0] == account.id:
+                account_lines = current[1]
+            initial = init_balances.get(account.id)
+            debit = (initial['debit'] if initial else 0.0) + (totals[account.id]['debit'] if account.id in totals else 0.0)
+            credit = (initial['credit'] if initial else 0.0) + (totals[account.id]['credit'] if account.id in totals else 0.0)
+            printed = (
+                display_account == 'all'
+                or (display_account == 'movement' and (initial or account.id in totals))
+                or (display_account == 'not_zero' and not (account.currency_id or currency).is_zero(debit - credit))
+            )
+            if printed:
+                row += 1
+                sheet.write(row, 0, '%s %s' % (account.code, account.name), bold)
+                if initial:
+                    row += 1
+                    sheet.write(row, 5, initial['lname'])
+                    sheet.write_number(row, 6, initial['debit'], money)
+                    sheet.write_number(row, 7, initial['credit'], money)
+                    sheet.write_number(row, 8, initial['balance'], money)
+                balance = initial['balance'] if initial else 0.0
+                for line in account_lines:
+                    row += 1
+                    sheet.write(row, 0, line['ldate'], date)
+                    sheet.write(row, 1, line['lcode'])
+                    sheet.write(row, 2, line['partner_name'] or '')
+                    sheet.write(row, 3, line['lref'] or '')
+                    sheet.write(row, 4, line['move_name'] or '')
+                    sheet.write(row, 5, line['lname'] or '')
+                    sheet.write_number(row, 6, line['debit'], money)
+                    sheet.write_number(row, 7, line['credit'], money)
+                    sheet.write_number(row, 8, line['balance'] + balance, money)
+                    if line['amount_currency'] and line['amount_currency'] > 0.0:
+                        sheet.write(row, 9, '%s %s' % (line['amount_currency'], line['currency_code']))
+                row += 1
+                sheet.write(row, 0, _('Total %s', account.code), bold)
+                sheet.write_number(row, 6, debit, bold_money)
+                sheet.write_number(row, 7, credit, bold_money)
+                sheet.write_number(row, 8, debit - credit, bold_money)
+            if account_lines:
+                current = next(lines, None)
+
+    def _write_analytic_ledger(self, sheet, row, report, form, accounts, analytic_account_ids, partner_ids, formats):
+        """ Write the ledger grouped by analytic account, the account code in front of the labels. """
+        sections = report._get_analytic_move_entry(
+            accounts, analytic_account_ids, partner_ids, form.get('initial_balance', True),
+            form.get('sortby', 'sort_date'), form['display_account'])
+        for section in sections:
+            row += 1
+            sheet.write(row, 0, ('%s %s' % (section['code'], section['name'])).strip(), formats['bold'])
+            for line in section['move_lines']:
+                row += 1
+                sheet.write(row, 0, line['ldate'], formats['date'])
+                sheet.write(row, 1, line['lcode'])
+                sheet.write(row, 2, line['partner_name'] or '')
+                sheet.write(row, 3, line['lref'] or '')
+                sheet.write(row, 4, line['move_name'] or '')
+                sheet.write(row, 5, ' '.join(label for label in (line['account_code'], line['lname']) if label))
+                sheet.write_number(row, 6, line['debit'], formats['money'])
+                sheet.write_number(row, 7, line['credit'], formats['money'])
+                sheet.write_number(row, 8, line['balance'], formats['money'])
+                if line['amount_currency'] and line['amount_currency'] > 0.0:
+                    sheet.write(row, 9, '%s %s' % (line['amount_currency'], line['currency_code']))
+            row += 1
+            sheet.write(row, 0, _('Total %s', section['code'] or section['name']), formats['bold'])
+            sheet.write_number(row, 6, section['debit'], formats['bold_money'])
+            sheet.write_number(row, 7, section['credit'], formats['bold_money'])
+            sheet.write_number(row, 8, section['balance'], formats['bold_money'])
@@ -7,88 +7,110 @@ class ReportJournal(models.AbstractModel):
     _name = 'report.accounting_pdf_reports.report_journal'
     _description = 'Journal Audit Report'
 
-    def lines(self, target_move, journal_ids, sort_selection, data):
-        if isinstance(journal_ids, int):
-            journal_ids = [journal_ids]
-
+    def _get_lines_data(self, target_move, journal_ids, sort_selection, data):
+        """ Returns the journal items of all the given journals at once, as
+        dictionaries holding only what the template prints.
+
+        Returns a dictionary with key=the ID of a journal and value=its lines,
+        in the report order. The account codes (company dependent) and the
+        currencies are read once for all the lines.
+        """
+        res = {journal_id: [] for journal_id in journal_ids}
+        if not journal_ids:
+            return res
         move_state = ['draft', 'posted']
         if target_move == 'posted':
             move_state = ['posted']
 
         query_get_clause = self._get_query_get_clause(data)
         params = [tuple(move_state), tuple(journal_ids)] + query_get_clause[2]
-        query = 'SELECT "account_move_line".id FROM ' + query_get_clause[0] + ', account_move am, account_account acc WHERE "account_move_line".account_id = acc.id AND "account_move_line".move_id=am.id AND am.state IN %s AND "account_move_line".journal_id IN %s AND ' + query_get_clause[1] + ' ORDER BY '
+        query = """
+            SELECT "account_move_line".journal_id, "account_move_line".move_id, am.name AS move_name,
+                   "account_move_line".date, "account_move_line".account_id, p.name AS partner_name,
+                   "account_move_line".name, "account_move_line".debit, "account_move_line".credit,
+                   "account_move_line".amount_currency, "account_move_line".currency_id
+            FROM """ + query_get_clause[0] + """
+            JOIN account_move am ON "account_move_line".move_id = am.id
+            LEFT JOIN res_partner p ON "account_move_line".partner_id = p.id
+            WHERE am.state IN %s
+                AND "account_move_line".journal_id IN %s
+                AND "account_move_line".account_id IS NOT NULL
+                AND """ + query_get_clause[1] + """
+            ORDER BY "account_move_line".journal_id, """
         if sort_selection == 'date':
             query += '"account_move_line".date'
         else:
             query += 'am.name'
         query += ', "account_move_line".move_id'
         self.env.cr.execute(query, tuple(params))
-        ids = (x[0] for x in self.env.cr.fetchall())
-        return self.env['account.move.line'].browse(ids)
-
-    def _sum_debit(self, data, journal_id):
-        move_state = ['draft', 'posted']
-        if data['form'].get('target_move', 'all') == 'posted':
-            move_state = ['posted']
-
-        query_get_clause = self._get_query_get_clause(data)
-        params = [tuple(move_state), tuple(journal_id.ids)] + query_get_clause[2]
-        self.env.cr.execute('SELECT SUM(debit) FROM ' + query_get_clause[0] + ', account_move am '
-                        'WHERE "account_move_line".move_id=am.id AND am.state IN %s AND "account_move_line".journal_id IN %s AND ' + query_get_clause[1] + ' ',
-                        tuple(params))
-        return self.env.cr.fetchone()[0] or 0.0
+        rows = self.env.cr.dictfetchall()
+
+        account_codes = {account.id: account.code for account in self.env['account.account'].browse(
+            list({row['account_id'] for row in rows}))}
+        currencies = {currency.id: currency for currency in self.env['res.currency'].browse(
+            list({row['currency_id'] for row in rows if row['currency_id']}))}
+        for row in rows:
+            if not row['move_name'] or row['move_name'] == '/':
+                row['move_name'] = '*' + str(row['move_id'])
+            row['account_code'] = account_codes[row['account_id']]
+            row['currency_id'] = currencies.get(row['currency_id'], self.env['res.currency'])
+            res[row['journal_id']].append(row)
+        return res
 
-    def _sum_credit(self, data, journal_id):
+    def _get_journals_totals_and_taxes(self, data, journals):
+        """ Compute the audit totals of all the given journals at once.
+
+        Returns a tuple of two dictionaries keyed by journal id: the 'debit'
+        and 'credit' totals of the journal, and its tax declaration, a
+        dictionary with key=a tax and value=its 'base_amount' and
+        'tax_amount', the amounts of the sales being credits. The totals
+        and the tax amounts come from one query grouped by journal and tax
+        line, the base amounts from a second one grouped by journal and tax.
+        """
+        totals = {journal.id: {'debit': 0.0, 'credit': 0.0} for journal in journals}
+        taxes = {journal.id: {} for journal in journals}
+        if not journals:
+            return totals, taxes
         move_state = ['draft', 'posted']
         if data['form'].get('target_move', 'all') == 'posted':
             move_state = ['posted']
 
         query_get_clause = self._get_query_get_clause(data)
-        params = [tuple(move_state), tuple(journal_id.ids)] + query_get_clause[2]
-        self.env.cr.execute('SELECT SUM(credit) FROM ' + query_get_clause[0] + ', account_move am '
-                        'WHERE "account_move_line".move_id=am.id AND am.state IN %s AND "account_move_line".journal_id IN %s AND ' + query_get_clause[1] + ' ',
+        params = [tuple(move_state), tuple(journals.ids)] + query_get_clause[2]
+        self.env.cr.execute('SELECT "account_move_line".journal_id, "account_move_line".tax_line_id, SUM(debit), SUM(credit) FROM ' + query_get_clause[0] + ', account_move am '
+                        'WHERE "account_move_line".move_id=am.id AND am.state IN %s AND "account_move_line".journal_id IN %s AND ' + query_get_clause[1] + ' '
+                        'GROUP BY "account_move_line".journal_id, "account_move_line".tax_line_id',
                         tuple(params))
-        return self.env.cr.fetchone()[0] or 0.0
-
-    def _get_taxes(self, data, journal_id):
-        move_state = ['draft', 'posted']
-        if data['form'].get('target_move', 'all') == 'posted':
-            move_state = ['posted']
+        tax_amounts = {}
+        for journal_id, tax_id, debit, credit in self.env.cr.fetchall():
+            totals[journal_id]['debit'] += debit or 0.0
+            totals[journal_id]['credit'] += credit or 0.0
+            if tax_id:
+                tax_amounts[journal_id, tax_id] = (debit or 0.0) - (credit or 0.0)
 
-        query_get_clause = self._get_query_get_clause(data)
-        params = [tuple(move_state), tuple(journal_id.ids)] + query_get_clause[2]
         query = """
-            SELECT rel.account_tax_id, SUM("account_move_line".balance) AS base_amount
+            SELECT "account_move_line".journal_id, rel.account_tax_id, SUM("account_move_line".balance) AS base_amount
             FROM account_move_line_account_tax_rel rel, """ + query_get_clause[0] + """ 
             LEFT JOIN account_move am ON "account_move_line".move_id = am.id
             WHERE "account_move_line".id = rel.account_move_line_id
                 AND am.state IN %s
                 AND "account_move_line".journal_id IN %s
                 AND """ + query_get_clause[1] + """
-           GROUP BY rel.account_tax_id"""
+           GROUP BY "account_move_line".journal_id, rel.account_tax_id
+           ORDER BY "account_move_line".journal_id, rel.account_tax_id"""
         self.env.cr.execute(query, tuple(params))
-        ids = []
-        base_amounts = {}
-        for row in self.env.cr.fetchall():
-            ids.append(row[0])
-            base_amounts[row[0]] = row[1]
-
-
-        res = {}
-        for tax in self.env['account.tax'].browse(ids):
-            self.env.cr.execute('SELECT sum(debit - credit) FROM ' + query_get_clause[0] + ', account_move am '
-                'WHERE "account_move_line".move_id=am.id AND am.state IN %s AND "account_move_line".journal_id IN %s AND ' + query_get_clause[1] + ' AND tax_line_id = %s',
-                tuple(params + [tax.id]))
-            res[tax] = {
-                'base_amount': base_amounts[tax.id],
-                'tax_amount': self.env.cr.fetchone()[0] or 0.0,
+        rows = self.env.cr.fetchall()
+        tax_records = {tax.id: tax for tax in self.env['account.tax'].browse(
+            list({tax_id for journal_id, tax_id, base_amount in rows}))}
+        journal_types = {journal.id: journal.type for journal in journals}
+        for journal_id, tax_id, base_amount in rows:
+            # sales operation are credits
+            sign = -1 if journal_types[journal_id] == 'sale' else 1
+            taxes[journal_id][tax_records[tax_id]] = {
+                'base_amount': base_amount * sign,
+                'tax_amount': tax_amounts.get((journal_id, tax_id), 0.0) * sign,
             }
-            if journal_id.type == 'sale':
-                #sales operation are credits
-                res[tax]['base_amount'] = res[tax]['base_amount'] * -1
-                res[tax]['tax_amount'] = res[tax]['tax_amount'] * -1
-        return res
+        return totals, taxes
 
     def _get_query_get_clause(self, data):
         return self.env['account.move.line'].with_context(data['form'].get('used_context', {}))._query_get()
@@ -101,17 +123,17 @@ class ReportJournal(models.AbstractModel):
         target_move = data['form'].get('target_move', 'all')
         sort_selection = data['form'].get('sort_selection', 'date')
 
-        res = {}
-        for journal in data['form']['journal_ids']:
-            res[journal] = self.with_context(data['form'].get('used_context', {})).lines(target_move, journal, sort_selection, data)
+        res = self.with_context(data['form'].get('used_context', {}))._get_lines_data(
+            target_move, data['form']['journal_ids'], sort_selection, data)
+        journals = self.env['account.journal'].browse(data['form']['journal_ids'])
+        journal_totals, journal_taxes = self._get_journals_totals_and_taxes(data, journals)
         return {
             'doc_ids': data['form']['journal_ids'],
             'doc_model': self.env['account.journal'],
             'data': data,
-            'docs': self.env['account.journal'].browse(data['form']['journal_ids']),
+            'docs': journals,
             'time': time,
             'lines': res,
-            'sum_credit': self._sum_credit,
-            'sum_debit': self._sum_debit,
-            'get_taxes': self._get_taxes,
+            'journal_totals': journal_totals,
+            'journal_taxes': journal_taxes,
         }
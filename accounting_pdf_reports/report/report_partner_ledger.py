@@ -7,71 +7,64 @@ class ReportPartnerLedger(models.AbstractModel):
     _name = 'report.accounting_pdf_reports.report_partnerledger'
     _description = 'Partner Ledger Report'
 
-    def _lines(self, data, partner):
-        full_account = []
-        currency = self.env['res.currency']
+    def _get_partners_lines_query(self, data, partner_ids, by_partner_name=False):
+        """ Returns the query (and its parameters) of the lines of the given partners, in
+        the order of the partners (by reference and name when by_partner_name is set, by ID
+        otherwise) then by date."""
         query_get_data = self.env['account.move.line'].with_context(data['form'].get('used_context', {}))._query_get()
         reconcile_clause = "" if data['form']['reconciled'] else ' AND "account_move_line".full_reconcile_id IS NULL '
-        params = [partner.id, tuple(data['computed']['move_state']), tuple(data['computed']['account_ids'])] + query_get_data[2]
+        params = [tuple(partner_ids), tuple(data['computed']['move_state']), tuple(data['computed']['account_ids'])] + query_get_data[2]
+        order_by = '"account_move_line".partner_id, "account_move_line".date, "account_move_line".id'
+        if by_partner_name:
+            order_by = "COALESCE(p.ref, ''), COALESCE(p.name, ''), " + order_by
         query = """
-            SELECT "account_move_line".id, "account_move_line".date, j.code, acc.name->>'en_US' as a_name, "account_move_line".ref, m.name as move_name, "account_move_line".name, "account_move_line".debit, "account_move_line".credit, "account_move_line".amount_currency,"account_move_line".currency_id, c.symbol AS currency_code
+            SELECT "account_move_line".id, "account_move_line".partner_id, "account_move_line".date, j.code, acc.name->>'en_US' as a_name, "account_move_line".ref, m.name as move_name, "account_move_line".name, "account_move_line".debit, "account_move_line".credit, "account_move_line".amount_currency,"account_move_line".currency_id, c.symbol AS currency_code, p.ref AS partner_ref, p.name AS partner_name
             FROM """ + query_get_data[0] + """
             LEFT JOIN account_journal j ON ("account_move_line".journal_id = j.id)
             LEFT JOIN account_account acc ON ("account_move_line".account_id = acc.id)
             LEFT JOIN res_currency c ON ("account_move_line".currency_id=c.id)
             LEFT JOIN account_move m ON (m.id="account_move_line".move_id)
-            WHERE "account_move_line".partner_id = %s
+            LEFT JOIN res_partner p ON (p.id="account_move_line".partner_id)
+            WHERE "account_move_line".partner_id IN %s
                 AND m.state IN %s
                 AND "account_move_line".account_id IN %s AND """ + query_get_data[1] + reconcile_clause + """
-                ORDER BY "account_move_line".date"""
-        self.env.cr.execute(query, tuple(params))
-        res = self.env.cr.dictfetchall()
-        sum = 0.0
-        lang_code = self.env.context.get('lang') or 'en_US'
-        lang = self.env['res.lang']
-        lang_id = lang._lang_get(lang_code)
-        date_format = lang_id.date_format
-        for r in res:
-            r['date'] = r['date']
+                ORDER BY """ + order_by
+        return query, params
+
+    def _get_partners_lines(self, data, partner_ids):
+        """ Fetch the lines of all the given partners in a single query.
+
+        Returns a tuple of two dictionaries keyed by partner id: the lines
+        of the partner (with their progressive balance) and the totals of
+        the partner ('debit', 'credit' and 'debit - credit').
+        """
+        lines = {partner_id: [] for partner_id in partner_ids}
+        totals = {partner_id: dict.fromkeys(['debit', 'credit', 'debit - credit'], 0.0)
+                  for partner_id in partner_ids}
+        if not partner_ids:
+            return lines, totals
+        currency = self.env['res.currency']
+        query, params = self._get_partners_lines_query(data, partner_ids)
+        self.env.cr.execute(query, params)
+        for r in self.env.cr.dictfetchall():
+            partner_total = totals[r['partner_id']]
             r['displayed_name'] = '-'.join(
                 r[field_name] for field_name in ('move_name', 'ref', 'name')
                 if r[field_name] not in (None, '', '/')
             )
-            sum += r['debit'] - r['credit']
-            r['progress'] = sum
+            partner_total['debit'] += r['debit']
+            partner_total['credit'] += r['credit']
+            partner_total['debit - credit'] += r['debit'] - r['credit']
+            r['progress'] = partner_total['debit - credit']
             r['currency_id'] = currency.browse(r.get('currency_id'))
-            full_account.append(r)
-        return full_account
-
-    def _sum_partner(self, data, partner, field):
-        if field not in ['debit', 'credit', 'debit - credit']:
-            return
-        result = 0.0
-        query_get_data = self.env['account.move.line'].with_context(data['form'].get('used_context', {}))._query_get()
-        reconcile_clause = "" if data['form']['reconciled'] else ' AND "account_move_line".full_reconcile_id IS NULL '
-
-        params = [partner.id, tuple(data['computed']['move_state']), tuple(data['computed']['account_ids'])] + query_get_data[2]
-        query = """SELECT sum(""" + field + """)
-                FROM """ + query_get_data[0] + """, account_move AS m
-                WHERE "account_move_line".partner_id = %s
-                    AND m.id = "account_move_line".move_id
-                    AND m.state IN %s
-                    AND account_id IN %s
-                    AND """ + query_get_data[1] + reconcile_clause
-        self.env.cr.execute(query, tuple(params))
-
-        contemp = self.env.cr.fetchone()
-        if contemp is not None:
-            result = contemp[0] or 0.0
-        return result
+            lines[r['partner_id']].append(r)
+        return lines, totals
 
-    @api.model
-    def _get_report_values(self, docids, data=None):
-        if not data.get('form'):
-            raise UserError(_("Form content is missing, this report cannot be printed."))
+    def _get_partner_ids(self, data):
+        """ Returns the IDs of the partners the ledger is printed for, after computing the
+        move states and accounts of the report in data['computed']. """
         data['computed'] = {}
 
-        obj_partner = self.env['res.partner']
         query_get_data = self.env['account.move.line'].with_context(data['form'].get('used_context', {}))._query_get()
         data['computed']['move_state'] = ['draft', 'posted']
         if data['form'].get('target_move', 'all') == 'posted':
@@ -108,8 +101,17 @@ class ReportPartnerLedger(models.AbstractModel):
         else:
             partner_ids = [res['partner_id'] for res in
                            self.env.cr.dictfetchall()]
+        return partner_ids
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        if not data.get('form'):
+            raise UserError(_("Form content is missing, this report cannot be printed."))
+        partner_ids = self._get_partner_ids(data)
+        obj_partner = self.env['res.partner']
         partners = obj_partner.browse(partner_ids)
         partners = sorted(partners, key=lambda x: (x.ref or '', x.name or ''))
+        partner_lines, partner_totals = self._get_partners_lines(data, partner_ids)
 
         return {
             'doc_ids': partner_ids,
@@ -117,6 +119,7 @@ class ReportPartnerLedger(models.AbstractModel):
             'data': data,
             'docs': partners,
             'time': time,
-            'lines': self._lines,
-            'sum_partner': self._sum_partner,
+            'partner_lines': partner_lines,
+            'partner_totals': partner_totals,
+            'partner_batches': self.env['ir.actions.report']._get_pdf_batches(partners),
         }
@@ -0,0 +1,75 @@
+from itertools import groupby
+from operator import itemgetter
+
+from odoo import models, _
+from odoo.exceptions import UserError
+
+
+class ReportPartnerLedgerXlsx(models.AbstractModel):
+    _name = 'report.accounting_pdf_reports.report_partnerledger_xlsx'
+    _inherit = 'report.report_xlsx.abstract'
+    _description = 'Partner Ledger XLSX'
+
+    def get_workbook_options(self):
+        # the rows are written as they are fetched, and flushed to disk row by row
+        return {'constant_memory': True}
+
+    def generate_xlsx_report(self, workbook, data, objs):
+        if not data.get('form'):
+            raise UserError(_("Form content is missing, this report cannot be printed."))
+        form = data['form']
+        report = self.env['report.accounting_pdf_reports.report_partnerledger']
+        partner_ids = report._get_partner_ids(data)
+        currency = self.env.company.currency_id
+
+        sheet = workbook.add_worksheet(_('Partner Ledger'))
+        bold = workbook.add_format({'bold': True})
+        date = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+        money = workbook.add_format({'num_format': self._report_xlsx_currency_format(currency)})
+        bold_money = workbook.add_format({'bold': True, 'num_format': self._report_xlsx_currency_format(currency)})
+        sheet.set_column(0, 1, 12)
+        sheet.set_column(2, 3, 30)
+        sheet.set_column(4, 7, 14)
+
+        sheet.write(0, 0, _('Partner Ledger'), bold)
+        sheet.write(1, 0, _('Company: %s', self.env.company.name))
+        sheet.write(2, 0, _('Date from: %s', form.get('date_from') or ''))
+        sheet.write(3, 0, _('Date to: %s', form.get('date_to') or ''))
+        row = 5
+        titles = [_('Date'), _('JRNL'), _('Account'), _('Ref'), _('Debit'), _('Credit'), _('Balance')]
+        if form.get('amount_currency'):
+            titles.append(_('Currency'))
+        for col, title in enumerate(titles):
+            sheet.write(row, col, title, bold)
+        if not partner_ids:
+            return
+
+        query, params = report._get_partners_lines_query(data, partner_ids, by_partner_name=True)
+        lines = self.env['account.move.line']._stream_query(query, params)
+        for dummy, partner_lines in groupby(lines, key=itemgetter('partner_id')):
+            debit = credit = 0.0
+            for index, line in enumerate(partner_lines):
+                if not index:
+                    row += 1
+                    sheet.write(row, 0, ' - '.join(
+                        name for name in (line['partner_ref'], line['partner_name']) if name), bold)
+                debit += line['debit']
+                credit += line['credit']
+                row += 1
+                sheet.write(row, 0, line['date'], date)
+                sheet.write(row, 1, line['code'])
+                sheet.write(row, 2, line['a_name'])
+                sheet.write(row, 3, '-'.join(
+                    line[field_name] for field_name in ('move_name', 'ref', 'name')
+                    if line[field_name] not in (None, '', '/')
+                ))
+                sheet.write_number(row, 4, line['debit'], money)
+                sheet.write_number(row, 5, line['credit'], money)
+                sheet.write_number(row, 6, debit - credit, money)
+                if form.get('amount_currency') and line['currency_id']:
+                    sheet.write(row, 7, '%s %s' % (line['amount_currency'], line['currency_code']))
+            row += 1
+            sheet.write(row, 0, _('Total'), bold)
+            sheet.write_number(row, 4, debit, bold_money)
+            sheet.write_number(row, 5, credit, bold_money)
+            sheet.write_number(row, 6, debit - credit, bold_money)
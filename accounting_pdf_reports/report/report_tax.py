@@ -1,5 +1,9 @@
-from odoo import api, models, _
+from datetime import timedelta
+
+from odoo import api, fields, models, _
 from odoo.exceptions import UserError
+from odoo.tools import date_utils
+from odoo.tools.misc import format_date
 
 
 class ReportTax(models.AbstractModel):
@@ -13,8 +17,31 @@ class ReportTax(models.AbstractModel):
         return {
             'data': data['form'],
             'lines': self.get_lines(data.get('form')),
+            'periods': self._get_periods(data['form']),
         }
 
+    def _get_periods(self, options):
+        """ Returns the periods the date range of the options is split in, following its
+        periodicity ('month' or 'quarter'), as a list of dictionaries with the name, the
+        bounds and the key of the period (its first day, as computed by date_trunc). """
+        periodicity = options.get('periodicity') or 'none'
+        if periodicity == 'none' or not options.get('date_from') or not options.get('date_to'):
+            return []
+        date_from = fields.Date.to_date(options['date_from'])
+        date_to = fields.Date.to_date(options['date_to'])
+        periods = []
+        start = date_from
+        while start <= date_to:
+            key = date_utils.start_of(start, periodicity)
+            end = min(date_utils.end_of(start, periodicity), date_to)
+            if periodicity == 'quarter':
+                name = _('Q%(quarter)s %(year)s', quarter=(key.month - 1) // 3 + 1, year=key.year)
+            else:
+                name = format_date(self.env, key, date_format='MMM yyyy')
+            periods.append({'name': name, 'date_from': start, 'date_to': end, 'key': key})
+            start = end + timedelta(days=1)
+        return periods
+
     def _sql_from_amls_one(self):
         sql = """SELECT "account_move_line".tax_line_id, COALESCE(SUM("account_move_line".debit-"account_move_line".credit), 0)
                     FROM %s
@@ -29,6 +56,37 @@ class ReportTax(models.AbstractModel):
                  WHERE %s GROUP BY r.account_tax_id"""
         return sql
 
+    def _sql_from_amls_periods(self):
+        sql = """SELECT 'tax', "account_move_line".tax_line_id, date_trunc(%%s, "account_move_line".date)::date,
+                        COALESCE(SUM("account_move_line".debit-"account_move_line".credit), 0)
+                    FROM %s
+                    WHERE %s GROUP BY 2, 3
+                 UNION ALL
+                 SELECT 'net', r.account_tax_id, date_trunc(%%s, "account_move_line".date)::date,
+                        COALESCE(SUM("account_move_line".debit-"account_move_line".credit), 0)
+                    FROM %s
+                    INNER JOIN account_move_line_account_tax_rel r ON ("account_move_line".id = r.account_move_line_id)
+                    INNER JOIN account_tax t ON (r.account_tax_id = t.id)
+                    WHERE %s GROUP BY 2, 3"""
+        return sql
+
+    def _compute_from_amls_periods(self, options, taxes, periods):
+        #compute the tax and net amounts of all the periods, bucketed by the first day of their period
+        sql = self._sql_from_amls_periods()
+        tables, where_clause, where_params = self.env['account.move.line']._query_get()
+        query = sql % (tables, where_clause, tables, where_clause)
+        periodicity = options['periodicity']
+        self.env.cr.execute(query, [periodicity] + where_params + [periodicity] + where_params)
+        period_index = {period['key']: index for index, period in enumerate(periods)}
+        totals = {}
+        for amount_type, tax_id, period_key, amount in self.env.cr.fetchall():
+            if tax_id not in taxes or period_key not in period_index:
+                continue
+            taxes[tax_id]['periods'][period_index[period_key]][amount_type] = abs(amount)
+            totals[tax_id, amount_type] = totals.get((tax_id, amount_type), 0.0) + amount
+        for (tax_id, amount_type), amount in totals.items():
+            taxes[tax_id][amount_type] = abs(amount)
+
     def _compute_from_amls(self, options, taxes):
         #compute the tax amount
         sql = self._sql_from_amls_one()
@@ -60,9 +118,16 @@ class ReportTax(models.AbstractModel):
                     taxes[child.id] = {'tax': 0, 'net': 0, 'name': child.name, 'type': tax.type_tax_use}
             else:
                 taxes[tax.id] = {'tax': 0, 'net': 0, 'name': tax.name, 'type': tax.type_tax_use}
-        self.with_context(date_from=options['date_from'], date_to=options['date_to'],
-                          state=options['target_move'],
-                          strict_range=True)._compute_from_amls(options, taxes)
+        periods = self._get_periods(options)
+        report = self.with_context(date_from=options['date_from'], date_to=options['date_to'],
+                                   state=options['target_move'],
+                                   strict_range=True)
+        if periods:
+            for tax in taxes.values():
+                tax['periods'] = [{'tax': 0, 'net': 0} for period in periods]
+            report._compute_from_amls_periods(options, taxes, periods)
+        else:
+            report._compute_from_amls(options, taxes)
         groups = dict((tp, []) for tp in ['sale', 'purchase'])
         for tax in taxes.values():
             if tax['tax']:
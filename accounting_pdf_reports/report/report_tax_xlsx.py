@@ -0,0 +1,49 @@
+from odoo import models, _
+
+
+class ReportTaxXlsx(models.AbstractModel):
+    _name = 'report.accounting_pdf_reports.report_tax_xlsx'
+    _inherit = 'report.report_xlsx.abstract'
+    _description = 'Tax Report XLSX'
+
+    def generate_xlsx_report(self, workbook, data, objs):
+        report = self.env['report.accounting_pdf_reports.report_tax']
+        options = data['form']
+        lines = report.get_lines(options)
+        periods = report._get_periods(options)
+
+        sheet = workbook.add_worksheet(_('Tax Report'))
+        bold = workbook.add_format({'bold': True})
+        money = workbook.add_format({
+            'num_format': self._report_xlsx_currency_format(self.env.company.currency_id)})
+        sheet.set_column(0, 0, 40)
+        sheet.set_column(1, len(periods) * 2 + 2, 14)
+
+        sheet.write(0, 0, _('Tax Report'), bold)
+        sheet.write(1, 0, _('Date from: %s', options['date_from'] or ''))
+        sheet.write(2, 0, _('Date to: %s', options['date_to'] or ''))
+
+        row = 4
+        col = 1
+        for period in periods:
+            sheet.merge_range(row, col, row, col + 1, period['name'], bold)
+            col += 2
+        sheet.merge_range(row, col, row, col + 1, _('Total'), bold)
+        row += 1
+        for col in range(1, len(periods) * 2 + 3, 2):
+            sheet.write(row, col, _('Net'), bold)
+            sheet.write(row, col + 1, _('Tax'), bold)
+
+        for group, title in (('sale', _('Sale')), ('purchase', _('Purchase'))):
+            row += 1
+            sheet.write(row, 0, title, bold)
+            for line in lines[group]:
+                row += 1
+                sheet.write(row, 0, line['name'])
+                col = 1
+                for period_line in line.get('periods', []):
+                    sheet.write_number(row, col, period_line['net'], money)
+                    sheet.write_number(row, col + 1, period_line['tax'], money)
+                    col += 2
+                sheet.write_number(row, col, line['net'], money)
+                sheet.write_number(row, col + 1, line['tax'], money)
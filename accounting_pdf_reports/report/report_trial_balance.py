@@ -1,6 +1,10 @@
 import time
-from odoo import api, models, _
+from datetime import timedelta
+
+from odoo import api, fields, models, _
 from odoo.exceptions import UserError
+from odoo.tools import date_utils
+from odoo.tools.misc import format_date
 
 
 class ReportTrialBalance(models.AbstractModel):
@@ -20,24 +24,27 @@ class ReportTrialBalance(models.AbstractModel):
                 `balance`: total amount of balance,
         """
 
-        account_result = {}
-        # Prepare sql query base on selected parameters from wizard
-        tables, where_clause, where_params = self.env['account.move.line']._query_get()
-        tables = tables.replace('"','')
-        if not tables:
-            tables = 'account_move_line'
-        wheres = [""]
-        if where_clause.strip():
-            wheres.append(where_clause.strip())
-        filters = " AND ".join(wheres)
-        # compute the balance, debit and credit for the provided accounts
-        request = ("SELECT account_id AS id, SUM(debit) AS debit, SUM(credit) AS credit, "
-                   "(SUM(debit) - SUM(credit)) AS balance" +\
-                   " FROM " + tables + " WHERE account_id IN %s " + filters + " GROUP BY account_id")
-        params = (tuple(accounts.ids),) + tuple(where_params)
-        self.env.cr.execute(request, params)
-        for row in self.env.cr.dictfetchall():
-            account_result[row.pop('id')] = row
+        # read the pre-aggregated daily balances when no line level filter is needed
+        account_result = self.env['account.move.line.balance']._read_balances(accounts)
+        if account_result is None:
+            account_result = {}
+            # Prepare sql query base on selected parameters from wizard
+            tables, where_clause, where_params = self.env['account.move.line']._query_get()
+            tables = tables.replace('"','')
+            if not tables:
+                tables = 'account_move_line'
+            wheres = [""]
+            if where_clause.strip():
+                wheres.append(where_clause.strip())
+            filters = " AND ".join(wheres)
+            # compute the balance, debit and credit for the provided accounts
+            request = ("SELECT account_id AS id, SUM(debit) AS debit, SUM(credit) AS credit, "
+                       "(SUM(debit) - SUM(credit)) AS balance" +\
+                       " FROM " + tables + " WHERE account_id IN %s " + filters + " GROUP BY account_id")
+            params = (tuple(accounts.ids),) + tuple(where_params)
+            self.env.cr.execute(request, params)
+            for row in self.env.cr.dictfetchall():
+                account_result[row.pop('id')] = row
 
         account_res = []
         for account in accounts:
@@ -57,8 +64,117 @@ class ReportTrialBalance(models.AbstractModel):
                 account_res.append(res)
         return account_res
 
+    def _get_months(self, date_from, date_to):
+        """ Returns the months between date_from and date_to, as a list of dictionaries with
+            the name and the bounds of the month (clipped to the range).
+        """
+        months = []
+        start = fields.Date.to_date(date_from)
+        date_to = fields.Date.to_date(date_to)
+        while start <= date_to:
+            end = min(date_utils.end_of(start, 'month'), date_to)
+            months.append({
+                'name': format_date(self.env, start, date_format='MMM yyyy'),
+                'date_from': start,
+                'date_to': end,
+            })
+            start = end + timedelta(days=1)
+        return months
+
+    def _get_monthly_aggregates(self, accounts, months, alias):
+        """ returns the select expressions (and their parameters) of the monthly trial balance
+            for the table of the given alias: the opening balance of the accounts carrying their
+            balance over, then the debit and credit of every month.
+        """
+        initial_balance_accounts = accounts.filtered('include_initial_balance')
+        aggregates = ["COALESCE(SUM(" + alias + ".debit - " + alias + ".credit) FILTER (WHERE "
+                      + alias + ".date < %s AND " + alias + ".account_id IN %s), 0) AS opening"]
+        params = [months[0]['date_from'], tuple(initial_balance_accounts.ids) or (None,)]
+        for index, month in enumerate(months):
+            condition = alias + ".date BETWEEN %s AND %s"
+            aggregates += [
+                "COALESCE(SUM(" + alias + ".debit) FILTER (WHERE " + condition + "), 0) AS debit_" + str(index),
+                "COALESCE(SUM(" + alias + ".credit) FILTER (WHERE " + condition + "), 0) AS credit_" + str(index),
+            ]
+            params += [month['date_from'], month['date_to']] * 2
+        return aggregates, params
+
+    def _get_accounts_by_month(self, accounts, display_account, months):
+        """ compute the opening balance, the debit and credit of every month and the closing
+            balance of the provided accounts, with a single conditional aggregation
+            :Arguments:
+                `accounts`: list of accounts record,
+                `display_account`: it's used to display either all accounts or those accounts which balance is > 0
+                `months`: the months of the report, as returned by _get_months
+            :Returns a list of dictionary of Accounts with following key and value
+                `name`: Account name,
+                `code`: Account code,
+                `opening`: balance before the first month (accounts carrying their balance over only),
+                `months`: list of the 'debit' and 'credit' of every month,
+                `debit`: total amount of debit over the months,
+                `credit`: total amount of credit over the months,
+                `balance`: closing balance,
+        """
+        account_result = {}
+        if not months:
+            return []
+        # the opening balance needs the lines before the first month of the accounts carrying
+        # their balance over, which is what the non strict range of _query_get selects
+        context = dict(self.env.context, date_from=months[0]['date_from'], strict_range=False)
+        DailyBalance = self.env['account.move.line.balance'].with_context(context)
+        if accounts and DailyBalance._can_read_balances():
+            conditions, where_params = DailyBalance._get_balance_conditions(accounts)
+            aggregates, params = self._get_monthly_aggregates(accounts, months, 'b')
+            DailyBalance.flush_model()
+            request = ("SELECT b.account_id AS id, " + ", ".join(aggregates) +
+                       " FROM account_move_line_balance b WHERE " + " AND ".join(conditions) +
+                       " GROUP BY b.account_id")
+            self.env.cr.execute(request, tuple(params) + tuple(where_params))
+            account_result = {row['id']: row for row in self.env.cr.dictfetchall()}
+        elif accounts:
+            tables, where_clause, where_params = self.env['account.move.line'].with_context(context)._query_get()
+            tables = tables.replace('"', '') or 'account_move_line'
+            wheres = [""]
+            if where_clause.strip():
+                wheres.append(where_clause.strip())
+            filters = " AND ".join(wheres)
+            aggregates, params = self._get_monthly_aggregates(accounts, months, 'account_move_line')
+            request = ("SELECT account_id AS id, " + ", ".join(aggregates) +
+                       " FROM " + tables + " WHERE account_id IN %s " + filters + " GROUP BY account_id")
+            self.env.cr.execute(request, tuple(params) + (tuple(accounts.ids),) + tuple(where_params))
+            account_result = {row['id']: row for row in self.env.cr.dictfetchall()}
+
+        account_res = []
+        for account in accounts:
+            currency = account.currency_id and account.currency_id or self.env.company.currency_id
+            row = account_result.get(account.id, {})
+            res = {
+                'code': account.code,
+                'name': account.name,
+                'opening': row.get('opening', 0.0),
+                'months': [{
+                    'debit': row.get('debit_' + str(index), 0.0),
+                    'credit': row.get('credit_' + str(index), 0.0),
+                } for index in range(len(months))],
+            }
+            res['debit'] = sum(month['debit'] for month in res['months'])
+            res['credit'] = sum(month['credit'] for month in res['months'])
+            res['balance'] = res['opening'] + res['debit'] - res['credit']
+            if display_account == 'all':
+                account_res.append(res)
+            if display_account == 'not_zero' and not currency.is_zero(res['balance']):
+                account_res.append(res)
+            if display_account == 'movement' and (not currency.is_zero(res['debit']) or not currency.is_zero(res['credit'])):
+                account_res.append(res)
+        return account_res
+
     @api.model
     def _get_report_values(self, docids, data=None):
+        return self.env['account.report.cache']._get_report_values(
+            self, docids, data, self._compute_report_values)
+
+    @api.model
+    def _compute_report_values(self, docids, data=None):
         if not data.get('form') or not self.env.context.get('active_model'):
             raise UserError(_("Form content is missing, this report cannot be printed."))
 
@@ -72,7 +188,12 @@ class ReportTrialBalance(models.AbstractModel):
             analytic_account_ids = self.env['account.analytic.account'].browse(data['form'].get('analytic_account_ids'))
             context['analytic_account_ids'] = analytic_account_ids
             analytic_accounts = [account.name for account in analytic_account_ids]
-        account_res = self.with_context(context)._get_accounts(accounts, display_account)
+        months = []
+        if data['form'].get('monthly_columns'):
+            months = self._get_months(data['form']['date_from'], data['form']['date_to'])
+            account_res = self.with_context(context)._get_accounts_by_month(accounts, display_account, months)
+        else:
+            account_res = self.with_context(context)._get_accounts(accounts, display_account)
         codes = []
         if data['form'].get('journal_ids', False):
             codes = [journal.code for journal in
@@ -87,4 +208,5 @@ class ReportTrialBalance(models.AbstractModel):
             'analytic_accounts': analytic_accounts,
             'time': time,
             'Accounts': account_res,
+            'months': months,
         }
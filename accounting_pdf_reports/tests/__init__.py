@@ -0,0 +1,6 @@
+from . import test_daily_balances
+from . import test_report_aged_partner
+from . import test_report_benchmark
+from . import test_report_financial
+from . import test_report_general_ledger
+from . import test_report_journal
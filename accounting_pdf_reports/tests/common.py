@@ -0,0 +1,233 @@
+import json
+import logging
+import os
+import time
+import tracemalloc
+from datetime import date
+
+from odoo.tests.common import TransactionCase
+
+from odoo.addons.accounting_pdf_reports.models.account_move_line import QUERY_GET_CACHE_KEY
+from odoo.addons.accounting_pdf_reports.models.account_report_cache import _report_cache, _report_cache_lock
+
+_logger = logging.getLogger(__name__)
+
+# the benchmark is configured by environment variables, e.g.
+#   ACCOUNT_REPORT_BENCHMARK_SIZES=100000,1000000,5000000 odoo-bin --test-tags benchmark ...
+SIZES = [int(size) for size in os.environ.get('ACCOUNT_REPORT_BENCHMARK_SIZES', '10000,100000').split(',')]
+ACCOUNTS = int(os.environ.get('ACCOUNT_REPORT_BENCHMARK_ACCOUNTS', 200))
+PARTNERS = int(os.environ.get('ACCOUNT_REPORT_BENCHMARK_PARTNERS', 1000))
+# the JSON file the results are compared with, written when missing or when updating, next
+# to this file unless given, the results not depending on the directory odoo is started from
+BASELINE = os.environ.get('ACCOUNT_REPORT_BENCHMARK_BASELINE') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'account_report_benchmark.json')
+UPDATE_BASELINE = bool(os.environ.get('ACCOUNT_REPORT_BENCHMARK_UPDATE'))
+# the ratio to the baseline above which a measure is a regression
+TOLERANCE = float(os.environ.get('ACCOUNT_REPORT_BENCHMARK_TOLERANCE', 1.5))
+
+# the journal items are spread over two years, the reports are printed on the second one
+DATE_START = date(2024, 1, 1)
+DAYS = 730
+REPORT_DATE_FROM = date(2025, 1, 1)
+REPORT_DATE_TO = date(2025, 12, 31)
+
+ACCOUNT_TYPES = ['asset_receivable', 'liability_payable', 'asset_cash', 'income', 'expense',
+                 'asset_current', 'liability_current']
+
+
+class AccountReportBenchmarkCase(TransactionCase):
+    """ Synthetic ledger on which the accounting reports are measured: wall time, number of
+    SQL queries and peak python memory of their _get_report_values.
+
+    The journal items are cloned in SQL from a posted template entry, the ORM being far too
+    slow to create millions of them. """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.company = cls.env.company
+        cls.journal = cls.env['account.journal'].create({
+            'name': 'Benchmark',
+            'code': 'BNCH',
+            'type': 'general',
+            'company_id': cls.company.id,
+        })
+        cls.accounts = cls.env['account.account'].create([{
+            'name': 'Benchmark %s' % index,
+            'code': 'BNCH%04d' % index,
+            'account_type': ACCOUNT_TYPES[index % len(ACCOUNT_TYPES)],
+            'reconcile': ACCOUNT_TYPES[index % len(ACCOUNT_TYPES)] in ('asset_receivable', 'liability_payable'),
+        } for index in range(ACCOUNTS)])
+        cls.partners = cls.env['res.partner'].create([{
+            'name': 'Benchmark %s' % index,
+            'ref': 'BNCH%05d' % index,
+        } for index in range(PARTNERS)])
+        cls.template_move = cls.env['account.move'].create({
+            'move_type': 'entry',
+            'journal_id': cls.journal.id,
+            'date': DATE_START,
+            'line_ids': [
+                (0, 0, {'account_id': cls.accounts[0].id, 'partner_id': cls.partners[0].id, 'debit': 1.0}),
+                (0, 0, {'account_id': cls.accounts[1].id, 'partner_id': cls.partners[0].id, 'credit': 1.0}),
+            ],
+        })
+        cls.template_move.action_post()
+        cls.env.flush_all()
+        cls.line_count = 2
+        cls.results = {}
+
+    @classmethod
+    def _get_columns(cls, table):
+        cls.env.cr.execute("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_name = %s AND column_name != 'id'
+            ORDER BY ordinal_position
+        """, [table])
+        return [column for (column,) in cls.env.cr.fetchall()]
+
+    @classmethod
+    def _clone_rows(cls, table, overrides, from_clause, params):
+        """ Insert the rows selected by from_clause (the template row being "t"), with the
+        given sql expressions instead of the template values for some columns. """
+        columns = cls._get_columns(table)
+        cls.env.cr.execute(
+            'INSERT INTO %s (%s) SELECT %s %s' % (
+                table,
+                ', '.join('"%s"' % column for column in columns),
+                ', '.join(overrides.get(column, 't."%s"' % column) for column in columns),
+                from_clause,
+            ), params)
+
+    @classmethod
+    def _generate_lines(cls, size):
+        """ Add journal items up to the given number, two per entry. """
+        moves = (size - cls.line_count) // 2
+        if moves <= 0:
+            return
+        cls.env.cr.execute("SELECT COALESCE(MAX(id), 0) FROM account_move")
+        last_move_id = cls.env.cr.fetchone()[0]
+        params = {
+            'template': cls.template_move.id,
+            'start': cls.line_count // 2,
+            'stop': cls.line_count // 2 + moves - 1,
+            'date_start': DATE_START,
+            'days': DAYS,
+            'last_move': last_move_id,
+            'account_ids': cls.accounts.ids,
+            'accounts': len(cls.accounts),
+            'partner_ids': cls.partners.ids,
+            'partners': len(cls.partners),
+        }
+        cls._clone_rows('account_move', {
+            'name': "'BNCH/' || g",
+            'date': "%(date_start)s::date + (g %% %(days)s)",
+            'sequence_number': "g",
+        }, "FROM account_move t, generate_series(%(start)s, %(stop)s) g WHERE t.id = %(template)s", params)
+        amount = "(1 + m.id %% 997)"
+        sign = "(CASE WHEN t.debit > 0 THEN 1 ELSE -1 END)"
+        cls._clone_rows('account_move_line', {
+            'move_id': "m.id",
+            'move_name': "m.name",
+            'date': "m.date",
+            'date_maturity': "m.date",
+            'name': "'Benchmark ' || m.name",
+            'account_id': "(%(account_ids)s::int[])[1 + (m.id * 2 + (t.debit > 0)::int) %% %(accounts)s]",
+            'partner_id': "(%(partner_ids)s::int[])[1 + m.id %% %(partners)s]",
+            'debit': "CASE WHEN t.debit > 0 THEN " + amount + " ELSE 0 END",
+            'credit': "CASE WHEN t.credit > 0 THEN " + amount + " ELSE 0 END",
+            'balance': sign + " * " + amount,
+            'amount_currency': sign + " * " + amount,
+            'amount_residual': sign + " * " + amount,
+            'amount_residual_currency': sign + " * " + amount,
+        }, """
+            FROM account_move m
+            JOIN account_move_line t ON t.move_id = %(template)s
+            WHERE m.id > %(last_move)s
+        """, params)
+        cls.line_count += moves * 2
+        cls.env['account.move.line.balance'].rebuild()
+        cls.env.cr.execute("ANALYZE account_move, account_move_line, account_move_line_balance")
+        cls.env.invalidate_all()
+
+    def _get_report_call(self, wizard_model, values):
+        """ Returns the report model, the docids and the data a wizard prints its report with. """
+        wizard = self.env[wizard_model].create(values)
+        action = wizard.check_report()
+        context = dict(action.get('context') or {})
+        context.setdefault('active_model', (action.get('data') or {}).get('model') or 'ir.ui.menu')
+        report = self.env['report.%s' % action['report_name']].with_context(context)
+        return report, context.get('active_ids') or [], action.get('data')
+
+    def _reset_caches(self):
+        with _report_cache_lock:
+            _report_cache.clear()
+        self.env.cr.cache.pop(QUERY_GET_CACHE_KEY, None)
+        self.env.invalidate_all()
+
+    def _get_report_values(self, report, docids, data):
+        """ Returns the report values, the lines of the ledgers being read as the template
+        does: above the stream threshold they are LedgerLines, only fetched when iterated. """
+        values = report._get_report_values(docids, data)
+        for account in values.get('Accounts') or []:
+            for line in account.get('move_lines') or []:
+                pass
+        return values
+
+    def _measure(self, report, docids, data):
+        """ Returns the wall time, the number of queries and the peak memory of one
+        computation of the report values, the memory being traced in a second run not to
+        slow the timed one down. """
+        self._reset_caches()
+        queries = self.env.cr.sql_log_count
+        start = time.perf_counter()
+        self._get_report_values(report, docids, data)
+        wall_time = time.perf_counter() - start
+        queries = self.env.cr.sql_log_count - queries
+
+        self._reset_caches()
+        tracemalloc.start()
+        try:
+            self._get_report_values(report, docids, data)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return {'time': round(wall_time, 4), 'queries': queries, 'peak_memory': peak_memory}
+
+    def _run_benchmark(self, reports):
+        """ Measure the given (name, wizard model, wizard values) reports at every size and
+        compare the measures with the baseline. """
+        for size in SIZES:
+            self._generate_lines(size)
+            for name, wizard_model, values in reports:
+                report, docids, data = self._get_report_call(wizard_model, values)
+                measure = self._measure(report, docids, data)
+                _logger.info("Benchmark %s on %s journal items: %s", name, self.line_count, measure)
+                self.results.setdefault(name, {})[str(size)] = measure
+        self._check_baseline()
+
+    def _check_baseline(self):
+        baseline = {}
+        if os.path.exists(BASELINE):
+            with open(BASELINE) as baseline_file:
+                baseline = json.load(baseline_file)
+        regressions = []
+        for name, sizes in self.results.items():
+            for size, measure in sizes.items():
+                reference = baseline.get(name, {}).get(size)
+                if not reference or UPDATE_BASELINE:
+                    continue
+                for key in ('time', 'queries', 'peak_memory'):
+                    if measure[key] > reference[key] * TOLERANCE:
+                        regressions.append("%s on %s journal items: %s %s instead of %s" % (
+                            name, size, key, measure[key], reference[key]))
+        if UPDATE_BASELINE or not all(name in baseline for name in self.results):
+            for name, sizes in self.results.items():
+                if UPDATE_BASELINE or name not in baseline:
+                    baseline[name] = sizes
+            with open(BASELINE, 'w') as baseline_file:
+                json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+            _logger.info("Benchmark baseline written to %s", BASELINE)
+        self.assertFalse(regressions, "Accounting report regressions:\n%s" % "\n".join(regressions))
+
+    def _get_report_dates(self):
+        return {'date_from': REPORT_DATE_FROM, 'date_to': REPORT_DATE_TO}
@@ -0,0 +1,112 @@
+from odoo import Command
+from odoo.tests import new_test_user, tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestDailyBalances(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.DailyBalance = cls.env['account.move.line.balance']
+        cls.DailyBalance.rebuild()
+        cls.receivable = cls.company_data['default_account_receivable']
+        cls.revenue = cls.company_data['default_account_revenue']
+
+    def _create_entry(self, amount, date='2025-01-10', **values):
+        return self.env['account.move'].create({
+            'move_type': 'entry',
+            'journal_id': self.company_data['default_journal_misc'].id,
+            'date': date,
+            'line_ids': [
+                Command.create({'account_id': self.receivable.id, 'partner_id': self.partner_a.id, 'debit': amount}),
+                Command.create({'account_id': self.revenue.id, 'credit': amount}),
+            ],
+            **values,
+        })
+
+    def _get_balance(self, account, date='2025-01-10'):
+        """ Returns the debit, credit and number of lines of the daily balances of the account. """
+        self.env.flush_all()
+        self.env.cr.execute("""
+            SELECT COALESCE(SUM(debit), 0), COALESCE(SUM(credit), 0), COALESCE(SUM(line_count), 0)
+            FROM account_move_line_balance
+            WHERE account_id = %s AND date = %s
+        """, [account.id, date])
+        return self.env.cr.fetchone()
+
+    def assertConsistent(self):
+        self.assertEqual(self.DailyBalance.check_consistency(), [])
+
+    def test_post_reset_cancel(self):
+        move = self._create_entry(100.0)
+        self.assertEqual(self._get_balance(self.receivable), (0.0, 0.0, 0))
+        move.action_post()
+        self.assertEqual(self._get_balance(self.receivable), (100.0, 0.0, 1))
+        self.assertEqual(self._get_balance(self.revenue), (0.0, 100.0, 1))
+        self.assertConsistent()
+        move.button_draft()
+        self.assertEqual(self._get_balance(self.receivable), (0.0, 0.0, 0))
+        self.assertConsistent()
+        move.action_post()
+        move.button_draft()
+        move.button_cancel()
+        self.assertEqual(self._get_balance(self.receivable), (0.0, 0.0, 0))
+        self.assertConsistent()
+
+    def test_date_change(self):
+        move = self._create_entry(100.0)
+        move.action_post()
+        move.button_draft()
+        move.date = '2025-02-10'
+        move.action_post()
+        self.assertEqual(self._get_balance(self.receivable), (0.0, 0.0, 0))
+        self.assertEqual(self._get_balance(self.receivable, '2025-02-10'), (100.0, 0.0, 1))
+        self.assertConsistent()
+
+    def test_posted_lines_changes(self):
+        move = self._create_entry(100.0, state='posted')
+        self.assertEqual(self._get_balance(self.receivable), (100.0, 0.0, 1))
+        self.assertConsistent()
+
+        move.write({'line_ids': [
+            Command.create({'account_id': self.receivable.id, 'partner_id': self.partner_b.id, 'debit': 30.0}),
+            Command.create({'account_id': self.revenue.id, 'credit': 30.0}),
+        ]})
+        self.assertEqual(self._get_balance(self.receivable), (130.0, 0.0, 2))
+        self.assertConsistent()
+
+        move.line_ids.filtered(lambda line: line.partner_id == self.partner_b).partner_id = self.partner_a
+        self.assertConsistent()
+
+        added_lines = move.line_ids.filtered(lambda line: line.balance in (30.0, -30.0))
+        move.write({'line_ids': [Command.delete(line.id) for line in added_lines]})
+        self.assertEqual(self._get_balance(self.receivable), (100.0, 0.0, 1))
+        self.assertConsistent()
+
+    def test_compact(self):
+        for amount in (10.0, 20.0, 30.0):
+            self._create_entry(amount).action_post()
+        cancelled = self._create_entry(40.0)
+        cancelled.action_post()
+        cancelled.button_draft()
+        self.DailyBalance._compact()
+        self.assertEqual(self._get_balance(self.receivable), (60.0, 0.0, 3))
+        self.assertEqual(self.DailyBalance.search_count([
+            ('account_id', '=', self.receivable.id), ('date', '=', '2025-01-10'),
+        ]), 1)
+        self.assertConsistent()
+
+    def test_record_rules(self):
+        user = new_test_user(self.env, login='daily_balances_user', groups='account.group_account_user')
+        DailyBalance = self.DailyBalance.with_user(user).with_context(state='posted')
+        self.assertTrue(DailyBalance._can_read_balances())
+        # the daily balances can't tell the journal of the items the rule hides
+        self.env['ir.rule'].create({
+            'name': 'Journal items of the miscellaneous journal',
+            'model_id': self.env['ir.model']._get_id('account.move.line'),
+            'domain_force': "[('journal_id', '=', %s)]" % self.company_data['default_journal_misc'].id,
+        })
+        self.assertFalse(DailyBalance._can_read_balances())
@@ -0,0 +1,99 @@
+from collections import defaultdict
+
+from odoo import Command
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestReportAgedPartner(AccountTestInvoicingCommon):
+    """ The set based _get_partner_move_amounts must age the open amounts like the line by
+    line _get_partner_move_lines. """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.receivable = cls.company_data['default_account_receivable']
+        cls.report = cls.env['report.accounting_pdf_reports.report_agedpartnerbalance']
+        # on the boundaries of the 30 days periods as of 2025-03-31
+        for invoice_date, amount in [('2025-03-31', 100.0), ('2025-03-30', 200.0), ('2025-03-01', 300.0),
+                                     ('2025-02-28', 400.0), ('2024-10-01', 500.0)]:
+            cls.init_invoice('out_invoice', partner=cls.partner_a, invoice_date=invoice_date,
+                             amounts=[amount], post=True)
+        cls.init_invoice('out_invoice', partner=cls.partner_a, invoice_date='2025-02-15',
+                         amounts=[1000.0], currency=cls.other_currency, post=True)
+        cls._create_payment(cls.partner_a, 70.0, '2025-03-10')
+
+        # partially paid before and after 2025-03-31
+        invoice = cls.init_invoice('out_invoice', partner=cls.partner_b, invoice_date='2025-03-15',
+                                   amounts=[250.0], post=True)
+        cls._reconcile(invoice, cls._create_payment(cls.partner_b, 30.0, '2025-03-20'))
+        cls._reconcile(invoice, cls._create_payment(cls.partner_b, 50.0, '2025-04-10'))
+        # paid after 2025-03-31, in a foreign currency
+        invoice = cls.init_invoice('out_invoice', partner=cls.partner_b, invoice_date='2025-01-10',
+                                   amounts=[150.0], currency=cls.other_currency, post=True)
+        cls._reconcile(invoice, cls._create_payment(cls.partner_b, invoice.amount_total_signed, '2025-04-05'))
+
+    @classmethod
+    def _create_payment(cls, partner, amount, date):
+        payment = cls.env['account.move'].create({
+            'move_type': 'entry',
+            'journal_id': cls.company_data['default_journal_misc'].id,
+            'date': date,
+            'line_ids': [
+                Command.create({'account_id': cls.receivable.id, 'partner_id': partner.id, 'credit': amount}),
+                Command.create({'account_id': cls.company_data['default_account_revenue'].id, 'debit': amount}),
+            ],
+        })
+        payment.action_post()
+        return payment
+
+    @classmethod
+    def _reconcile(cls, invoice, payment):
+        (invoice + payment).line_ids.filtered(lambda line: line.account_id == cls.receivable).reconcile()
+
+    def _get_period_amounts(self, lines):
+        amounts = defaultdict(float)
+        for partner_id, partner_lines in lines.items():
+            for line in partner_lines:
+                amounts[partner_id, line['period']] += line['amount']
+        return {key: round(amount, 2) for key, amount in amounts.items() if round(amount, 2)}
+
+    def assertSameAgeing(self, date_from, period_length):
+        args = (['asset_receivable'], [], date_from, 'posted', period_length)
+        res, total, lines = self.report._get_partner_move_lines(*args)
+        amounts_res, amounts_total, amounts_lines = self.report._get_partner_move_amounts(*args)
+        self.assertEqual([values['partner_id'] for values in amounts_res],
+                         [values['partner_id'] for values in res])
+        for values, expected in zip(amounts_res, res):
+            for key in ('direction', '0', '1', '2', '3', '4', 'total'):
+                self.assertAlmostEqual(values[key], expected[key], places=2,
+                                       msg="%s of partner %s as of %s" % (key, expected['partner_id'], date_from))
+        for index, (amount, expected) in enumerate(zip(amounts_total, total)):
+            self.assertAlmostEqual(amount, expected, places=2, msg="total %s as of %s" % (index, date_from))
+        self.assertEqual(self._get_period_amounts(amounts_lines), self._get_period_amounts(lines))
+
+    def test_ageing(self):
+        for date_from in ('2025-03-31', '2025-04-07', '2025-04-30', '2025-01-31'):
+            for period_length in (30, 15):
+                with self.subTest(date_from=date_from, period_length=period_length):
+                    self.assertSameAgeing(date_from, period_length)
+
+    def test_ageing_boundaries(self):
+        res, total, dummy = self.report._get_partner_move_amounts(
+            ['asset_receivable'], [self.partner_a.id], '2025-03-31', 'posted', 30)
+        values = next(values for values in res if values['partner_id'] == self.partner_a.id)
+        # due on the report date: not due yet, the day before: in the first period
+        self.assertAlmostEqual(values['direction'], self._get_invoice_amount('2025-03-31'), places=2)
+        self.assertAlmostEqual(
+            values['4'],
+            self._get_invoice_amount('2025-03-30') + self._get_invoice_amount('2025-03-01') - 70.0,
+            places=2)
+
+    def _get_invoice_amount(self, invoice_date):
+        return sum(self.env['account.move'].search([
+            ('partner_id', '=', self.partner_a.id),
+            ('invoice_date', '=', invoice_date),
+            ('move_type', '=', 'out_invoice'),
+        ]).mapped('amount_total_signed'))
@@ -0,0 +1,25 @@
+from odoo.tests import tagged
+
+from .common import AccountReportBenchmarkCase, REPORT_DATE_TO
+
+
+@tagged('post_install', '-at_install', '-standard', 'benchmark')
+class TestReportBenchmark(AccountReportBenchmarkCase):
+
+    def test_benchmark_reports(self):
+        journals = self.env['account.journal'].search([('company_id', '=', self.company.id)])
+        common = dict(self._get_report_dates(), target_move='posted', journal_ids=[(6, 0, journals.ids)])
+        self._run_benchmark([
+            ('report_general_ledger', 'account.report.general.ledger',
+             dict(common, initial_balance=True, display_account='movement')),
+            ('report_partnerledger', 'account.report.partner.ledger',
+             dict(common, result_selection='customer_supplier', reconciled=True)),
+            ('report_agedpartnerbalance', 'account.aged.trial.balance',
+             dict(common, date_from=REPORT_DATE_TO, date_to=False, period_length=30,
+                  result_selection='customer_supplier')),
+            ('report_trialbalance', 'account.balance.report',
+             dict(common, display_account='movement')),
+            ('report_financial', 'accounting.report',
+             dict(common, account_report_id=self.env.ref(
+                 'accounting_pdf_reports.account_financial_report_balancesheet0').id)),
+        ])
@@ -0,0 +1,91 @@
+from odoo import Command
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestReportFinancial(AccountTestInvoicingCommon):
+    """ The balances of the financial reports, fetched for all the accounts and periods at
+    once, must be the sums of the journal items of every node. """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.report = cls.env['report.accounting_pdf_reports.report_financial']
+        cls.receivable = cls.company_data['default_account_receivable']
+        cls.revenue = cls.company_data['default_account_revenue']
+        cls.expense = cls.company_data['default_account_expense']
+        FinancialReport = cls.env['account.financial.report']
+        cls.root = FinancialReport.create({'name': 'Root'})
+        cls.receivables = FinancialReport.create({
+            'name': 'Receivables',
+            'parent_id': cls.root.id,
+            'type': 'accounts',
+            'account_ids': [Command.set(cls.receivable.ids)],
+        })
+        cls.income = FinancialReport.create({
+            'name': 'Income',
+            'parent_id': cls.root.id,
+            'type': 'account_type',
+            'account_type_ids': [Command.set(cls.env.ref('accounting_pdf_reports.data_account_type_revenue').ids)],
+        })
+        cls.linked = FinancialReport.create({
+            'name': 'Receivables Again',
+            'parent_id': cls.root.id,
+            'type': 'account_report',
+            'account_report_id': cls.receivables.id,
+        })
+        moves = cls.env['account.move'].create([{
+            'move_type': 'entry',
+            'journal_id': cls.company_data['default_journal_misc'].id,
+            'date': move_date,
+            'line_ids': [
+                Command.create({'account_id': cls.receivable.id, 'debit': amount}),
+                Command.create({'account_id': cls.revenue.id, 'credit': amount * 0.75}),
+                Command.create({'account_id': cls.expense.id, 'credit': amount * 0.25}),
+            ],
+        } for move_date, amount in [
+            ('2024-11-20', 40.0), ('2024-12-31', 100.0), ('2025-01-01', 200.0), ('2025-01-31', 400.0),
+        ]])
+        moves.action_post()
+
+    def _get_expected_balance(self, accounts, date_from, date_to):
+        lines = self.env['account.move.line'].search([
+            ('account_id', 'in', accounts.ids),
+            ('parent_state', '=', 'posted'),
+            ('date', '>=', date_from),
+            ('date', '<=', date_to),
+        ])
+        return {
+            'debit': sum(lines.mapped('debit')),
+            'credit': sum(lines.mapped('credit')),
+            'balance': sum(lines.mapped('balance')),
+        }
+
+    def assertSameBalance(self, res, expected):
+        for key in ('debit', 'credit', 'balance'):
+            self.assertAlmostEqual(res[key], expected[key], places=2)
+
+    def test_report_balance_periods(self):
+        periods = [('2025-01-01', '2025-01-31'), ('2024-12-01', '2024-12-31'), ('2024-11-01', '2024-11-30')]
+        contexts = [{
+            'date_from': date_from, 'date_to': date_to, 'state': 'posted', 'strict_range': True,
+        } for date_from, date_to in periods]
+        reports = self.root._get_children_by_order()
+        period_res = self.report._compute_report_balance_periods(reports, contexts)
+        revenue_accounts = self.env['account.account'].search([('account_type', '=', 'income')])
+        for (date_from, date_to), context, res in zip(periods, contexts, period_res):
+            with self.subTest(date_from=date_from):
+                receivables = self._get_expected_balance(self.receivable, date_from, date_to)
+                income = self._get_expected_balance(revenue_accounts, date_from, date_to)
+                self.assertSameBalance(res[self.receivables.id], receivables)
+                self.assertSameBalance(res[self.linked.id], receivables)
+                self.assertSameBalance(res[self.income.id], income)
+                self.assertSameBalance(res[self.root.id], {
+                    key: 2 * receivables[key] + income[key] for key in receivables
+                })
+                # the periods computed one by one
+                single_res = self.report.with_context(context)._compute_report_balance(reports)
+                for report in reports:
+                    self.assertSameBalance(res[report.id], single_res[report.id])
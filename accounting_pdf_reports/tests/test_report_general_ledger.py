@@ -0,0 +1,96 @@
+from odoo import Command
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestReportGeneralLedger(AccountTestInvoicingCommon):
+    """ The running balance of the ledger lines, computed by a window function, must be the
+    one accumulated line by line in the printed order. """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.report = cls.env['report.accounting_pdf_reports.report_general_ledger']
+        cls.receivable = cls.company_data['default_account_receivable']
+        cls.revenue = cls.company_data['default_account_revenue']
+        cls.accounts = cls.receivable | cls.revenue
+        misc = cls.company_data['default_journal_misc']
+        sale = cls.company_data['default_journal_sale']
+        moves = cls.env['account.move'].create([{
+            'move_type': 'entry',
+            'journal_id': journal.id,
+            'date': move_date,
+            'line_ids': [
+                Command.create({'account_id': cls.receivable.id, 'partner_id': partner.id, 'debit': amount})
+                for partner in partners
+            ] + [
+                Command.create({'account_id': cls.revenue.id, 'credit': amount * len(partners)}),
+            ],
+        } for journal, move_date, amount, partners in [
+            (misc, '2024-12-15', 70.0, cls.partner_a),
+            (sale, '2025-01-10', 100.0, cls.partner_b),
+            (misc, '2025-01-10', 20.0, cls.partner_a | cls.partner_b),
+            (misc, '2025-01-05', 300.0, cls.env['res.partner']),
+            (sale, '2025-01-20', 40.0, cls.partner_a),
+        ]])
+        moves.action_post()
+        # a draft entry is not in the ledger of the posted entries
+        moves[0].copy({'date': '2025-01-12'})
+
+    def _get_expected_lines(self, account, sortby, init_balance):
+        """ Returns the (id, debit, credit, balance) of the ledger lines of the account, the
+        balance being accumulated line by line from the initial balance. """
+        lines = self.env['account.move.line'].search([
+            ('account_id', '=', account.id),
+            ('parent_state', '=', 'posted'),
+            ('date', '<=', '2025-01-31'),
+        ])
+        balance = 0.0
+        expected = []
+        if init_balance:
+            initial_lines = lines.filtered(lambda line: str(line.date) < '2025-01-01')
+            balance = sum(initial_lines.mapped('balance'))
+            expected.append((0, sum(initial_lines.mapped('debit')), sum(initial_lines.mapped('credit')), balance))
+        lines = lines.filtered(lambda line: str(line.date) >= '2025-01-01')
+        if sortby == 'sort_journal_partner':
+            key = lambda line: (line.journal_id.code, not line.partner_id, line.partner_id.name or '',
+                                line.move_id.id, line.id)
+        else:
+            key = lambda line: (line.date, line.move_id.id, line.id)
+        for line in lines.sorted(key):
+            balance += line.debit - line.credit
+            expected.append((line.id, line.debit, line.credit, balance))
+        return expected
+
+    def _get_ledger_lines(self, sortby, init_balance):
+        report = self.report.with_context(date_from='2025-01-01', date_to='2025-01-31', state='posted',
+                                          strict_range=True)
+        account_res = report._get_account_move_entry(self.accounts, [], [], init_balance, sortby, 'movement')
+        return {
+            res['code']: [(line['lid'], line['debit'], line['credit'], line['balance']) for line in res['move_lines']]
+            for res in account_res
+        }
+
+    def assertSameLines(self, lines, expected):
+        self.assertEqual([line[0] for line in lines], [line[0] for line in expected])
+        for line, expected_line in zip(lines, expected):
+            for value, expected_value in zip(line[1:], expected_line[1:]):
+                self.assertAlmostEqual(value, expected_value, places=2)
+
+    def test_running_balance(self):
+        for sortby in ('sort_date', 'sort_journal_partner'):
+            for init_balance in (True, False):
+                with self.subTest(sortby=sortby, init_balance=init_balance):
+                    lines = self._get_ledger_lines(sortby, init_balance)
+                    for account in self.accounts:
+                        self.assertSameLines(lines[account.code], self._get_expected_lines(account, sortby, init_balance))
+
+    def test_running_balance_streamed(self):
+        lines = self._get_ledger_lines('sort_date', True)
+        self.env['ir.config_parameter'].sudo().set_param('accounting_pdf_reports.ledger_stream_threshold', '0')
+        streamed = self._get_ledger_lines('sort_date', True)
+        self.assertEqual(list(streamed), list(lines))
+        for code, account_lines in lines.items():
+            self.assertSameLines(streamed[code], account_lines)
@@ -0,0 +1,70 @@
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestReportJournal(AccountTestInvoicingCommon):
+    """ The journal audit totals and taxes of all the journals, computed by grouped queries,
+    must be the sums of the journal items of every journal. """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.report = cls.env['report.accounting_pdf_reports.report_journal']
+        cls.journals = cls.company_data['default_journal_sale'] | cls.company_data['default_journal_purchase'] \
+            | cls.company_data['default_journal_misc']
+        for move_type, taxes, amounts in [
+            ('out_invoice', cls.tax_sale_a, [100.0, 250.0]),
+            ('out_invoice', cls.tax_sale_a | cls.tax_sale_b, [80.0]),
+            ('out_refund', cls.tax_sale_a, [30.0]),
+            ('in_invoice', cls.tax_purchase_a, [400.0]),
+        ]:
+            cls.init_invoice(move_type, partner=cls.partner_a, invoice_date='2025-01-15', amounts=amounts,
+                             taxes=taxes, post=True)
+        # a draft invoice is only in the audit of all the entries
+        cls.init_invoice('out_invoice', partner=cls.partner_a, invoice_date='2025-01-20', amounts=[60.0],
+                         taxes=cls.tax_sale_a)
+
+    def _get_data(self, target_move):
+        return {'form': {
+            'target_move': target_move,
+            'journal_ids': self.journals.ids,
+            'used_context': {
+                'date_from': '2025-01-01', 'date_to': '2025-01-31', 'strict_range': True,
+                'state': target_move, 'journal_ids': self.journals.ids,
+            },
+        }}
+
+    def _get_expected_taxes(self, lines, journal):
+        """ Returns the tax declaration of the journal items of a journal, the amounts of the
+        sales being credits. """
+        sign = -1 if journal.type == 'sale' else 1
+        return {
+            tax: {
+                'base_amount': sign * sum(lines.filtered(lambda line: tax in line.tax_ids).mapped('balance')),
+                'tax_amount': sign * sum(lines.filtered(lambda line: line.tax_line_id == tax).mapped('balance')),
+            }
+            for tax in lines.tax_ids
+        }
+
+    def test_journals_totals_and_taxes(self):
+        for target_move in ('posted', 'all'):
+            with self.subTest(target_move=target_move):
+                data = self._get_data(target_move)
+                totals, taxes = self.report._get_journals_totals_and_taxes(data, self.journals)
+                move_states = ['posted'] if target_move == 'posted' else ['draft', 'posted']
+                for journal in self.journals:
+                    lines = self.env['account.move.line'].search([
+                        ('journal_id', '=', journal.id),
+                        ('parent_state', 'in', move_states),
+                        ('date', '>=', '2025-01-01'),
+                        ('date', '<=', '2025-01-31'),
+                    ])
+                    self.assertAlmostEqual(totals[journal.id]['debit'], sum(lines.mapped('debit')), places=2)
+                    self.assertAlmostEqual(totals[journal.id]['credit'], sum(lines.mapped('credit')), places=2)
+                    expected_taxes = self._get_expected_taxes(lines, journal)
+                    self.assertEqual(set(taxes[journal.id]), set(expected_taxes))
+                    for tax, amounts in expected_taxes.items():
+                        for key in ('base_amount', 'tax_amount'):
+                            self.assertAlmostEqual(taxes[journal.id][tax][key], amounts[key], places=2)
@@ -17,6 +17,11 @@ class AccountReportGeneralLedger(models.TransientModel):
         [('sort_date', 'Date'), ('sort_journal_partner', 'Journal & Partner')],
         string='Sort by', required=True, default='sort_date'
     )
+    analytic_grouping = fields.Boolean(
+        string='Group by Analytic Account',
+        help='Print the ledger of each analytic account instead of each account, '
+             'the journal items being printed for their share in the analytic account.'
+    )
     journal_ids = fields.Many2many(
         'account.journal', 'account_report_general_ledger_journal_rel',
         'account_id', 'journal_id', string='Journals', required=True
@@ -24,7 +29,7 @@ class AccountReportGeneralLedger(models.TransientModel):
 
     def _get_report_data(self, data):
         data = self.pre_print_report(data)
-        data['form'].update(self.read(['initial_balance', 'sortby'])[0])
+        data['form'].update(self.read(['initial_balance', 'sortby', 'analytic_grouping'])[0])
         if data['form'].get('initial_balance') and not data['form'].get('date_from'):
             raise UserError(_("You must define a Start Date"))
         records = self.env[data['model']].browse(data.get('ids', []))
@@ -32,4 +37,9 @@ class AccountReportGeneralLedger(models.TransientModel):
 
     def _print_report(self, data):
         records, data = self._get_report_data(data)
+        if self.env.context.get('report_xlsx'):
+            return self.env.ref('accounting_pdf_reports.action_report_general_ledger_xlsx').report_action(records, data=data)
         return self.env.ref('accounting_pdf_reports.action_report_general_ledger').with_context(landscape=True).report_action(records, data=data)
+
+    def check_report_xlsx(self):
+        return self.with_context(report_xlsx=True).check_report()
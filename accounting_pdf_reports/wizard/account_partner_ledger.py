@@ -20,5 +20,10 @@ class AccountPartnerLedger(models.TransientModel):
 
     def _print_report(self, data):
         data = self._get_report_data(data)
+        if self.env.context.get('report_xlsx'):
+            return self.env.ref('accounting_pdf_reports.action_report_partnerledger_xlsx').report_action(self, data=data)
         return self.env.ref('accounting_pdf_reports.action_report_partnerledger').with_context(landscape=True).\
             report_action(self, data=data)
+
+    def check_report_xlsx(self):
+        return self.with_context(report_xlsx=True).check_report()
@@ -33,6 +33,7 @@ class AccountingReport(models.TransientModel):
         result = {}
         result['journal_ids'] = 'journal_ids' in data['form'] and data['form']['journal_ids'] or False
         result['state'] = 'target_move' in data['form'] and data['form']['target_move'] or ''
+        result['company_id'] = data['form']['company_id'] and data['form']['company_id'][0] or False
         if data['form']['filter_cmp'] == 'filter_date':
             result['date_from'] = data['form']['date_from_cmp']
             result['date_to'] = data['form']['date_to_cmp']
@@ -42,7 +43,7 @@ class AccountingReport(models.TransientModel):
     def check_report(self):
         res = super(AccountingReport, self).check_report()
         data = {}
-        data['form'] = self.read(['account_report_id', 'date_from_cmp', 'date_to_cmp', 'journal_ids', 'filter_cmp', 'target_move'])[0]
+        data['form'] = self.read(['account_report_id', 'date_from_cmp', 'date_to_cmp', 'journal_ids', 'filter_cmp', 'target_move', 'company_id'])[0]
         for field in ['account_report_id']:
             if isinstance(data['form'][field], tuple):
                 data['form'][field] = data['form'][field][0]
@@ -50,3 +50,18 @@ class AccountCommonReport(models.TransientModel):
         used_context = self._build_contexts(data)
         data['form']['used_context'] = dict(used_context, lang=get_lang(self.env).code)
         return self.with_context(discard_logo_check=True)._print_report(data)
+
+    def action_print_background(self):
+        action = self.check_report()
+        if action.get('type') != 'ir.actions.report':
+            return action
+        self.env['account.report.job']._enqueue(action)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'info',
+                'message': _("The report is printed in the background, you will be notified when it is ready."),
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
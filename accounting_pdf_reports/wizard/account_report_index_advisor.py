@@ -0,0 +1,302 @@
+import logging
+import threading
+from datetime import date
+
+import psycopg2
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# the indexes matching the filters of the accounting reports, with a query of the same shape
+# whose EXPLAIN estimates what they save; its parameters come from _get_sample_params
+REPORT_INDEXES = [
+    {
+        'name': 'account_move_line_report_account_date_idx',
+        'table': 'account_move_line',
+        'columns': 'account_id, date',
+        'where': "parent_state = 'posted'",
+        'description': "General ledger, trial balance and financial reports on posted entries",
+        'sample': """
+            SELECT account_id, SUM(debit), SUM(credit), SUM(balance)
+            FROM account_move_line
+            WHERE account_id = %(account_id)s AND date >= %(date_from)s AND date <= %(date_to)s
+                AND parent_state = 'posted'
+            GROUP BY account_id
+        """,
+    },
+    {
+        'name': 'account_move_line_report_partner_open_idx',
+        'table': 'account_move_line',
+        'columns': 'partner_id, account_id',
+        'where': "full_reconcile_id IS NULL",
+        'description': "Partner ledger and aged balance on the unreconciled items",
+        'sample': """
+            SELECT id, date, debit, credit
+            FROM account_move_line
+            WHERE partner_id = %(partner_id)s AND account_id = %(account_id)s
+                AND full_reconcile_id IS NULL
+        """,
+    },
+    {
+        'name': 'account_move_line_report_followup_idx',
+        'table': 'account_move_line',
+        'columns': 'company_id, partner_id, date_maturity',
+        'where': "full_reconcile_id IS NULL",
+        'description': "Follow-ups of the open receivables by due date",
+        'sample': """
+            SELECT l.partner_id, SUM(l.debit - l.credit), MIN(l.date_maturity)
+            FROM account_move_line l
+            JOIN account_account a ON a.id = l.account_id
+            WHERE a.account_type = 'asset_receivable' AND l.company_id = %(company_id)s
+                AND l.partner_id = %(partner_id)s AND l.full_reconcile_id IS NULL
+            GROUP BY l.partner_id
+        """,
+    },
+    {
+        'name': 'account_move_line_report_journal_date_idx',
+        'table': 'account_move_line',
+        'columns': 'journal_id, date',
+        'where': "parent_state = 'posted'",
+        'description': "Journal audit, day book, cash book and bank book on posted entries",
+        'sample': """
+            SELECT id, account_id, debit, credit
+            FROM account_move_line
+            WHERE journal_id = %(journal_id)s AND date >= %(date_from)s AND date <= %(date_to)s
+                AND parent_state = 'posted'
+        """,
+    },
+    {
+        # only created by the module update when account_move_line is small (see
+        # ANALYTIC_INDEX_MAX_ROWS), the larger tables are indexed from here without locking them
+        'name': 'account_move_line_analytic_account_ids_index',
+        'table': 'account_move_line',
+        'method': 'gin',
+        'columns': 'analytic_distribution_account_ids(analytic_distribution)',
+        'where': '',
+        'description': "General ledger and trial balance filtered or grouped by analytic account",
+        'sample': """
+            SELECT id, account_id, debit, credit
+            FROM account_move_line
+            WHERE analytic_distribution_account_ids(analytic_distribution) && %(analytic_account_ids)s::int[]
+        """,
+    },
+]
+
+
+def _get_index_definition(index, concurrently=False):
+    return 'CREATE INDEX %s%s ON %s USING %s (%s)%s' % (
+        'CONCURRENTLY IF NOT EXISTS ' if concurrently else '',
+        index['name'] if concurrently else '',
+        index['table'],
+        index.get('method', 'btree'),
+        index['columns'],
+        ' WHERE %s' % index['where'] if index['where'] else '',
+    )
+
+
+def _get_plan_scans(plan):
+    """ Returns the scans of an EXPLAIN plan, e.g. "Seq Scan on account_move_line". """
+    scans = []
+    if plan.get('Index Name'):
+        scans.append('%s using %s' % (plan['Node Type'], plan['Index Name']))
+    elif plan.get('Relation Name'):
+        scans.append('%s on %s' % (plan['Node Type'], plan['Relation Name']))
+    for child in plan.get('Plans', []):
+        scans += _get_plan_scans(child)
+    return scans
+
+
+class AccountReportIndexAdvisor(models.TransientModel):
+    """ Lists the indexes of REPORT_INDEXES, whether they exist in the database and the
+    cost of the reports queries with and without them, and creates the missing ones.
+
+    The cost with a missing index is only estimated when the hypopg extension, which
+    lets the planner consider hypothetical indexes, is installed in the database. """
+    _name = "account.report.index.advisor"
+    _description = "Accounting Reports Index Advisor"
+
+    line_ids = fields.One2many('account.report.index.advisor.line', 'advisor_id', string='Indexes')
+    hypothetical = fields.Boolean(string='Hypothetical Indexes', readonly=True,
+                                  help="The hypopg extension is installed, the benefit of the missing indexes is estimated.")
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        hypothetical = self._has_hypothetical_indexes()
+        res['hypothetical'] = hypothetical
+        res['line_ids'] = [(0, 0, values) for values in self._get_index_status(hypothetical)]
+        return res
+
+    @api.model
+    def _has_hypothetical_indexes(self):
+        self._cr.execute("SELECT 1 FROM pg_extension WHERE extname = 'hypopg'")
+        return bool(self._cr.fetchone())
+
+    @api.model
+    def _get_existing_indexes(self):
+        """ Returns {name: valid} for the indexes of the catalogue found in the database, an
+        index being invalid when its concurrent creation failed or is still running. """
+        self._cr.execute("""
+            SELECT c.relname, i.indisvalid
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname IN %s
+        """, [tuple(index['name'] for index in REPORT_INDEXES)])
+        return dict(self._cr.fetchall())
+
+    @api.model
+    def _get_sample_params(self):
+        """ Returns the parameters of the sample queries, taken from the last posted journal item. """
+        self._cr.execute("""
+            SELECT company_id, account_id, partner_id, journal_id, date
+            FROM account_move_line
+            WHERE parent_state = 'posted' AND partner_id IS NOT NULL
+            ORDER BY id DESC
+            LIMIT 1
+        """)
+        row = self._cr.fetchone() or (self.env.company.id, 0, 0, 0, fields.Date.context_today(self))
+        self._cr.execute("""
+            SELECT analytic_distribution_account_ids(analytic_distribution)
+            FROM account_move_line
+            WHERE analytic_distribution IS NOT NULL
+            ORDER BY id DESC
+            LIMIT 1
+        """)
+        analytic = self._cr.fetchone()
+        return {
+            'company_id': row[0],
+            'account_id': row[1],
+            'partner_id': row[2],
+            'journal_id': row[3],
+            'date_from': date(row[4].year, 1, 1),
+            'date_to': row[4],
+            'analytic_account_ids': analytic[0] if analytic else [0],
+        }
+
+    @api.model
+    def _explain(self, query, params):
+        """ Returns the estimated cost and the scans of the given query. """
+        self._cr.execute('EXPLAIN (FORMAT JSON) ' + query, params)
+        plan = self._cr.fetchone()[0][0]['Plan']
+        return plan['Total Cost'], _get_plan_scans(plan)
+
+    @api.model
+    def _explain_with_index(self, index, query, params):
+        """ Returns what _explain returns if the given index existed, using a hypopg
+        hypothetical index which is only visible to the planner of the current session. """
+        with self._cr.savepoint():
+            self._cr.execute("SELECT * FROM hypopg_create_index(%s)", [_get_index_definition(index)])
+            try:
+                return self._explain(query, params)
+            finally:
+                self._cr.execute("SELECT hypopg_reset()")
+
+    @api.model
+    def _get_index_status(self, hypothetical=False):
+        existing = self._get_existing_indexes()
+        params = self._get_sample_params()
+        status = []
+        for index in REPORT_INDEXES:
+            if index['name'] not in existing:
+                state = 'missing'
+            else:
+                state = 'present' if existing[index['name']] else 'invalid'
+            cost, scans = self._explain(index['sample'], params)
+            values = {
+                'name': index['name'],
+                'table': index['table'],
+                'definition': _get_index_definition(index, concurrently=True),
+                'description': index['description'],
+                'state': state,
+                'cost': cost,
+                'plan': ', '.join(scans),
+                'to_create': state != 'present',
+            }
+            if state != 'present' and hypothetical:
+                index_cost, index_scans = self._explain_with_index(index, index['sample'], params)
+                values.update({
+                    'index_cost': index_cost,
+                    'index_plan': ', '.join(index_scans),
+                    'benefit': 100.0 * (cost - index_cost) / cost if cost else 0.0,
+                })
+            status.append(values)
+        return status
+
+    def _reopen(self):
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'view_mode': 'form',
+            'target': 'new',
+            'name': _('Report Indexes'),
+        }
+
+    def action_refresh(self):
+        return self._reopen()
+
+    @api.model
+    def _create_indexes(self, names):
+        """ Create the given indexes of the catalogue with CREATE INDEX CONCURRENTLY, which
+        does not block the writes on the table, on a cursor of its own in autocommit mode
+        as the statement cannot run in a transaction. """
+        indexes = [index for index in REPORT_INDEXES if index['name'] in names]
+        with self.pool.cursor() as cr:
+            cr._cnx.autocommit = True
+            try:
+                for index in indexes:
+                    _logger.info("Creating the index %s", index['name'])
+                    try:
+                        # an invalid index left by a failed creation is not rebuilt by IF NOT EXISTS
+                        cr.execute('DROP INDEX CONCURRENTLY IF EXISTS %s' % index['name'])
+                        cr.execute(_get_index_definition(index, concurrently=True))
+                    except psycopg2.Error:
+                        _logger.exception("The index %s could not be created", index['name'])
+                    else:
+                        _logger.info("Index %s created", index['name'])
+            finally:
+                cr._cnx.autocommit = False
+
+    def action_create_indexes(self):
+        names = self.line_ids.filtered(lambda line: line.to_create and line.state != 'present').mapped('name')
+        if not names:
+            raise UserError(_("Select the missing indexes to create."))
+        # CREATE INDEX CONCURRENTLY waits for the transactions older than itself, the current
+        # one included: the indexes are built in a thread started once it is committed
+        thread = threading.Thread(
+            target=self.sudo()._create_indexes, args=(names,), name='account_report_indexes', daemon=True)
+        self._cr.postcommit.add(thread.start)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'info',
+                'message': _("%s indexes are being created in the background, "
+                             "refresh the index advisor to follow them.", len(names)),
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
+
+
+class AccountReportIndexAdvisorLine(models.TransientModel):
+    _name = "account.report.index.advisor.line"
+    _description = "Accounting Reports Index Advisor Line"
+
+    advisor_id = fields.Many2one('account.report.index.advisor', required=True, ondelete='cascade')
+    to_create = fields.Boolean(string='Create')
+    name = fields.Char(string='Index', readonly=True)
+    table = fields.Char(string='Table', readonly=True)
+    definition = fields.Char(string='Definition', readonly=True)
+    description = fields.Char(string='Used By', readonly=True)
+    state = fields.Selection([
+        ('missing', 'Missing'),
+        ('invalid', 'Invalid or Building'),
+        ('present', 'Present'),
+    ], string='Status', readonly=True)
+    cost = fields.Float(string='Cost', readonly=True, digits=(16, 2),
+                        help="The planner estimated cost of a report query of the index shape.")
+    plan = fields.Char(string='Plan', readonly=True)
+    index_cost = fields.Float(string='Cost with Index', readonly=True, digits=(16, 2))
+    index_plan = fields.Char(string='Plan with Index', readonly=True)
+    benefit = fields.Float(string='Estimated Benefit (%)', readonly=True, digits=(16, 1))
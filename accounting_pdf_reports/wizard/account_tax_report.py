@@ -15,6 +15,17 @@ class AccountTaxReport(models.TransientModel):
         string='Date To', required=True,
         default=lambda self: fields.Date.to_string(date.today())
     )
+    periodicity = fields.Selection([
+        ('none', 'Whole Period'),
+        ('month', 'Monthly'),
+        ('quarter', 'Quarterly'),
+    ], string='Breakdown', required=True, default='none')
 
     def _print_report(self, data):
+        data['form']['periodicity'] = self.periodicity
+        if self.env.context.get('report_xlsx'):
+            return self.env.ref('accounting_pdf_reports.action_report_account_tax_xlsx').report_action(self, data=data)
         return self.env.ref('accounting_pdf_reports.action_report_account_tax').report_action(self, data=data)
+
+    def check_report_xlsx(self):
+        return self.with_context(report_xlsx=True).check_report()
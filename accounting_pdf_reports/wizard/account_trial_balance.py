@@ -1,4 +1,5 @@
-from odoo import fields, models, api
+from odoo import fields, models, api, _
+from odoo.exceptions import UserError
 
 
 class AccountBalanceReport(models.TransientModel):
@@ -15,12 +16,22 @@ class AccountBalanceReport(models.TransientModel):
         'account.analytic.account',
         'account_trial_balance_analytic_rel', string='Analytic Accounts'
     )
+    monthly_columns = fields.Boolean(
+        string='Monthly Columns',
+        help="Print the opening balance, the debit and credit of every month "
+             "and the closing balance of the accounts.")
 
     def _get_report_data(self, data):
         data = self.pre_print_report(data)
+        data['form'].update(self.read(['monthly_columns'])[0])
+        if data['form']['monthly_columns'] and not (data['form']['date_from'] and data['form']['date_to']):
+            raise UserError(_("You must define a Start Date and an End Date to print monthly columns."))
         records = self.env[data['model']].browse(data.get('ids', []))
         return records, data
 
     def _print_report(self, data):
         records, data = self._get_report_data(data)
-        return self.env.ref('accounting_pdf_reports.action_report_trial_balance').report_action(records, data=data)
+        report = self.env.ref('accounting_pdf_reports.action_report_trial_balance')
+        if data['form']['monthly_columns']:
+            report = report.with_context(landscape=True)
+        return report.report_action(records, data=data)
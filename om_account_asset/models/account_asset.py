@@ -642,12 +642,19 @@ class AccountAssetDepreciationLine(models.Model):
 
         depreciation_date = self.env.context.get('depreciation_date') or fields.Date.context_today(self)
         amount = 0.0
+        # The rate only depends on the currencies and the company, look it up once per pair
+        rates = {}
+        today = fields.Date.today()
         for line in self:
             # Sum amount of all depreciation lines
             company_currency = line.asset_id.company_id.currency_id
             current_currency = line.asset_id.currency_id
             company = line.asset_id.company_id
-            amount += current_currency._convert(line.amount, company_currency, company, fields.Date.today())
+            rate_key = (current_currency, company)
+            if rate_key not in rates:
+                rates[rate_key] = self.env['res.currency']._get_conversion_rate(
+                    current_currency, company_currency, company, today)
+            amount += company_currency.round(line.amount * rates[rate_key])
 
         name = category_id.name + _(' (grouped)')
         move_line_1 = {
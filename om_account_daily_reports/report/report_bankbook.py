@@ -28,7 +28,7 @@ class ReportBankBook(models.AbstractModel):
         """
         cr = self.env.cr
         MoveLine = self.env['account.move.line']
-        move_lines = {x: [] for x in accounts.ids}
+        init_rows = {}
 
         # Prepare initial SQL query and get the initial move lines
         if init_balance:
@@ -67,11 +67,11 @@ class ReportBankBook(models.AbstractModel):
             params = (tuple(accounts.ids),) + tuple(init_where_params)
             cr.execute(sql, params)
             for row in cr.dictfetchall():
-                move_lines[row.pop('account_id')].append(row)
+                init_rows[row.pop('account_id')] = row
 
-        sql_sort = 'l.date, l.move_id'
+        sql_sort = 'l.date, l.move_id, l.id'
         if sortby == 'sort_journal_partner':
-            sql_sort = 'j.code, p.name, l.move_id'
+            sql_sort = 'j.code, p.name, l.move_id, l.id'
 
         # Prepare SQL query based on selected parameters from wizard
         tables, where_clause, where_params = MoveLine._query_get()
@@ -86,38 +86,41 @@ class ReportBankBook(models.AbstractModel):
             for journal in journals:
                 for acc_out in journal.outbound_payment_method_line_ids:
                     if acc_out.payment_account_id:
-                        accounts += acc_out.payment_account_id
+                        accounts |= acc_out.payment_account_id
                 for acc_in in journal.inbound_payment_method_line_ids:
                     if acc_in.payment_account_id:
-                        accounts += acc_in.payment_account_id
+                        accounts |= acc_in.payment_account_id
 
-        sql = ('''
-            SELECT l.id AS lid, l.account_id AS account_id, l.date AS ldate, j.code AS lcode, 
-                   l.currency_id, l.amount_currency, l.ref AS lref, l.name AS lname, 
-                   COALESCE(l.debit, 0) AS debit, COALESCE(l.credit, 0) AS credit, 
-                   COALESCE(SUM(l.debit), 0) - COALESCE(SUM(l.credit), 0) AS balance,
-                   m.name AS move_name, c.symbol AS currency_code, p.name AS partner_name
+        from_clause = """
             FROM account_move_line l
             JOIN account_move m ON (l.move_id = m.id)
             LEFT JOIN res_currency c ON (l.currency_id = c.id)
             LEFT JOIN res_partner p ON (l.partner_id = p.id)
             JOIN account_journal j ON (l.journal_id = j.id)
             JOIN account_account acc ON (l.account_id = acc.id)
-            WHERE l.account_id IN %s ''' + filters + ''' 
-            GROUP BY l.id, l.account_id, l.date, j.code, l.currency_id, l.amount_currency, 
-                     l.ref, l.name, m.name, c.symbol, p.name 
-            ORDER BY ''' + sql_sort
-               )
-
-        params = (tuple(accounts.ids),) + tuple(where_params)
-        cr.execute(sql, params)
-
-        for row in cr.dictfetchall():
-            balance = 0
-            for line in move_lines.get(row['account_id']):
-                balance += line['debit'] - line['credit']
-            row['balance'] += balance
-            move_lines[row.pop('account_id')].append(row)
+            WHERE l.account_id IN %s """ + filters
+        params = [tuple(accounts.ids)] + list(where_params)
+        cr.execute("""
+            SELECT l.account_id AS id, COALESCE(SUM(l.debit), 0) AS debit, COALESCE(SUM(l.credit), 0) AS credit,
+                   COUNT(*) AS count
+        """ + from_clause + " GROUP BY l.account_id", params)
+        totals = {row['id']: row for row in cr.dictfetchall()}
+
+        # The running balance of every line comes from the window function, on top of the initial
+        # balance, the lines are read from a server side cursor while rendering when there are many
+        sql = ("""
+            SELECT l.id AS lid, l.account_id AS account_id, l.date AS ldate, j.code AS lcode,
+                   l.currency_id, l.amount_currency, l.ref AS lref, l.name AS lname,
+                   COALESCE(l.debit, 0) AS debit, COALESCE(l.credit, 0) AS credit,
+                   SUM(COALESCE(l.debit, 0) - COALESCE(l.credit, 0)) OVER (
+                       PARTITION BY l.account_id ORDER BY """ + sql_sort + """
+                       ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) AS balance,
+                   m.name AS move_name, c.symbol AS currency_code, p.name AS partner_name
+        """ + from_clause + """
+            ORDER BY array_position(%s::int[], l.account_id), """ + sql_sort)
+        move_lines = MoveLine._get_ledger_lines(
+            sql, params + [accounts.ids], accounts.ids, init_rows,
+            {account_id: total['count'] for account_id, total in totals.items()})
 
         # Calculate the debit, credit and balance for accounts
         account_res = []
@@ -125,19 +128,17 @@ class ReportBankBook(models.AbstractModel):
             currency = account.currency_id or self.env.company.currency_id
             res = {fn: 0.0 for fn in ['credit', 'debit', 'balance']}
             res.update({'code': account.code, 'name': account.name, 'move_lines': move_lines[account.id]})
-
-            for line in res.get('move_lines'):
-                res['debit'] += line['debit']
-                res['credit'] += line['credit']
-                res['balance'] = line['balance']
-
+            for row in (init_rows.get(account.id), totals.get(account.id)):
+                if row:
+                    res['debit'] += row['debit']
+                    res['credit'] += row['credit']
+            res['balance'] = res['debit'] - res['credit']
             if display_account == 'all':
                 account_res.append(res)
             elif display_account == 'movement' and res.get('move_lines'):
                 account_res.append(res)
             elif display_account == 'not_zero' and not currency.is_zero(res['balance']):
                 account_res.append(res)
-
         return account_res
 
     @api.model
@@ -163,10 +164,10 @@ class ReportBankBook(models.AbstractModel):
             for journal in journals:
                 for acc_out in journal.outbound_payment_method_line_ids:
                     if acc_out.payment_account_id:
-                        accounts += acc_out.payment_account_id
+                        accounts |= acc_out.payment_account_id
                 for acc_in in journal.inbound_payment_method_line_ids:
                     if acc_in.payment_account_id:
-                        accounts += acc_in.payment_account_id
+                        accounts |= acc_in.payment_account_id
 
         record = self.with_context(data['form'].get('comparison_context', {}))._get_account_move_entry(
             accounts, init_balance, sortby, display_account
@@ -0,0 +1,3 @@
+from . import test_report_benchmark
+from . import test_report_cashbook
+from . import test_report_daybook
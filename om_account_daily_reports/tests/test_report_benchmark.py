@@ -0,0 +1,20 @@
+from odoo.tests import tagged
+
+from odoo.addons.accounting_pdf_reports.tests.common import AccountReportBenchmarkCase
+
+
+@tagged('post_install', '-at_install', '-standard', 'benchmark')
+class TestDailyReportBenchmark(AccountReportBenchmarkCase):
+
+    def test_benchmark_books(self):
+        journals = self.env['account.journal'].search([('company_id', '=', self.company.id)])
+        cash_accounts = self.accounts.filtered(lambda account: account.account_type == 'asset_cash')
+        common = dict(self._get_report_dates(), target_move='posted', journal_ids=[(6, 0, journals.ids)])
+        books = dict(common, account_ids=[(6, 0, cash_accounts.ids)], initial_balance=True,
+                     display_account='movement', sortby='sort_date')
+        self._run_benchmark([
+            ('report_cashbook', 'account.cashbook.report', books),
+            ('report_bankbook', 'account.bankbook.report', books),
+            ('report_daybook', 'account.daybook.report',
+             dict(common, account_ids=[(6, 0, self.accounts.ids)])),
+        ])
@@ -0,0 +1,83 @@
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.addons.accounting_pdf_reports.models.account_move_line import LedgerLines
+
+
+@tagged('post_install', '-at_install')
+class TestReportCashBook(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.cash_a, cls.cash_b = cls.env['account.account'].create([{
+            'name': 'Cash %s' % code,
+            'code': 'CSHT%s' % code,
+            'account_type': 'asset_cash',
+        } for code in ('A', 'B')])
+        # the payment account of the outbound lines of both journals is the same, the cash
+        # book lists it once, before the account of the inbound lines
+        cls.journal = cls.company_data['default_journal_cash']
+        cls.journal_2 = cls.env['account.journal'].create({
+            'name': 'Cash 2',
+            'code': 'CSHT2',
+            'type': 'cash',
+        })
+        cls.journal.outbound_payment_method_line_ids.payment_account_id = cls.cash_a
+        cls.journal.inbound_payment_method_line_ids.payment_account_id = cls.cash_b
+        cls.journal_2.outbound_payment_method_line_ids.payment_account_id = cls.cash_a
+        revenue = cls.company_data['default_account_revenue']
+        cls.env['account.move'].create([{
+            'move_type': 'entry',
+            'journal_id': journal.id,
+            'date': move_date,
+            'line_ids': [
+                (0, 0, {'account_id': account.id, 'debit': amount}),
+                (0, 0, {'account_id': revenue.id, 'credit': amount}),
+            ],
+        } for journal, account, move_date, amount in [
+            (cls.journal, cls.cash_a, '2024-12-20', 50.0),
+            (cls.journal, cls.cash_a, '2025-01-05', 100.0),
+            (cls.journal, cls.cash_b, '2025-01-06', 200.0),
+            (cls.journal_2, cls.cash_a, '2025-01-07', 300.0),
+            (cls.journal, cls.cash_b, '2025-01-08', 400.0),
+            (cls.journal, cls.cash_a, '2025-01-09', 500.0),
+        ]]).action_post()
+
+    def _get_cashbook_lines(self):
+        wizard = self.env['account.cashbook.report'].create({
+            'date_from': '2025-01-01',
+            'date_to': '2025-01-31',
+            'journal_ids': [(6, 0, (self.journal | self.journal_2).ids)],
+            'account_ids': [(5, 0, 0)],
+            'initial_balance': True,
+        })
+        data = wizard.check_report()['data']
+        values = self.env['report.om_account_daily_reports.report_cashbook'].with_context(
+            active_model=wizard._name, active_ids=wizard.ids)._get_report_values(wizard.ids, data)
+        return {
+            account['code']: (
+                account['move_lines'],
+                [(line['lid'], line['debit'], line['balance']) for line in account['move_lines']],
+            )
+            for account in values['Accounts']
+        }
+
+    def test_cashbook_streamed_lines(self):
+        lines = self._get_cashbook_lines()
+        self.assertEqual(list(lines), ['CSHTA', 'CSHTB'])
+        self.assertEqual([(debit, balance) for dummy, debit, balance in lines['CSHTA'][1]], [
+            (50.0, 50.0), (100.0, 150.0), (300.0, 450.0), (500.0, 950.0),
+        ])
+        self.assertEqual([(debit, balance) for dummy, debit, balance in lines['CSHTB'][1]], [
+            (200.0, 200.0), (400.0, 600.0),
+        ])
+
+        # above the threshold the lines are read from a server side cursor while rendering
+        self.env['ir.config_parameter'].sudo().set_param('accounting_pdf_reports.ledger_stream_threshold', '0')
+        streamed = self._get_cashbook_lines()
+        self.assertIsInstance(streamed['CSHTA'][0], LedgerLines)
+        self.assertEqual(
+            {code: rows for code, (dummy, rows) in streamed.items()},
+            {code: rows for code, (dummy, rows) in lines.items()},
+        )
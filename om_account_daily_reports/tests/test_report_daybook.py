@@ -0,0 +1,67 @@
+from datetime import date
+
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestReportDayBook(AccountTestInvoicingCommon):
+    """ The day book of a date range, fetched in one query, must list the days having journal
+    items, with their lines and totals. """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.report = cls.env['report.om_account_daily_reports.report_daybook']
+        revenue = cls.company_data['default_account_revenue']
+        receivable = cls.company_data['default_account_receivable']
+        moves = cls.env['account.move'].create([{
+            'move_type': 'entry',
+            'journal_id': cls.company_data['default_journal_misc'].id,
+            'date': move_date,
+            'line_ids': [
+                (0, 0, {'account_id': receivable.id, 'partner_id': cls.partner_a.id, 'debit': amount}),
+                (0, 0, {'account_id': revenue.id, 'credit': amount}),
+            ],
+        } for move_date, amount in [
+            ('2024-12-31', 10.0), ('2025-01-01', 100.0), ('2025-01-01', 200.0), ('2025-01-05', 300.0),
+            ('2025-01-31', 400.0), ('2025-01-20', 20.0),
+        ]])
+        # the last entry stays draft
+        moves[:-1].action_post()
+        cls.journals = cls.company_data['default_journal_misc']
+
+    def _get_line_values(self, lines):
+        return sorted((line['account_id'], line['lname'] or '', line['debit'], line['credit'], line['balance'])
+                      for line in lines)
+
+    def _get_expected_entries(self, target_move):
+        """ Returns the (date, lines) of the days having journal items, the lines being grouped
+        by date in a search of the journal items. """
+        domain = [
+            ('journal_id', 'in', self.journals.ids),
+            ('date', '>=', '2025-01-01'),
+            ('date', '<=', '2025-01-31'),
+        ]
+        if target_move == 'posted':
+            domain.append(('parent_state', '=', 'posted'))
+        lines = self.env['account.move.line'].search(domain)
+        return [(day, lines.filtered(lambda line: line.date == day)) for day in sorted(set(lines.mapped('date')))]
+
+    def test_daybook_range(self):
+        accounts = self.env['account.account'].search([])
+        for target_move in ('posted', 'all'):
+            with self.subTest(target_move=target_move):
+                form_data = {'target_move': target_move, 'journal_ids': self.journals.ids}
+                entries = self.report._get_account_move_entries(
+                    accounts, form_data, date(2025, 1, 1), date(2025, 1, 31))
+                expected = self._get_expected_entries(target_move)
+                self.assertEqual([entry['date'] for entry in entries], [day for day, dummy in expected])
+                for entry, (dummy, lines) in zip(entries, expected):
+                    self.assertAlmostEqual(entry['debit'], sum(lines.mapped('debit')), places=2)
+                    self.assertAlmostEqual(entry['credit'], sum(lines.mapped('credit')), places=2)
+                    self.assertAlmostEqual(entry['balance'], sum(lines.mapped('balance')), places=2)
+                    self.assertEqual(self._get_line_values(entry['move_lines']), sorted(
+                        (line.account_id.id, line.name or '', line.debit, line.credit, line.balance)
+                        for line in lines))
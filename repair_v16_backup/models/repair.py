@@ -377,6 +377,16 @@ class Repair(models.Model):
         @return: Invoice Ids.
         """
         grouped_invoices_vals = {}
+        # All the lines are converted at today's rate: look it up once per currency and company
+        rates = {}
+        today = fields.Date.today()
+
+        def _get_rate(currency, company):
+            if (currency, company) not in rates:
+                rates[(currency, company)] = self.env['res.currency']._get_conversion_rate(
+                    currency, company.currency_id, company, today)
+            return rates[(currency, company)]
+
         repairs = self.filtered(lambda repair: repair.state not in ('draft', 'cancel')
                                                and not repair.invoice_id
                                                and repair.invoice_method != 'none')
@@ -451,7 +461,7 @@ class Repair(models.Model):
                     })
                 else:
                     amount_currency = -(operation.product_uom_qty * operation.price_unit)
-                    balance = currency._convert(amount_currency, company.currency_id, company, fields.Date.today())
+                    balance = company.currency_id.round(amount_currency * _get_rate(currency, company))
                     invoice_line_vals.update({
                         'amount_currency': amount_currency,
                         'debit': balance > 0.0 and balance or 0.0,
@@ -493,8 +503,7 @@ class Repair(models.Model):
                     })
                 else:
                     amount_currency = -(fee.product_uom_qty * fee.price_unit)
-                    balance = currency._convert(amount_currency, company.currency_id, company,
-                                                fields.Date.today())
+                    balance = company.currency_id.round(amount_currency * _get_rate(currency, company))
                     invoice_line_vals.update({
                         'amount_currency': amount_currency,
                         'debit': balance > 0.0 and balance or 0.0,